@@ -1,14 +1,17 @@
 #!/usr/bin/env python3
 """
 MathsForge AI - Apply Learned Keywords
-Merges learned keywords with existing strict_keywords.py
+Merges learned keywords with the vetted tables in strict_keywords.py and writes a
+versioned keyword artifact (keyword_artifact.json). A running web app picks it up
+within a few seconds - no file copy or restart needed.
 """
 
 import json
 from pathlib import Path
 
+from strict_keywords import ARTIFACT_FILE, build_keyword_artifact, save_keyword_artifact, get_keyword_version
+
 LEARNED_FILE = Path(__file__).parent / "learned_keywords.json"
-STRICT_KEYWORDS_FILE = Path(__file__).parent / "strict_keywords.py"
 
 # Topic name mapping (folder name -> strict_keywords key)
 FOLDER_TO_TOPIC = {
@@ -49,6 +52,7 @@ FOLDER_TO_TOPIC = {
     "35_proof": "proof",
     "36_gradients_and_rate_of_change": "gradients and rate of change",
     "37_pre_calculus": "pre-calculus",
+    "38_trigonometric_graphs": "trigonometric graphs",
 }
 
 
@@ -114,46 +118,6 @@ def merge_keywords(current: dict, learned: dict) -> dict:
     return merged
 
 
-def generate_new_keywords_file(merged: dict) -> str:
-    """Generate Python code for the updated strict_keywords.py"""
-
-    lines = [
-        '"""',
-        'STRICT Topic Keywords for GCSE Maths OCR Detection',
-        'AUTO-GENERATED with learned keywords from training data',
-        'Each topic has PRIMARY keywords (must match) and CONTEXT keywords (supporting evidence).',
-        '"""',
-        '',
-        'STRICT_TOPIC_KEYWORDS = {'
-    ]
-
-    for topic_key, data in sorted(merged.items()):
-        lines.append(f'    # {topic_key.title()}')
-        lines.append(f'    "{topic_key}": {{')
-
-        # Primary keywords
-        primary = data.get('primary', [])
-        primary_str = ', '.join(f'"{kw}"' for kw in primary)
-        lines.append(f'        "primary": [{primary_str}],')
-
-        # Context keywords
-        context = data.get('context', [])
-        context_str = ', '.join(f'"{kw}"' for kw in context)
-        lines.append(f'        "context": [{context_str}],')
-
-        # Exclude keywords
-        exclude = data.get('exclude', [])
-        exclude_str = ', '.join(f'"{kw}"' for kw in exclude)
-        lines.append(f'        "exclude": [{exclude_str}]')
-
-        lines.append('    },')
-        lines.append('')
-
-    lines.append('}')
-
-    return '\n'.join(lines)
-
-
 def main():
     print("=" * 60)
     print("MathsForge AI - Apply Learned Keywords")
@@ -184,24 +148,15 @@ def main():
 
     merged = merge_keywords(current, learned)
 
-    # Generate new file content
-    new_content = generate_new_keywords_file(merged)
-
-    # Save backup
-    backup_file = STRICT_KEYWORDS_FILE.with_suffix('.py.backup')
-    if STRICT_KEYWORDS_FILE.exists():
-        import shutil
-        shutil.copy(STRICT_KEYWORDS_FILE, backup_file)
-        print(f"\n✅ Backup saved to: {backup_file}")
-
-    # Preview mode - don't overwrite yet
-    preview_file = Path(__file__).parent / "strict_keywords_preview.py"
-    with open(preview_file, 'w') as f:
-        f.write(new_content)
+    # Build and save the artifact (written atomically, so the server never reads half of it)
+    artifact = build_keyword_artifact(merged, source=LEARNED_FILE.name)
+    previous_version = get_keyword_version()
+    save_keyword_artifact(artifact)
 
-    print(f"✅ Preview saved to: {preview_file}")
-    print("\nTo apply changes:")
-    print(f"  cp {preview_file} {STRICT_KEYWORDS_FILE}")
+    print(f"\n✅ Keyword artifact version {artifact['version']} saved to: {ARTIFACT_FILE}")
+    if artifact['version'] == previous_version:
+        print("   (unchanged from the version currently in use)")
+    print("   The web app reloads it automatically; delete the file to go back to the built-in keywords.")
 
 
 if __name__ == "__main__":
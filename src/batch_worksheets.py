@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Batch Worksheet Generation
+Generates many topic worksheets from the local paper archive in one run, without
+the web UI. Every paper's pages are extracted once (in parallel across cores) into
+the memory-mapped page text store, then shared by all jobs; source PDFs are parsed
+once through the shared reader pool.
+
+Batch spec (JSON):
+    {
+      "defaults": {"years": [2018, 2024], "papers": [1, 2, 3], "max_pages": 12,
+                   "include_mark_schemes": true, "min_confidence": "medium",
+                   "include_specimens": false},
+      "jobs": [
+        {"name": "10A_Friday", "topic": "Quadratic Equations"},
+        {"name": "11B_Friday", "topic": "Circle Theorems", "papers": [1], "max_pages": 8}
+      ]
+    }
+
+Usage:
+    python batch_worksheets.py friday.json               # write outputs/batch_<timestamp>/
+    python batch_worksheets.py friday.json --dry-run     # show selected pages only
+    python batch_worksheets.py friday.json --workers 4
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from paper_archive import BASE_DIR, load_manifest
+from page_text_store import index_documents
+
+OUTPUT_DIR = Path("outputs")
+
+DEFAULTS = {
+    'years': None,                 # [from, to] inclusive, None for all years (and undated papers)
+    'papers': [1, 2, 3],
+    'max_pages': 12,
+    'include_mark_schemes': True,
+    'min_confidence': 'medium',    # 'high' or 'medium'
+    'include_specimens': False,
+}
+CONFIDENCE_RANK = {'high': 2, 'medium': 1}
+
+
+def load_spec(path: Path) -> list:
+    """Read a batch spec; returns one settings dict per job with defaults applied"""
+    with open(path) as f:
+        spec = json.load(f)
+
+    defaults = {**DEFAULTS, **spec.get('defaults', {})}
+    jobs = []
+    for i, job in enumerate(spec.get('jobs', [])):
+        if not job.get('topic'):
+            raise ValueError(f"job {i + 1} has no topic")
+        settings = {**defaults, **job}
+        settings.setdefault('name', f"job_{i + 1}")
+        if settings['min_confidence'] not in CONFIDENCE_RANK:
+            raise ValueError(f"job {settings['name']}: min_confidence must be 'high' or 'medium'")
+        settings['years'] = parse_years(settings['years'], settings['name'])
+        jobs.append(settings)
+    return jobs
+
+
+def parse_years(years, job_name: str) -> tuple:
+    """A job's years setting as (from, to) ints, or None for all years"""
+    if not years:
+        return None
+    try:
+        start, end = (int(year) for year in years) if not isinstance(years, str) else ()
+    except (TypeError, ValueError):
+        raise ValueError(f"job {job_name}: years must be [from, to], got {years!r}") from None
+    if start > end:
+        raise ValueError(f"job {job_name}: years [{start}, {end}] is empty")
+    return (start, end)
+
+
+def select_papers(entries: list, settings: dict) -> list:
+    """Question paper manifest entries matching a job's years and paper numbers.
+
+    Specimen and sample papers are kept only with include_specimens; papers whose year is
+    unknown only when the job has no year range, since they can't be placed in one.
+    """
+    years = settings.get('years')
+    papers = {str(p) for p in settings.get('papers') or []}
+    selected = []
+    for entry in entries:
+        if entry['kind'] != 'qp':
+            continue
+        if papers and entry['paper_num'] not in papers:
+            continue
+        if entry['year'].isdigit():
+            if years and not years[0] <= int(entry['year']) <= years[1]:
+                continue
+        elif entry['year'] == 'Specimen':
+            if not settings.get('include_specimens'):
+                continue
+        elif years:
+            continue
+        selected.append(entry)
+    return selected
+
+
+def score_job(settings: dict, papers: list, store) -> list:
+    """Pages for one job, best first, as [{'entry', 'page', 'score', 'confidence'}]"""
+    from score_matrix import document_key, get_score_matrix
+    from strict_keywords import HIGH_SCORE, POSSIBLE_SCORE, match_mode_for_source, page_confidence
+
+    # Use the archive score matrix when it covers every paper
+    matrix = get_score_matrix()
+    if matrix is not None and all(document_key(entry) in matrix for entry in papers):
+        by_key = {document_key(entry): entry for entry in papers}
+        min_score = HIGH_SCORE if settings['min_confidence'] == 'high' else POSSIBLE_SCORE
+        rows = matrix.select(settings['topic'], min_score, documents=list(by_key), top_k=settings['max_pages'])
+        return [{**page, 'entry': by_key[page['key']]} for page in matrix.describe(rows, settings['topic'])]
+
+    minimum = CONFIDENCE_RANK[settings['min_confidence']]
+    candidates = []
+    for entry in papers:
+        if store is None or entry['sha1'] not in store:
+            continue
+        for page_num, text in enumerate(store.iter_pages(entry['sha1'])):
+            match_mode = match_mode_for_source(store.page_source(entry['sha1'], page_num))
+            confidence, score, _ = page_confidence(text, settings['topic'], match_mode)
+            if confidence and CONFIDENCE_RANK[confidence] >= minimum:
+                candidates.append({'entry': entry, 'page': page_num + 1,
+                                   'score': score, 'confidence': confidence})
+
+    candidates.sort(key=lambda c: (-CONFIDENCE_RANK[c['confidence']], -c['score']))
+    return candidates[:settings['max_pages']]
+
+
+def collect_pages(selected: list) -> list:
+    """Selected pages grouped by paper in paper order, in the format assemble_worksheet takes"""
+    by_paper = {}
+    for page in selected:
+        entry = page['entry']
+        path = str(BASE_DIR / entry['folder'] / entry['file'])
+        by_paper.setdefault(path, (entry, []))[1].append(page['page'])
+
+    ordered = sorted(by_paper.items(), key=lambda item: (item[1][0]['year'], item[1][0]['session'], item[0]))
+    return [{'pdfPath': path, 'pages': sorted(pages)} for path, (_, pages) in ordered]
+
+
+def safe_name(name: str) -> str:
+    return "".join(c if c.isalnum() or c in '-_' else '_' for c in name).strip('_') or 'worksheet'
+
+
+def run_job(settings: dict, selected: list, output_dir: Path) -> dict:
+    """Assemble and write one job's worksheet (and mark schemes); returns its summary"""
+    from pdf_assembly import assemble_worksheet
+
+    name = safe_name(settings['name'])
+    worksheet = assemble_worksheet(collect_pages(selected), settings['include_mark_schemes'])
+
+    files = {}
+    for key, suffix in (('questions', 'Questions'), ('mark_schemes', 'MarkSchemes')):
+        writer = worksheet[key]
+        if writer is None or not writer.page_count:
+            continue
+        path = output_dir / f"{name}_{suffix}.pdf"
+        with open(path, 'wb') as f:
+            writer.write(f)
+        files[key] = path.name
+
+    return {
+        'pages': worksheet['question_pages'],
+        'mark_scheme_pages': worksheet['mark_scheme_pages'],
+        'files': files,
+        'warnings': worksheet['warnings'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate topic worksheets for a batch spec")
+    parser.add_argument('spec', type=Path, help="Batch spec JSON")
+    parser.add_argument('--output-dir', type=Path, default=None,
+                        help="Where to write worksheets (default: outputs/batch_<timestamp>)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes for page extraction (default: all cores)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Select pages and print the plan without writing PDFs")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MathsForge AI - Batch Worksheet Generation")
+    print("=" * 60)
+
+    try:
+        jobs = load_spec(args.spec)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read batch spec {args.spec}: {e}")
+        sys.exit(1)
+    if not jobs:
+        print("No jobs in the batch spec.")
+        return
+
+    entries = list(load_manifest()['entries'].values())
+    job_papers = [select_papers(entries, settings) for settings in jobs]
+    needed = {e['sha1']: {**e, 'path': BASE_DIR / e['folder'] / e['file']} for papers in job_papers for e in papers}
+    store = index_documents(list(needed.values()), args.workers)
+
+    output_dir = args.output_dir or OUTPUT_DIR / f"batch_{datetime.now():%Y%m%d_%H%M%S}"
+    if not args.dry_run:
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    summary = {'created': datetime.now().isoformat(timespec='seconds'),
+               'spec': str(args.spec), 'jobs': []}
+    start = time.perf_counter()
+    for settings, papers in zip(jobs, job_papers):
+        print(f"\n📝 {settings['name']}: {settings['topic']} ({len(papers)} papers)")
+        selected = score_job(settings, papers, store)
+        result = {
+            'name': settings['name'],
+            'topic': settings['topic'],
+            'papers_scanned': len(papers),
+            'selected': [{'file': p['entry']['file'], 'page': p['page'], 'score': p['score'],
+                          'confidence': p['confidence']} for p in selected],
+        }
+        if not selected:
+            print("   ⚠ No matching pages")
+        elif not args.dry_run:
+            result.update(run_job(settings, selected, output_dir))
+        summary['jobs'].append(result)
+
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+
+    print(f"\n{'Job':<24} {'Topic':<28} {'Pages':>5} {'High':>5}")
+    print("-" * 65)
+    for job in summary['jobs']:
+        high = len([p for p in job['selected'] if p['confidence'] == 'high'])
+        print(f"{job['name'][:24]:<24} {job['topic'][:28]:<28} {len(job['selected']):>5} {high:>5}")
+
+    if args.dry_run:
+        print("\n(dry run - no files written)")
+        return
+
+    with open(output_dir / "summary.json", 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n✅ {len(jobs)} worksheets written to: {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - PDF Pipeline Benchmarks
+Times the PDF hot paths on generated fixture PDFs (no papers or network needed):
+text extraction by method, enhanced OCR, OCR preprocessing by stage, topic scoring per
+engine, thumbnails, page removal, worksheet/ZIP assembly and cold import time of the app and
+tools. Reports median, p95 and peak Python heap per benchmark, and fails if any median
+regresses past a saved baseline.
+
+Usage:
+    python bench_pipeline.py                         # run all, compare with benchmarks/baseline.json
+    python bench_pipeline.py --save-baseline         # record the current numbers as the baseline
+    python bench_pipeline.py --only extract,assembly # run benchmarks whose name contains these
+    python bench_pipeline.py --threshold 0.5         # allow medians up to 50% slower
+"""
+
+import io
+import contextlib
+import itertools
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+RESULTS_DIR = Path(__file__).parent / "benchmarks"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+
+# A median slower than baseline by more than this fraction (and MIN_REGRESSION_MS) fails the run
+REGRESSION_THRESHOLD = 0.25
+# Ignore differences smaller than this - sub-millisecond timings are mostly noise
+MIN_REGRESSION_MS = 2.0
+
+# Modules whose import time is measured in a fresh interpreter (server and CLI cold start)
+IMPORT_MODULES = ('web_app_v2', 'pdf_text', 'train_keywords')
+
+FIXTURE_PAGES = 12
+FIXTURE_PAPERS = 3
+QUESTION_LINES = [
+    "{n} The diagram shows a tree diagram for two independent events.",
+    "(a) Complete the probability tree diagram.",
+    "(b) Work out the probability that both counters are red.",
+    "Give your answer as a fraction in its simplest form.",
+    "The vectors OA = a and OB = b. Find the magnitude of AB.",
+    "Solve the simultaneous equations 3x + 2y = 12 and x - y = 1",
+    "(Total for Question {n} is 4 marks)",
+]
+
+
+def _percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def write_text_pdf(path: Path, pages: list):
+    """Minimal text-layer PDF (Helvetica, one line per entry) - pages is a list of line lists"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    font_id = 3 + 2 * len(pages)
+
+    for lines in pages:
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {len(objects) + 2} 0 R >>".encode())
+        escaped = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines]
+        content = "BT /F1 11 Tf 50 790 Td 16 TL " + " ".join(f"({line}) '" for line in escaped) + " ET"
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def build_fixtures(directory: Path) -> dict:
+    """Generate question papers with their mark schemes and a scanned (image-only) PDF"""
+    import pypdfium2 as pdfium
+
+    fixtures = {'papers': []}
+    for paper in range(FIXTURE_PAPERS):
+        pages = []
+        for page in range(FIXTURE_PAGES):
+            number = page + 1
+            pages.append([line.format(n=number) for line in QUESTION_LINES] * 5)
+        path = directory / f"2024_Jun_Paper_{paper + 1}.pdf"
+        write_text_pdf(path, pages)
+        fixtures['papers'].append(path)
+
+    # Mark schemes live in their own folder, as in the archive, one per paper
+    fixtures['markschemes'] = []
+    (directory / "markschemes").mkdir()
+    for path in fixtures['papers']:
+        ms_path = directory / "markschemes" / f"{path.stem}_MS.pdf"
+        write_text_pdf(ms_path, [["Question Working Answer Mark Notes", f"{n} 3/8 M1 A1"] * 10
+                                 for n in range(1, FIXTURE_PAGES + 1)])
+        fixtures['markschemes'].append(ms_path)
+
+    # Scanned page: render a text page to an image, tilt it slightly and save as an image-only PDF
+    pdf = pdfium.PdfDocument(str(fixtures['papers'][0]))
+    image = pdf[0].render(scale=200 / 72).to_pil().convert('L').rotate(1.5, fillcolor=255)
+    pdf.close()
+    fixtures['scanned'] = directory / "scanned.pdf"
+    image.save(fixtures['scanned'], 'PDF', resolution=200)
+
+    return fixtures
+
+
+def measure_import(module: str):
+    """Function that imports `module` in a new interpreter and returns the import time in seconds"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    def run():
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        return {'import': float(result.stdout.strip().splitlines()[-1])}
+
+    return run
+
+
+def define_benchmarks(fixtures: dict, ocr_scale: float) -> list:
+    """(name, function, heavy) for every benchmark; heavy ones run fewer repeats"""
+    import pdfplumber
+    import pypdfium2 as pdfium
+    import pdf_text
+    import web_app_v2
+    from pdf_assembly import get_pdf_reader, reader_pool, stream_zip_bundle
+
+    web_app_v2.ensure_dirs()
+    paper = fixtures['papers'][0]
+    scanned = fixtures['scanned']
+    page_num = 3
+
+    def extract_pdfplumber():
+        with pdfplumber.open(paper) as pdf:
+            page = pdf.pages[page_num]
+            text = page.extract_text() or ""
+            for table in page.extract_tables():
+                text += " ".join(str(cell) for row in table if row for cell in row if cell)
+        return text
+
+    def extract_pypdf_cold():
+        reader_pool.clear()
+        return get_pdf_reader(paper).pages[page_num].extract_text()
+
+    def extract_pypdf_pooled():
+        return get_pdf_reader(paper).pages[page_num].extract_text()
+
+    def extract_auto():
+        return pdf_text.extract_text_from_pdf_page(paper, page_num)
+
+    def render_for_ocr():
+        pdf = pdfium.PdfDocument(str(scanned))
+        image = pdf[0].render(scale=ocr_scale).to_pil()
+        pdf.close()
+        return image
+
+    ocr_image = render_for_ocr()
+
+    def preprocess_stages():
+        timings = {}
+        pdf_text.preprocess_image_for_ocr(ocr_image, timings=timings)
+        return timings
+
+    def enhanced_ocr():
+        return pdf_text.extract_text_with_enhanced_ocr(scanned, 0)
+
+    from strict_keywords import MATCH_MODES, get_active_keywords, page_matches_topic
+    page_text = extract_auto()
+    topics = list(get_active_keywords().tables)
+    runs = itertools.count()
+
+    def score_all_topics(match_mode):
+        def score():
+            # A different string each run, so token scans aren't served from the page cache
+            text = f"{page_text} {next(runs)}"
+            return sum(page_matches_topic(text, topic, match_mode=match_mode)[0] for topic in topics)
+        return score
+
+    from scoring_engines import LinearTopicEngine, load_topic_model
+    # The trained model if there is one, else one fitted on the fixture page - same shape, same cost
+    topic_model = load_topic_model() or LinearTopicEngine.train([(page_text, topic) for topic in topics])
+
+    def score_linear():
+        return topic_model.matching_topics(f"{page_text} {next(runs)}")
+
+    def thumbnails():
+        return web_app_v2.get_pdf_page_thumbnails(paper)
+
+    def remove_pages():
+        output = web_app_v2.remove_pages_from_pdf(paper, list(range(1, FIXTURE_PAGES + 1, 2)))
+        output.unlink()
+
+    # Point mark scheme lookup and the question → mark scheme map at the fixtures, so assembly
+    # runs the same path as the web app and batch CLI without touching the real archive
+    import markscheme_map
+    import paper_archive
+    from pdf_assembly import assemble_worksheet
+    paper_archive.MS_DIR = fixtures['markschemes'][0].parent
+    markscheme_map.MAP_FILE = fixtures['markschemes'][0].parent / "markscheme_map.json"
+    mapping = {path.name: markscheme_map.build_paper_entry(path, ms_path, pdf_text.extract_text_from_pdf_page)
+               for path, ms_path in zip(fixtures['papers'], fixtures['markschemes'])}
+    markscheme_map.MAP_FILE.write_text(json.dumps(mapping))
+    collected = [{'pdfPath': str(path), 'pages': [2, 5, 8]} for path in fixtures['papers']]
+
+    def assembly(measure=False):
+        # Same request shape as handle_generate_multi: a few pages from each paper plus mark schemes
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = assemble_worksheet(collected, True, measure)
+            stream_zip_bundle(io.BytesIO(), [('Worksheet.pdf', result['questions']),
+                                             ('MarkScheme.pdf', result['mark_schemes'])])
+        return result
+
+    # Size saved by the writer's optimization, measured once outside the timed runs
+    measured = assembly(measure=True)
+    for label, writer in (('worksheet', 'questions'), ('mark scheme', 'mark_schemes')):
+        report = measured[writer].size_report()
+        print(f"   🗜 Fixture {label}: {report['bytes_before'] // 1024} KB → {report['bytes_after'] // 1024} KB")
+
+    benchmarks = [
+        ('extract.pdfplumber', extract_pdfplumber, False),
+        ('extract.pypdf_cold', extract_pypdf_cold, False),
+        ('extract.pypdf_pooled', extract_pypdf_pooled, False),
+        ('extract.auto_text_layer', extract_auto, False),
+        ('ocr.render', render_for_ocr, False),
+        ('ocr.preprocess', preprocess_stages, True),
+        *[(f'score.all_topics_{mode}', score_all_topics(mode), False) for mode in MATCH_MODES],
+        ('score.all_topics_linear', score_linear, False),
+        ('thumbnails', thumbnails, False),
+        ('remove_pages', remove_pages, False),
+        ('assembly.zip_bundle', assembly, False),
+    ]
+    # Wall time includes interpreter startup; the import alone is reported as a stage
+    benchmarks += [(f'import.{module}', measure_import(module), False) for module in IMPORT_MODULES]
+    if pdf_text.enhanced_ocr_available():
+        benchmarks.append(('ocr.enhanced', enhanced_ocr, True))
+    else:
+        print("   ⚠ OpenCV or Tesseract not installed - skipping ocr.enhanced")
+    return benchmarks
+
+
+def run_benchmark(function, repeat: int) -> dict:
+    """Warm up once, time `repeat` runs, then measure peak Python heap in one traced run.
+
+    Returns timing stats in ms, plus per-stage medians if the function returns a timings dict.
+    """
+    function()
+
+    times, stage_times = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+        if isinstance(result, dict) and all(isinstance(v, float) for v in result.values()):
+            for stage, seconds in result.items():
+                stage_times.setdefault(stage, []).append(seconds)
+
+    # Traced separately - tracemalloc slows allocation-heavy code down noticeably
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = {
+        'runs': repeat,
+        'median_ms': round(_percentile(times, 50) * 1000, 3),
+        'p95_ms': round(_percentile(times, 95) * 1000, 3),
+        'min_ms': round(min(times) * 1000, 3),
+        'peak_kb': peak // 1024,
+    }
+    if stage_times:
+        stats['stages_median_ms'] = {stage: round(_percentile(values, 50) * 1000, 3)
+                                     for stage, values in stage_times.items()}
+    return stats
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if not before:
+            continue
+        limit = before['median_ms'] * (1 + threshold)
+        if stats['median_ms'] > limit and stats['median_ms'] - before['median_ms'] > MIN_REGRESSION_MS:
+            regressions.append((name, before['median_ms'], stats['median_ms']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF processing hot paths on generated fixtures")
+    parser.add_argument('--repeat', type=int, default=7, help="Timed runs per benchmark (default: 7)")
+    parser.add_argument('--heavy-repeat', type=int, default=2,
+                        help="Timed runs for OCR/preprocessing benchmarks (default: 2)")
+    parser.add_argument('--only', default='', help="Comma-separated substrings of benchmark names to run")
+    parser.add_argument('--ocr-scale', type=float, default=4.0,
+                        help="Render scale for the OCR benchmarks (default: 4.0, as in production)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help="Baseline JSON to compare with")
+    parser.add_argument('--save-baseline', action='store_true', help="Save this run as the baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help=f"Allowed median slowdown as a fraction (default: {REGRESSION_THRESHOLD})")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MathsForge AI - PDF Pipeline Benchmarks")
+    print("=" * 60)
+
+    filters = [f.strip() for f in args.only.split(',') if f.strip()]
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="mathsforge_bench_") as tmp:
+        # web_app_v2 writes its temp/output folders relative to the working directory
+        previous_cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            fixtures = build_fixtures(Path(tmp))
+            print(f"\nFixtures: {FIXTURE_PAPERS} papers × {FIXTURE_PAGES} pages, mark scheme, scanned page\n")
+
+            for name, function, heavy in define_benchmarks(fixtures, args.ocr_scale):
+                if filters and not any(f in name for f in filters):
+                    continue
+                stats = run_benchmark(function, args.heavy_repeat if heavy else args.repeat)
+                results[name] = stats
+                print(f"   {name:<26} median {stats['median_ms']:>10.2f} ms   p95 {stats['p95_ms']:>10.2f} ms"
+                      f"   peak {stats['peak_kb']:>7} KB")
+                for stage, ms in stats.get('stages_median_ms', {}).items():
+                    print(f"      {stage:<23} {ms:>10.2f} ms")
+        finally:
+            os.chdir(previous_cwd)
+
+    run = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'benchmarks': results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    with open(RESULTS_DIR / "latest.json", 'w') as f:
+        json.dump(run, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=2)
+        print(f"\n✅ Baseline saved to: {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline} - run with --save-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = find_regressions(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%} (baseline {baseline.get('created')}):")
+        for name, before, after in regressions:
+            print(f"   {name}: {before:.2f} ms → {after:.2f} ms")
+        sys.exit(1)
+
+    print(f"\n✅ No regressions over {args.threshold:.0%} against baseline from {baseline.get('created')}")
+
+
+if __name__ == "__main__":
+    main()
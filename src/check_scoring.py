@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Page Scoring Regression Check
+Checks score_page() against the scoring rules it replaced, on fixed sample pages built
+from every topic's keyword table:
+
+- strict profile: the original paper-scan rule - at least one primary keyword, rejected if
+  excludes outnumber primaries, score = 3 × primary + context - 2 × exclude, a match at 3,
+  'high' at HIGH_SCORE and near misses from POSSIBLE_SCORE. Checked in every match mode
+  (page_matches_topic and page_confidence included), with the substring reference
+  computed independently of the keyword scanner.
+- custom profile: the intended change from the old uploaded-PDF scan - keywords match
+  whole words, so "rate" is no longer found inside "separate".
+
+Usage:
+    python check_scoring.py    # exits 1 if any result differs
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from strict_keywords import (HIGH_SCORE, MATCH_MODES, POSSIBLE_SCORE, _find_keywords, get_active_keywords,
+                             page_confidence, page_matches_topic, score_page)
+
+FILLER = "Answer all questions and show your working clearly in the space provided."
+
+# Keyword combinations sampled from each topic's table: (primary, context, exclude) counts
+SAMPLE_SHAPES = [
+    (0, 0, 0), (0, 2, 0), (1, 0, 0), (1, 1, 0), (1, 0, 1), (1, 1, 1), (1, 2, 1),
+    (1, 0, 2), (2, 2, 1), (2, 3, 0), (3, 1, 2), (0, 1, 1),
+]
+
+
+def legacy_strict_score(page_text: str, topic_key: str, match_mode: str) -> tuple:
+    """(matches, score, matched keywords) as page_matches_topic scored pages before profiles"""
+    table = get_active_keywords().tables[topic_key]
+    if match_mode == 'substring':
+        text_lower = page_text.lower()
+        hits = {group: [kw for kw in kws if kw.lower() in text_lower] for group, kws in table.items()}
+    else:
+        hits = _find_keywords(page_text, topic_key, match_mode)
+    primary, context, excluded = hits.get('primary', []), hits.get('context', []), hits.get('exclude', [])
+
+    if not primary or len(excluded) > len(primary):
+        return (False, 0, [])
+    score = len(primary) * 3 + len(context) - len(excluded) * 2
+    return (score >= 3, score, primary + context)
+
+
+def legacy_confidence(page_text: str, topic_key: str, match_mode: str) -> tuple:
+    """(confidence, score, matched keywords) as page_confidence graded pages before profiles"""
+    if len(page_text) < 50:
+        return (None, 0, [])
+    matches, score, matched = legacy_strict_score(page_text, topic_key, match_mode)
+    if matches:
+        return ('high' if score >= HIGH_SCORE else 'medium', score, matched)
+    if score >= POSSIBLE_SCORE:
+        return ('medium', score, matched)
+    return (None, score, matched)
+
+
+def sample_pages(table: dict) -> list:
+    """Fixed sample pages mixing a topic's primary, context and exclude keywords"""
+    pages = []
+    for offset, (n_primary, n_context, n_exclude) in enumerate(SAMPLE_SHAPES):
+        words = []
+        for group, count in (('primary', n_primary), ('context', n_context), ('exclude', n_exclude)):
+            keywords = table.get(group, [])
+            words += [keywords[(offset + i) % len(keywords)] for i in range(count)] if keywords else []
+        pages.append(f"{offset + 1} {FILLER} " + ". ".join(words))
+    pages.append("Blank page")
+    return pages
+
+
+def check_strict() -> list:
+    failures = []
+    checked = 0
+    for topic_key, table in get_active_keywords().tables.items():
+        for page_text in sample_pages(table):
+            for match_mode in MATCH_MODES:
+                expected = legacy_strict_score(page_text, topic_key, match_mode)
+                actual = page_matches_topic(page_text, topic_key, match_mode=match_mode)
+                expected_confidence = legacy_confidence(page_text, topic_key, match_mode)
+                actual_confidence = page_confidence(page_text, topic_key, match_mode)
+                checked += 1
+                if actual != expected or actual_confidence != expected_confidence:
+                    failures.append(f"strict {topic_key!r} [{match_mode}] {page_text!r}: "
+                                    f"expected {expected} / {expected_confidence}, "
+                                    f"got {actual} / {actual_confidence}")
+    print(f"   strict: {checked} page/topic/mode cases checked")
+    return failures
+
+
+def check_custom() -> list:
+    failures = []
+    page_text = f"Keep the two answers separate. {FILLER}"
+    topic = next(iter(get_active_keywords().tables))
+
+    old_scan = score_page(page_text, topic, 'custom', match_mode='substring', related=['rate'])
+    new_scan = score_page(page_text, topic, 'custom', related=['rate'])
+    if 'rate' not in old_scan.keywords:
+        failures.append(f"custom [substring]: expected 'rate' inside 'separate', got {old_scan.keywords}")
+    if 'rate' in new_scan.keywords:
+        failures.append("custom [token]: 'rate' matched inside 'separate'")
+
+    whole_word = score_page(f"Work out the rate of flow. {FILLER}", topic, 'custom', related=['rate'])
+    if 'rate' not in whole_word.keywords:
+        failures.append(f"custom [token]: whole word 'rate' not matched, got {whole_word.keywords}")
+    print("   custom: substring vs token matching of 'rate' checked")
+    return failures
+
+
+def main():
+    print("=" * 60)
+    print("MathsForge AI - Page Scoring Regression Check")
+    print("=" * 60)
+
+    failures = check_strict() + check_custom()
+    for failure in failures[:20]:
+        print(f"   ✗ {failure}")
+    if failures:
+        print(f"\n❌ {len(failures)} scoring differences")
+        sys.exit(1)
+    print("\n✅ Scoring matches the reference rules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Training Feature Regression Check
+Runs extract_features() on fixed sample lines whose phrases and patterns are known,
+including symbols inside phrase templates ("Express 3/4 as a decimal"), which must not
+stop a training document from being analyzed.
+
+Usage:
+    python check_text_features.py    # exits 1 if any result differs
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from text_features import extract_features
+
+# (text, phrases that must be found, phrases that must not be)
+PHRASE_CASES = [
+    ("Express the ratio as a fraction in its simplest form.", ['express the ratio as'], []),
+    ("Express 3/4 as a decimal.", [], ['express 3 as', 'express 3 4 as']),
+    ("Express x = 2 as a coordinate.", [], ['express x = 2 as']),
+    ("Express as a single fraction.", [], ['express as']),
+    ("Work out the area of the triangle.", ['work out the area', 'area of the triangle'], []),
+    ("Give your answer in terms of pi.", ['in terms of pi'], []),
+]
+
+
+def check_phrases() -> list:
+    failures = []
+    for text, expected, unexpected in PHRASE_CASES:
+        try:
+            phrases = extract_features(text)['phrases']
+        except Exception as e:
+            failures.append(f"{text!r}: {type(e).__name__}: {e}")
+            continue
+        for phrase in expected:
+            if phrase not in phrases:
+                failures.append(f"{text!r}: expected phrase {phrase!r}, got {sorted(phrases)}")
+        for phrase in unexpected:
+            if phrase in phrases:
+                failures.append(f"{text!r}: unexpected phrase {phrase!r}")
+    print(f"   phrases: {len(PHRASE_CASES)} sample lines checked")
+    return failures
+
+
+def main():
+    print("=" * 60)
+    print("MathsForge AI - Training Feature Regression Check")
+    print("=" * 60)
+
+    failures = check_phrases()
+    for failure in failures:
+        print(f"   ✗ {failure}")
+    if failures:
+        print(f"\n❌ {len(failures)} feature differences")
+        sys.exit(1)
+    print("\n✅ Features match the expected phrases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Topic Detection Evaluation
+Runs page_matches_topic over every page of the labelled training PDFs (the
+training/XX_topic folder is the label) and reports per-topic precision, recall
+and F1, plus pages/sec and p50/p95 per-page latency for text-only and OCR modes.
+
+Results are written as JSON so a keyword change can be compared with the previous run.
+With several --match-modes (or --engines) the same extracted text is classified by each
+keyword matcher / scoring engine and their precision/recall/F1 differences are reported.
+
+Usage:
+    python evaluate_topics.py                          # text layer only
+    python evaluate_topics.py --modes text,ocr         # also time enhanced OCR (slow)
+    python evaluate_topics.py --max-pages 20           # sample at most 20 pages per topic
+    python evaluate_topics.py --compare evaluation/previous.json
+    python evaluate_topics.py --match-modes token,substring   # word-boundary vs raw substring
+    python evaluate_topics.py --modes ocr --match-modes fuzzy,token   # OCR-tolerant vs exact tokens
+    python evaluate_topics.py --engines keywords,linear   # keyword tables vs the trained model
+"""
+
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from apply_learned_keywords import FOLDER_TO_TOPIC
+from scoring_engines import KeywordEngine, get_engine
+from strict_keywords import DEFAULT_MATCH_MODE, MATCH_MODES, get_active_keywords
+
+TRAINING_DIR = Path(__file__).parent / "training"
+RESULTS_DIR = Path(__file__).parent / "evaluation"
+MODES = ('text', 'ocr')
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def collect_labelled_pdfs(training_dir: Path) -> list:
+    """(pdf_path, topic) for every PDF in a topic folder we have keywords for"""
+    labelled = []
+    for folder in sorted(training_dir.iterdir()):
+        topic = FOLDER_TO_TOPIC.get(folder.name)
+        if not folder.is_dir() or topic is None:
+            continue
+        for pdf_path in sorted(folder.glob('*.pdf')):
+            labelled.append((pdf_path, topic))
+    return labelled
+
+
+def page_text_extractor(mode: str):
+    """Function (pdf_path, page_num) -> text for the given mode"""
+    if mode == 'ocr':
+        from pdf_text import extract_text_with_enhanced_ocr
+        return extract_text_with_enhanced_ocr
+
+    import pdfplumber
+
+    def extract_text_layer(pdf_path: Path, page_num: int) -> str:
+        with pdfplumber.open(pdf_path) as pdf:
+            return pdf.pages[page_num].extract_text() or ""
+
+    return extract_text_layer
+
+
+def page_count(pdf_path: Path) -> int:
+    from pdf_assembly import get_pdf_reader
+    try:
+        return len(get_pdf_reader(pdf_path).pages)
+    except Exception as e:
+        print(f"   ⚠ Could not read {pdf_path.name}: {e}")
+        return 0
+
+
+def topic_metrics(counts: dict, pages_per_topic: dict) -> dict:
+    """Per-topic precision/recall/F1 and their macro averages from tp/fp/fn counts"""
+    per_topic = {}
+    for topic, c in counts.items():
+        precision = c['tp'] / (c['tp'] + c['fp']) if c['tp'] + c['fp'] else 0.0
+        recall = c['tp'] / (c['tp'] + c['fn']) if c['tp'] + c['fn'] else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        per_topic[topic] = {
+            **c,
+            'pages': pages_per_topic.get(topic, 0),
+            'precision': round(precision, 4),
+            'recall': round(recall, 4),
+            'f1': round(f1, 4),
+        }
+
+    # Macro average over topics that have labelled pages
+    scored = [m for m in per_topic.values() if m['pages']]
+    return {
+        'macro_precision': round(sum(m['precision'] for m in scored) / len(scored), 4) if scored else 0.0,
+        'macro_recall': round(sum(m['recall'] for m in scored) / len(scored), 4) if scored else 0.0,
+        'macro_f1': round(sum(m['f1'] for m in scored) / len(scored), 4) if scored else 0.0,
+        'topics': per_topic,
+    }
+
+
+def evaluate_mode(labelled: list, topics: list, mode: str, max_pages: int = None,
+                  engines: list = None) -> dict:
+    """Classify every labelled page against every topic; returns metrics and timings.
+
+    Pages are extracted once and classified by each scoring engine (default: the keyword
+    tables); the top-level metrics are for the first one, and all of them are under 'engines'.
+    """
+    engines = engines or [KeywordEngine()]
+    extract = page_text_extractor(mode)
+
+    counts = {e.name: {topic: {'tp': 0, 'fp': 0, 'fn': 0} for topic in topics} for e in engines}
+    classify_times = {e.name: [] for e in engines}
+    pages_per_topic = {}
+    extract_times = []
+
+    for pdf_path, label in labelled:
+        for page_num in range(page_count(pdf_path)):
+            if max_pages and pages_per_topic.get(label, 0) >= max_pages:
+                break
+            pages_per_topic[label] = pages_per_topic.get(label, 0) + 1
+
+            start = time.perf_counter()
+            try:
+                text = extract(pdf_path, page_num)
+            except Exception as e:
+                print(f"   ⚠ {pdf_path.name} page {page_num + 1}: {e}")
+                text = ""
+            extract_times.append(time.perf_counter() - start)
+
+            for engine in engines:
+                start = time.perf_counter()
+                predicted = engine.matching_topics(text) & set(topics)
+                classify_times[engine.name].append(time.perf_counter() - start)
+
+                for topic in predicted:
+                    counts[engine.name][topic]['tp' if topic == label else 'fp'] += 1
+                if label not in predicted:
+                    counts[engine.name][label]['fn'] += 1
+
+    primary = engines[0].name
+    page_times = [e + c for e, c in zip(extract_times, classify_times[primary])]
+    total_seconds = sum(page_times)
+    by_engine = {}
+    for name in counts:
+        by_engine[name] = topic_metrics(counts[name], pages_per_topic)
+        by_engine[name]['classify_ms'] = {
+            'p50': round(percentile(classify_times[name], 50) * 1000, 3),
+            'p95': round(percentile(classify_times[name], 95) * 1000, 3),
+        }
+
+    return {
+        'pages': len(page_times),
+        'engine': primary,
+        **by_engine[primary],
+        'pages_per_sec': round(len(page_times) / total_seconds, 2) if total_seconds else 0.0,
+        'latency_ms': {
+            'p50': round(percentile(page_times, 50) * 1000, 2),
+            'p95': round(percentile(page_times, 95) * 1000, 2),
+            'extract_p50': round(percentile(extract_times, 50) * 1000, 2),
+            'classify_p50': by_engine[primary]['classify_ms']['p50'],
+            'classify_p95': by_engine[primary]['classify_ms']['p95'],
+        },
+        'engines': by_engine,
+    }
+
+
+def print_engine_deltas(result: dict):
+    """Precision/recall/F1 of each other engine relative to the first"""
+    base_name = result['engine']
+    base = result['engines'][base_name]
+    for name, other in result['engines'].items():
+        if name == base_name:
+            continue
+        print(f"   {base_name} vs {name}: macro P {other['macro_precision']:.3f} → {base['macro_precision']:.3f}, "
+              f"R {other['macro_recall']:.3f} → {base['macro_recall']:.3f}, "
+              f"F1 {other['macro_f1']:.3f} → {base['macro_f1']:.3f}")
+        false_positives = sum(m['fp'] for m in other['topics'].values()), sum(m['fp'] for m in base['topics'].values())
+        print(f"      false positives {false_positives[0]} → {false_positives[1]}, "
+              f"classify p50 {other['classify_ms']['p50']} → {base['classify_ms']['p50']} ms")
+        for topic, metrics in base['topics'].items():
+            old = other['topics'][topic]
+            if abs(metrics['f1'] - old['f1']) >= 0.005 or metrics['fp'] != old['fp']:
+                print(f"      {topic}: F1 {old['f1']:.3f} → {metrics['f1']:.3f}, FP {old['fp']} → {metrics['fp']}")
+
+
+def print_comparison(current: dict, previous: dict):
+    """F1 changes per mode and topic against a previous results file"""
+    print(f"\nCompared with keywords {previous.get('keyword_version')} ({previous.get('created')}):")
+    for mode, result in current['modes'].items():
+        before = previous.get('modes', {}).get(mode)
+        if not result or not before:
+            continue
+        print(f"   [{mode}] macro F1 {before['macro_f1']:.3f} → {result['macro_f1']:.3f}, "
+              f"{before['pages_per_sec']} → {result['pages_per_sec']} pages/sec")
+        for topic, metrics in result['topics'].items():
+            old = before['topics'].get(topic)
+            if old and abs(metrics['f1'] - old['f1']) >= 0.005:
+                print(f"      {topic}: F1 {old['f1']:.3f} → {metrics['f1']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure topic detection accuracy and speed on the training folders")
+    parser.add_argument('--modes', default='text',
+                        help="Comma-separated extraction modes to evaluate: text, ocr (default: text)")
+    parser.add_argument('--match-modes', default=DEFAULT_MATCH_MODE,
+                        help=f"Comma-separated keyword matchers, the first is reported: "
+                             f"{', '.join(MATCH_MODES)} (default: {DEFAULT_MATCH_MODE})")
+    parser.add_argument('--engines', default='keywords',
+                        help="Comma-separated scoring engines, the first is reported: keywords (in each "
+                             "--match-modes mode), linear (the trained topic model) (default: keywords)")
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help="Evaluate at most this many pages per topic")
+    parser.add_argument('--training-dir', type=Path, default=TRAINING_DIR,
+                        help=f"Labelled topic folders (default: {TRAINING_DIR})")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="Results JSON (default: evaluation/eval_<timestamp>.json)")
+    parser.add_argument('--compare', type=Path, default=None,
+                        help="Previous results JSON to compare against")
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(',') if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    match_modes = [m.strip() for m in args.match_modes.split(',') if m.strip()]
+    unknown = [m for m in match_modes if m not in MATCH_MODES]
+    if unknown or not match_modes:
+        parser.error(f"unknown match mode(s): {', '.join(unknown)}")
+    engines = []
+    for name in [n.strip() for n in args.engines.split(',') if n.strip()]:
+        try:
+            engines += [KeywordEngine(mm) for mm in match_modes] if name == 'keywords' else [get_engine(name)]
+        except ValueError as e:
+            parser.error(str(e))
+
+    print("=" * 60)
+    print("MathsForge AI - Topic Detection Evaluation")
+    print("=" * 60)
+
+    if not args.training_dir.exists():
+        print(f"Error: Training directory not found at {args.training_dir}")
+        return
+
+    labelled = collect_labelled_pdfs(args.training_dir)
+    if not labelled:
+        print("No labelled PDFs found in the training folders.")
+        return
+
+    keywords = get_active_keywords()
+    topics = sorted(set(FOLDER_TO_TOPIC.values()))
+    print(f"\n{len(labelled)} PDFs, {len(topics)} topics, keywords version {keywords.version} ({keywords.source})")
+
+    results = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'keyword_version': keywords.version,
+        'keyword_source': keywords.source,
+        'documents': len(labelled),
+        'max_pages_per_topic': args.max_pages,
+        'modes': {},
+    }
+
+    for mode in modes:
+        print(f"\n⏱ Evaluating {mode} mode...")
+        result = evaluate_mode(labelled, topics, mode, args.max_pages, engines)
+        results['modes'][mode] = result
+        if result:
+            print(f"   {result['pages']} pages: macro P={result['macro_precision']:.3f} "
+                  f"R={result['macro_recall']:.3f} F1={result['macro_f1']:.3f}")
+            print(f"   {result['pages_per_sec']} pages/sec, p50 {result['latency_ms']['p50']} ms, "
+                  f"p95 {result['latency_ms']['p95']} ms")
+            print_engine_deltas(result)
+
+    output = args.output or RESULTS_DIR / f"eval_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to: {output}")
+
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                print_comparison(results, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"   ⚠ Could not compare with {args.compare}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Mark Scheme Page Mapping
+Offline job that works out which questions are on each question paper page and which
+mark scheme pages cover each question, so bundling mark schemes is a dictionary lookup.
+
+Edexcel mark schemes don't line up page-for-page with the question papers
+(general marking guidance up front, several questions per table page), so
+"same page number" picks the wrong pages.
+
+Usage:
+    python markscheme_map.py           # map new/changed papers
+    python markscheme_map.py --force   # rebuild every paper
+"""
+
+import re
+import sys
+import json
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+PAPERS_DIR = BASE_DIR / "papers"
+MS_DIR = BASE_DIR / "markschemes"
+MAP_FILE = BASE_DIR / "markscheme_map.json"
+
+# "(Total for Question 7 is 4 marks)" closes every Edexcel question
+QP_TOTAL_PATTERN = re.compile(r'total\s+for\s+question\s+(\d{1,2})', re.IGNORECASE)
+# Question numbers sit at the start of a line: "7 ", "12 (a)", "3(b)"
+LINE_QUESTION_PATTERN = re.compile(r'^\s*(\d{1,2})\s*(?:\(\s*[a-z]{1,4}\s*\)|\s+\S|$)', re.IGNORECASE)
+# Mark scheme table pages carry a "Question  Working  Answer  Mark  Notes" header
+MS_TABLE_HEADER_WORDS = ('question', 'answer', 'mark')
+
+# Loaded map, memoized with the file's mtime so a rebuild is picked up without a restart
+_map_cache = {'mtime': None, 'data': {}}
+
+
+def _file_signature(path: Path) -> dict:
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def _line_question_numbers(text: str, last_question: int) -> list:
+    """Question numbers starting lines on a page, in order, accepting only plausible next numbers"""
+    found = []
+    for line in text.splitlines():
+        match = LINE_QUESTION_PATTERN.match(line)
+        if not match:
+            continue
+        number = int(match.group(1))
+        # Numbers inside working ("3 x 4 = 12") break the sequence - only accept the next few
+        if last_question < number <= last_question + 2:
+            found.append(number)
+            last_question = number
+    return found
+
+
+def map_question_paper(page_texts: list) -> dict:
+    """Map each question paper page (1-indexed) to the questions on it"""
+    page_questions = {}
+    current = 0
+    closed = set()
+
+    for page_index, text in enumerate(page_texts):
+        questions = []
+        # A question left open on the previous page continues onto this one
+        if current and current not in closed:
+            questions.append(current)
+
+        for number in _line_question_numbers(text, current):
+            if number not in questions:
+                questions.append(number)
+            current = number
+
+        for match in QP_TOTAL_PATTERN.finditer(text):
+            number = int(match.group(1))
+            if number not in questions:
+                questions.append(number)
+            closed.add(number)
+            current = max(current, number)
+
+        if questions:
+            page_questions[page_index + 1] = sorted(questions)
+
+    return page_questions
+
+
+def map_mark_scheme(page_texts: list) -> dict:
+    """Map each question number to the mark scheme pages (1-indexed) that cover it"""
+    question_pages = {}
+    current = 0
+
+    for page_index, text in enumerate(page_texts):
+        text_lower = text.lower()
+        # Skip cover and general marking guidance pages (their numbered lists look like questions)
+        if not all(word in text_lower for word in MS_TABLE_HEADER_WORDS):
+            continue
+
+        page_number = page_index + 1
+        carried_question = current
+        rows_before_first_question = 0
+        past_header = False
+        numbers = []
+
+        for line in text.splitlines():
+            line_lower = line.lower()
+            if not past_header:
+                past_header = 'question' in line_lower and 'answer' in line_lower
+                continue
+            match = LINE_QUESTION_PATTERN.match(line)
+            number = int(match.group(1)) if match else None
+            if number and current < number <= current + 2:
+                numbers.append(number)
+                current = number
+            elif not numbers and line.strip():
+                rows_before_first_question += 1
+
+        # Rows above the first question number continue the previous page's question
+        if carried_question and (not numbers or rows_before_first_question):
+            pages = question_pages.setdefault(carried_question, [])
+            if page_number not in pages:
+                pages.append(page_number)
+
+        for number in numbers:
+            pages = question_pages.setdefault(number, [])
+            if page_number not in pages:
+                pages.append(page_number)
+
+    return question_pages
+
+
+def build_paper_entry(qp_path: Path, ms_path: Path, extract_page_text) -> dict:
+    """Extract text from both PDFs and build the question/page map for one paper"""
+    from pdf_assembly import get_pdf_reader
+
+    qp_texts = [extract_page_text(qp_path, i) for i in range(len(get_pdf_reader(qp_path).pages))]
+    ms_texts = [extract_page_text(ms_path, i) for i in range(len(get_pdf_reader(ms_path).pages))]
+
+    return {
+        'qp': _file_signature(qp_path),
+        'ms': _file_signature(ms_path),
+        'qp_page_questions': {str(k): v for k, v in map_question_paper(qp_texts).items()},
+        'ms_question_pages': {str(k): v for k, v in map_mark_scheme(ms_texts).items()},
+    }
+
+
+def load_markscheme_map() -> dict:
+    """Load the precomputed map (memoized, reloaded if the file changes)"""
+    try:
+        mtime = MAP_FILE.stat().st_mtime
+    except OSError:
+        return {}
+
+    if _map_cache['mtime'] != mtime:
+        try:
+            with open(MAP_FILE) as f:
+                _map_cache['data'] = json.load(f)
+            _map_cache['mtime'] = mtime
+        except (OSError, ValueError) as e:
+            print(f"   ⚠ Could not load mark scheme map: {e}")
+            return {}
+
+    return _map_cache['data']
+
+
+def get_markscheme_pages(paper_name: str, qp_pages: list):
+    """Mark scheme pages (1-indexed, sorted) for the given question paper pages.
+
+    Returns None if the paper hasn't been mapped, or if none of the pages contain
+    a known question, so the caller can fall back to matching page numbers.
+    """
+    entry = load_markscheme_map().get(paper_name)
+    if not entry:
+        return None
+
+    ms_pages = set()
+    for page in qp_pages:
+        for question in entry['qp_page_questions'].get(str(page), []):
+            ms_pages.update(entry['ms_question_pages'].get(str(question), []))
+
+    return sorted(ms_pages) if ms_pages else None
+
+
+def main():
+    force = '--force' in sys.argv
+
+    print("=" * 60)
+    print("MathsForge AI - Mark Scheme Page Mapping")
+    print("=" * 60)
+
+    if not PAPERS_DIR.exists() or not MS_DIR.exists():
+        print(f"Error: expected {PAPERS_DIR} and {MS_DIR}")
+        return
+
+    from paper_archive import find_mark_scheme
+    from pdf_text import extract_text_from_pdf_page
+
+    existing = {} if force else load_markscheme_map()
+    mapping = {}
+
+    for qp_path in sorted(PAPERS_DIR.glob('*.pdf')):
+        ms_path = find_mark_scheme(qp_path.name)
+        if not ms_path:
+            print(f"   ⚠ No mark scheme for {qp_path.name}")
+            continue
+
+        previous = existing.get(qp_path.name)
+        if (previous and previous.get('qp') == _file_signature(qp_path)
+                and previous.get('ms') == _file_signature(ms_path)):
+            mapping[qp_path.name] = previous
+            continue
+
+        print(f"\n📄 Mapping {qp_path.name}")
+        try:
+            entry = build_paper_entry(qp_path, ms_path, extract_text_from_pdf_page)
+        except Exception as e:
+            print(f"   Error mapping {qp_path.name}: {e}")
+            continue
+
+        mapping[qp_path.name] = entry
+        print(f"   ✓ {len(entry['qp_page_questions'])} question pages, "
+              f"{len(entry['ms_question_pages'])} questions in mark scheme")
+
+    # Write atomically so the server never reads a half-written map
+    tmp_file = MAP_FILE.with_suffix('.json.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(mapping, f, indent=2)
+    tmp_file.replace(MAP_FILE)
+
+    print(f"\n✅ Mapped {len(mapping)} papers → {MAP_FILE}")
+
+
+if __name__ == "__main__":
+    main()
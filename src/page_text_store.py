@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Page Text Store
+Extracted page text for the whole archive in one compact file that is memory-mapped
+rather than loaded: nothing is decoded until a page is asked for, and every process
+reading the store shares the same OS page cache instead of holding its own copy.
+
+File layout:
+    b'MFPT' | header length (uint32) | JSON header | page offsets (uint64 × pages+1) | UTF-8 text
+
+The header lists each document (file SHA-1) with its first page index, page count and
+the pages whose text came from OCR; page i's text is blob[offsets[i]:offsets[i + 1]].
+
+Each rewrite goes to a new generation file (page_text_store.1.bin, .2.bin, ...) and readers
+open the newest one, so a file is never replaced while another process has it mapped
+(Windows refuses that). Older generations are deleted once nothing maps them.
+
+Usage:
+    python page_text_store.py                  # index every paper in the archive
+    python page_text_store.py --training       # ... and the training folders
+    python page_text_store.py --info
+"""
+
+import os
+import sys
+import json
+import mmap
+import array
+import struct
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+STORE_FILE = Path(__file__).parent / "page_text_store.bin"
+MAGIC = b'MFPT'
+STORE_FORMAT = 1
+# Bump when page extraction changes so stored text is re-extracted
+EXTRACT_VERSION = 2
+
+_HEADER_LENGTH = struct.Struct('<I')
+_open_store = {'file': None, 'mtime_ns': None, 'store': None}
+
+
+class PageTextStore:
+    """Read-only, memory-mapped view of a page text store file"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:4] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path.name} is not a page text store")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._mmap, 4)
+        header_end = 4 + _HEADER_LENGTH.size + header_length
+        self.header = json.loads(self._mmap[4 + _HEADER_LENGTH.size:header_end])
+        self.documents = self.header['documents']  # doc id -> {'first', 'pages', 'file', 'ocr'}
+
+        page_total = self.header['page_total']
+        offsets_end = header_end + 8 * (page_total + 1)
+        self._offsets = memoryview(self._mmap)[header_end:offsets_end].cast('Q')
+        self._blob_start = offsets_end
+
+    @property
+    def extract_version(self) -> int:
+        return self.header.get('extract_version')
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.documents
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def page_count(self, doc_id: str) -> int:
+        return self.documents[doc_id]['pages']
+
+    def page_bytes(self, doc_id: str, page_num: int) -> bytes:
+        """Raw UTF-8 of a page (0-indexed)"""
+        doc = self.documents[doc_id]
+        if not 0 <= page_num < doc['pages']:
+            raise IndexError(f"page {page_num} out of range for {doc_id}")
+        index = doc['first'] + page_num
+        return self._mmap[self._blob_start + self._offsets[index]:self._blob_start + self._offsets[index + 1]]
+
+    def page_text(self, doc_id: str, page_num: int) -> str:
+        return self.page_bytes(doc_id, page_num).decode('utf-8')
+
+    def page_source(self, doc_id: str, page_num: int) -> str:
+        """'ocr' if the page's text came (wholly or partly) from OCR, else 'text'"""
+        return 'ocr' if page_num in self.documents[doc_id]['ocr'] else 'text'
+
+    def iter_pages(self, doc_id: str):
+        """Each page's text in order, decoded one at a time"""
+        for page_num in range(self.page_count(doc_id)):
+            yield self.page_text(doc_id, page_num)
+
+    def size_report(self) -> dict:
+        return {
+            'documents': len(self.documents),
+            'pages': self.header['page_total'],
+            'bytes': len(self._mmap),
+            'text_bytes': len(self._mmap) - self._blob_start,
+        }
+
+    def close(self):
+        self._offsets.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _generation(path: Path, candidate: Path) -> int:
+    """Generation number of candidate as a generation file of path, or None"""
+    number = candidate.name[len(path.stem) + 1:len(candidate.name) - len(path.suffix)]
+    return int(number) if number.isdigit() else None
+
+
+def store_generations(path: Path) -> list:
+    """The generation files of the store at path, oldest first"""
+    path = Path(path)
+    generations = [(_generation(path, candidate), candidate)
+                   for candidate in path.parent.glob(f"{path.stem}.*{path.suffix}")]
+    return [candidate for _, candidate in sorted(g for g in generations if g[0] is not None)]
+
+
+def current_store_file(path: Path = STORE_FILE) -> Path:
+    """The newest generation of the store at path, or None if it has never been written"""
+    generations = store_generations(path)
+    return generations[-1] if generations else None
+
+
+def remove_old_generations(path: Path):
+    """Delete every generation but the newest (and a pre-generation store file). One that
+    another process still has mapped cannot be deleted on Windows - it goes on a later write.
+    """
+    path = Path(path)
+    for old in store_generations(path)[:-1] + [path]:
+        try:
+            old.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def open_page_text_store(path: Path = STORE_FILE) -> PageTextStore:
+    """The store at path, or None if it is missing, unreadable or from an older extractor"""
+    current = current_store_file(path)
+    if current is None or current.stat().st_size == 0:
+        return None
+    try:
+        store = PageTextStore(current)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"   ⚠ Could not open {current.name}: {e}")
+        return None
+    if store.header.get('format') != STORE_FORMAT or store.extract_version != EXTRACT_VERSION:
+        store.close()
+        return None
+    return store
+
+
+def get_page_text_store() -> PageTextStore:
+    """The default store, opened once per process and reopened when a new generation is written"""
+    current = current_store_file(STORE_FILE)
+    if current is None:
+        return None
+    try:
+        mtime_ns = current.stat().st_mtime_ns
+    except OSError:
+        return None
+    if _open_store['file'] != current or _open_store['mtime_ns'] != mtime_ns:
+        # The previous mapping is left to the garbage collector - callers may still hold it
+        _open_store['store'] = open_page_text_store(STORE_FILE)
+        _open_store['file'] = current
+        _open_store['mtime_ns'] = mtime_ns
+    return _open_store['store']
+
+
+def write_page_text_store(path: Path, documents) -> Path:
+    """Write a store atomically as its next generation file, which is returned.
+
+    documents: iterable of (doc_id, filename, pages, ocr_pages) where pages are str or
+    UTF-8 bytes and ocr_pages lists the (0-indexed) pages whose text came from OCR
+    """
+    path = Path(path)
+    header = {'format': STORE_FORMAT, 'extract_version': EXTRACT_VERSION, 'documents': {}}
+    offsets = array.array('Q', [0])
+    tmp_blob = path.with_suffix('.blob.tmp')
+
+    # Text goes to a scratch file first so only one page is in memory at a time
+    with open(tmp_blob, 'wb') as blob:
+        for doc_id, filename, pages, ocr_pages in documents:
+            header['documents'][doc_id] = {'first': len(offsets) - 1, 'pages': 0, 'file': filename,
+                                           'ocr': sorted(ocr_pages)}
+            for page in pages:
+                data = page.encode('utf-8') if isinstance(page, str) else page
+                blob.write(data)
+                offsets.append(offsets[-1] + len(data))
+                header['documents'][doc_id]['pages'] += 1
+    header['page_total'] = len(offsets) - 1
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode()
+    current = current_store_file(path)
+    generation = _generation(path, current) + 1 if current is not None else 1
+    target = path.with_name(f"{path.stem}.{generation}{path.suffix}")
+    tmp_path = path.with_suffix('.bin.tmp')
+    try:
+        with open(tmp_path, 'wb') as f, open(tmp_blob, 'rb') as blob:
+            f.write(MAGIC)
+            f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+            f.write(header_bytes)
+            f.write(offsets.tobytes())
+            while chunk := blob.read(1024 * 1024):
+                f.write(chunk)
+        # A new name, so the replace never lands on a file a reader has mapped
+        tmp_path.replace(target)
+    finally:
+        tmp_blob.unlink(missing_ok=True)
+    return target
+
+
+def update_page_text_store(path: Path, new_documents: dict) -> PageTextStore:
+    """Rewrite the store with new_documents (doc id -> (filename, pages, ocr_pages)) added;
+    returns it reopened.
+
+    Documents already stored are copied across as raw bytes without decoding. Readers
+    that still have the old generation mapped keep seeing the old contents.
+    """
+    existing = open_page_text_store(path)
+
+    def documents():
+        if existing is not None:
+            for doc_id, doc in existing.documents.items():
+                if doc_id not in new_documents:
+                    yield (doc_id, doc['file'], (existing.page_bytes(doc_id, i) for i in range(doc['pages'])),
+                           doc['ocr'])
+        for doc_id, (filename, pages, ocr_pages) in new_documents.items():
+            yield doc_id, filename, pages, ocr_pages
+
+    write_page_text_store(path, documents())
+    if existing is not None:
+        existing.close()
+    remove_old_generations(path)
+    return open_page_text_store(path)
+
+
+def index_documents(entries: list, workers: int, store_path: Path = STORE_FILE) -> PageTextStore:
+    """Make sure every document is in the store, extracting only the missing ones.
+
+    entries: dicts with 'sha1', 'file' and 'path'. Pages are extracted in parallel,
+    one document per worker process, exactly as the web app extracts them.
+    """
+    import time
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    store = open_page_text_store(store_path)
+    missing = {}
+    for entry in entries:
+        if (store is None or entry['sha1'] not in store) and entry['sha1'] not in missing:
+            missing[entry['sha1']] = entry
+
+    print(f"\n📚 {len(entries) - len(missing)} documents indexed, {len(missing)} to extract")
+    if not missing:
+        return store
+
+    start = time.perf_counter()
+    extracted = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(extract_document_pages, str(e['path'])): e for e in missing.values()}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                pages, ocr_pages = future.result()
+            except Exception as e:
+                print(f"   ⚠ Could not extract {entry['file']}: {e}")
+                continue
+            extracted[entry['sha1']] = (entry['file'], pages, ocr_pages)
+            print(f"   ✓ {entry['file']}: {len(pages)} pages" + (f" ({len(ocr_pages)} OCR)" if ocr_pages else ""))
+    print(f"   Extracted {len(extracted)} documents in {time.perf_counter() - start:.1f}s")
+
+    if store is not None:
+        store.close()
+    return update_page_text_store(store_path, extracted)
+
+
+def extract_document_pages(pdf_path: str) -> tuple:
+    """(text of every page, pages whose text came from OCR) for a PDF (runs in a worker process)"""
+    from pdf_assembly import get_pdf_reader
+    from pdf_text import extract_page_text_with_source
+
+    pages, ocr_pages = [], []
+    for page_num in range(len(get_pdf_reader(pdf_path).pages)):
+        text, source = extract_page_text_with_source(Path(pdf_path), page_num)
+        pages.append(text)
+        if source != 'text':
+            ocr_pages.append(page_num)
+    return pages, ocr_pages
+
+
+def archive_entries() -> list:
+    """Every question paper and mark scheme in the paper archive"""
+    from paper_archive import BASE_DIR, load_manifest
+    return [{**entry, 'path': BASE_DIR / entry['folder'] / entry['file']}
+            for entry in load_manifest()['entries'].values()]
+
+
+def training_entries() -> list:
+    """Every PDF in the labelled training folders"""
+    from train_keywords import TRAINING_DIR, file_hash
+    if not TRAINING_DIR.exists():
+        return []
+    return [{'sha1': file_hash(path), 'file': path.name, 'path': path}
+            for path in sorted(TRAINING_DIR.glob('*/*.pdf'))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped page text store")
+    parser.add_argument('--training', action='store_true',
+                        help="Also index the PDFs in the training folders")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes for page extraction (default: all cores)")
+    parser.add_argument('--store', type=Path, default=STORE_FILE,
+                        help=f"Store file (default: {STORE_FILE})")
+    parser.add_argument('--info', action='store_true', help="Describe the store and exit")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MathsForge AI - Page Text Store")
+    print("=" * 60)
+
+    if not args.info:
+        entries = archive_entries() + (training_entries() if args.training else [])
+        store = index_documents(entries, args.workers, args.store)
+    else:
+        store = open_page_text_store(args.store)
+
+    if store is None:
+        print("\nNo page text store yet.")
+        return
+    report = store.size_report()
+    print(f"\n✅ {report['documents']} documents, {report['pages']} pages, "
+          f"{report['bytes'] // 1024} KB → {store.path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Local Paper Archive Manifest
+Scans papers/ and markschemes/ and records year, session, paper number, page count
+and hash for every PDF in paper_manifest.json, so adding a paper is just dropping
+the file in the folder.
+
+Filename format: YYYY_Session_Paper_N.pdf (e.g. 2024_Jun_Paper_1.pdf), with
+Sample_Paper_N.pdf / SpecimenN_Paper_N.pdf for specimen papers and an optional
+_MS suffix for mark schemes. Anything else falls back to reading the first page.
+
+Usage:
+    python paper_archive.py    # refresh the manifest and print a summary
+"""
+
+import re
+import json
+import hashlib
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+PAPERS_DIR = BASE_DIR / "papers"
+MS_DIR = BASE_DIR / "markschemes"
+MANIFEST_FILE = BASE_DIR / "paper_manifest.json"
+MANIFEST_VERSION = 1
+
+SESSION_NAMES = {
+    'jan': 'January', 'mar': 'March', 'may': 'May/June', 'jun': 'May/June', 'june': 'May/June',
+    'oct': 'November', 'nov': 'November',
+}
+
+DATED_PAPER_PATTERN = re.compile(r'^(20\d\d)_([A-Za-z]+)_Paper_([123])(?:_MS)?$', re.IGNORECASE)
+SAMPLE_PAPER_PATTERN = re.compile(r'^Sample_Paper_([123])(?:_MS)?$', re.IGNORECASE)
+SPECIMEN_PAPER_PATTERN = re.compile(r'^Specimen(\d)_Paper_([123])(?:_MS)?$', re.IGNORECASE)
+
+# Loaded manifest, memoized against the directories' modification times. 'complete' is False
+# for a scan made without first-page detection that left oddly named PDFs out.
+_manifest_cache = {'signature': None, 'manifest': None, 'complete': True}
+
+
+def parse_paper_filename(filename: str) -> dict:
+    """Get year/session/paper number from a conventionally named file, or None"""
+    stem = Path(filename).stem
+
+    match = DATED_PAPER_PATTERN.match(stem)
+    if match:
+        session = SESSION_NAMES.get(match.group(2).lower(), match.group(2).title())
+        return {'year': match.group(1), 'session': session, 'paper_num': match.group(3)}
+
+    match = SAMPLE_PAPER_PATTERN.match(stem)
+    if match:
+        return {'year': 'Specimen', 'session': 'Sample', 'paper_num': match.group(1)}
+
+    match = SPECIMEN_PAPER_PATTERN.match(stem)
+    if match:
+        return {'year': 'Specimen', 'session': f"Specimen {match.group(1)}", 'paper_num': match.group(2)}
+
+    return None
+
+
+def _file_sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _page_count(path: Path) -> int:
+    from pypdf import PdfReader
+    try:
+        return len(PdfReader(path).pages)
+    except Exception as e:
+        print(f"   ⚠ Could not read {path.name}: {e}")
+        return 0
+
+
+def _directory_signature() -> list:
+    """Adding, removing or renaming a PDF changes the directory mtime"""
+    signature = []
+    for directory in (PAPERS_DIR, MS_DIR):
+        try:
+            signature.append(directory.stat().st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return signature
+
+
+def _scan_file(path: Path, kind: str, previous: dict, detect_info) -> dict:
+    """Build (or reuse) the manifest entry for one PDF"""
+    stat = path.stat()
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        return previous
+
+    info = parse_paper_filename(path.name)
+    if info is None and detect_info is not None:
+        # Oddly named file - read the first page to work out what it is
+        detected = detect_info(path)
+        # A recognised mark scheme is kept even when its year and paper can't be read
+        if detected.get('year') or detected.get('paper') or detected.get('is_mark_scheme'):
+            info = {
+                'year': detected.get('year') or 'Unknown',
+                'session': 'Unknown',
+                'paper_num': (detected.get('paper') or 'Paper ?').replace('Paper ', ''),
+            }
+        if detected.get('is_mark_scheme'):
+            kind = 'ms'
+
+    if info is None:
+        print(f"   ⚠ Could not identify {path.name} - skipped")
+        return None
+
+    return {
+        'file': path.name,
+        'folder': path.parent.name,
+        'kind': kind,
+        'year': info['year'],
+        'session': info['session'],
+        'paper_num': info['paper_num'],
+        'pages': _page_count(path),
+        'sha1': _file_sha1(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+
+def build_manifest(detect_info=None, previous: dict = None) -> dict:
+    """Scan papers/ and markschemes/, reusing entries for files that haven't changed"""
+    previous_entries = (previous or {}).get('entries', {})
+    entries = {}
+
+    for directory, kind in ((PAPERS_DIR, 'qp'), (MS_DIR, 'ms')):
+        if not directory.exists():
+            continue
+        for path in sorted(directory.glob('*.pdf')):
+            key = f"{directory.name}/{path.name}"
+            entry = _scan_file(path, kind, previous_entries.get(key), detect_info)
+            if entry:
+                entries[key] = entry
+
+    return {
+        'version': MANIFEST_VERSION,
+        'signature': _directory_signature(),
+        'entries': entries,
+    }
+
+
+def _unidentified_files(manifest: dict) -> list:
+    """PDFs in the folders without a manifest entry (unparseable names, unreadable first pages)"""
+    return [path for directory in (PAPERS_DIR, MS_DIR) if directory.exists()
+            for path in sorted(directory.glob('*.pdf'))
+            if f"{directory.name}/{path.name}" not in manifest['entries']]
+
+
+def load_manifest(detect_info=None) -> dict:
+    """Load the manifest once per process, rescanning only when the folders change"""
+    signature = _directory_signature()
+    if _manifest_cache['manifest'] is not None and _manifest_cache['signature'] == signature:
+        if _manifest_cache['complete'] or detect_info is None:
+            return _manifest_cache['manifest']
+        # A scan without first-page detection skipped oddly named PDFs - finish it now
+        manifest = _manifest_cache['manifest']
+        stale = True
+    else:
+        manifest = None
+        if MANIFEST_FILE.exists():
+            try:
+                with open(MANIFEST_FILE) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"   ⚠ Could not load paper manifest: {e}")
+        stale = not manifest or manifest.get('version') != MANIFEST_VERSION or manifest.get('signature') != signature
+
+    complete = True
+    if stale:
+        print("   📚 Refreshing paper manifest...")
+        manifest = build_manifest(detect_info, previous=manifest)
+        # Without a detector oddly named papers are left out; such a scan is memoized for
+        # callers without one but not saved, so the next call with a detector picks them up
+        complete = detect_info is not None or not _unidentified_files(manifest)
+        if complete:
+            tmp_file = MANIFEST_FILE.with_suffix('.json.tmp')
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                tmp_file.replace(MANIFEST_FILE)
+            except OSError as e:
+                print(f"   ⚠ Could not save paper manifest: {e}")
+
+    _manifest_cache['signature'] = signature
+    _manifest_cache['manifest'] = manifest
+    _manifest_cache['complete'] = complete
+    return manifest
+
+
+def find_mark_scheme(paper_name: str) -> Path:
+    """Mark scheme for a question paper - same filename, or with an _MS suffix"""
+    for candidate in (MS_DIR / paper_name, MS_DIR / f"{Path(paper_name).stem}_MS.pdf"):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def manifest_entry_for(pdf_path) -> dict:
+    """Manifest entry of an archive PDF, or None if it isn't one (or has changed since the scan)"""
+    path = Path(pdf_path)
+    try:
+        resolved = path.resolve()
+        stat = path.stat()
+    except OSError:
+        return None
+    if resolved.parent not in (PAPERS_DIR.resolve(), MS_DIR.resolve()):
+        return None
+    entry = load_manifest()['entries'].get(f"{resolved.parent.name}/{resolved.name}")
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry
+    return None
+
+
+def get_archive_papers(detect_info=None) -> list:
+    """Archive papers and mark schemes in the search result format used by the web app"""
+    papers = []
+
+    for entry in load_manifest(detect_info)['entries'].values():
+        path = str(BASE_DIR / entry['folder'] / entry['file'])
+        year, session_name, paper_num = entry['year'], entry['session'], entry['paper_num']
+        is_mark_scheme = entry['kind'] == 'ms'
+
+        papers.append({
+            'source': 'Local',
+            'title': f"Edexcel GCSE Higher {session_name} {year} Paper {paper_num}" + (" MS" if is_mark_scheme else ""),
+            'url': path,  # Local file path
+            'local_path': path,  # Explicit local path marker
+            'filter_pages': not is_mark_scheme,
+            'year': year,
+            'session': session_name,
+            'paper': f"Paper {paper_num}",
+            'sort_key': f"{year}-{session_name}-{paper_num}" + ("-MS" if is_mark_scheme else ""),
+            'is_mark_scheme': is_mark_scheme,
+            'pages': entry['pages'],
+            'sha1': entry['sha1'],
+        })
+
+    return papers
+
+
+def main():
+    print("=" * 60)
+    print("MathsForge AI - Paper Archive Manifest")
+    print("=" * 60)
+
+    from web_app_v2 import detect_paper_info_from_first_page
+
+    manifest = load_manifest(detect_paper_info_from_first_page)
+
+    entries = manifest['entries'].values()
+    print(f"\n✅ {len([e for e in entries if e['kind'] == 'qp'])} papers, "
+          f"{len([e for e in entries if e['kind'] == 'ms'])} mark schemes → {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+PDF Assembly Helpers for Worksheet Generation
+- Process-wide pool of parsed source PDFs so each paper is parsed once across requests
+- Worksheet writer that dedupes shared fonts/images and compresses page content
+- Writes question and mark scheme PDFs straight to an output stream (e.g. the HTTP socket)
+- Assembles a worksheet (and matching mark scheme pages) from selected pages of several papers
+
+pypdf is imported on first use so that importing this module (and the web app) stays fast.
+"""
+
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import metrics
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+# Upper bound on source PDF bytes kept parsed in memory.
+# pypdf reads the whole file into memory, so file size is a floor on what each reader holds.
+READER_POOL_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ReaderPool:
+    """LRU pool of parsed PdfReader objects keyed by path and modification time.
+
+    A file that changes on disk (new mtime or size) is re-parsed on next access.
+    Readers larger than the whole budget are returned without being pooled.
+    """
+
+    def __init__(self, max_bytes: int = READER_POOL_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._readers = OrderedDict()  # resolved path -> (mtime_ns, size, reader)
+        self._lock = threading.Lock()
+
+    def get(self, pdf_path) -> 'PdfReader':
+        """Return a parsed reader for pdf_path, parsing it only if not already pooled"""
+        path = Path(pdf_path)
+        stat = path.stat()
+        key = str(path.resolve())
+
+        with self._lock:
+            entry = self._readers.get(key)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._readers.move_to_end(key)
+                self.hits += 1
+                metrics.inc('mathsforge_cache_total', cache='pdf_reader', result='hit')
+                return entry[2]
+            if entry:
+                self._remove(key)
+            self.misses += 1
+        metrics.inc('mathsforge_cache_total', cache='pdf_reader', result='miss')
+
+        # Parse outside the lock - this is the slow part
+        from pypdf import PdfReader
+        reader = PdfReader(path)
+
+        if stat.st_size > self.max_bytes:
+            return reader
+
+        with self._lock:
+            if key in self._readers:
+                self._remove(key)
+            self._readers[key] = (stat.st_mtime_ns, stat.st_size, reader)
+            self.total_bytes += stat.st_size
+            while self.total_bytes > self.max_bytes and len(self._readers) > 1:
+                self._remove(next(iter(self._readers)))
+
+        return reader
+
+    def _remove(self, key):
+        _, size, _ = self._readers.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._readers.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            'readers': len(self._readers),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+# Shared by every request handled in this process
+reader_pool = ReaderPool()
+
+
+def get_pdf_reader(pdf_path) -> 'PdfReader':
+    """Get a (possibly cached) parsed PdfReader for a source PDF"""
+    return reader_pool.get(pdf_path)
+
+
+class _PositionTracker:
+    """Write-only stream wrapper that reports how many bytes have passed through it.
+
+    pypdf records xref offsets with tell(), which ZIP entry streams and sockets don't support.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+
+    def write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+
+class _NullSink:
+    """Discards everything written to it - used to measure a PDF's size without I/O"""
+
+    def write(self, data):
+        return len(data)
+
+
+class WorksheetWriter:
+    """PdfWriter wrapper for worksheets assembled from pages of many source papers.
+
+    Pages from the same paper share fonts and images, and every Edexcel paper embeds the
+    same fonts. Before writing, identical indirect objects are merged, orphaned objects
+    dropped and page content streams compressed. Output size is recorded in size_after
+    (bytes); with measure=True the unoptimized size is also recorded in size_before, which
+    costs an extra serialization of the whole PDF.
+    """
+
+    def __init__(self, measure: bool = False):
+        from pypdf import PdfWriter
+        self.writer = PdfWriter()
+        self.measure = measure
+        self.page_count = 0
+        self.size_before = None
+        self.size_after = None
+        self._optimized = False
+
+    def add_page(self, page):
+        self.writer.add_page(page)
+        self.page_count += 1
+        self._optimized = False
+
+    def optimize(self):
+        """Dedupe shared resources and compress content streams (idempotent)"""
+        if self._optimized:
+            return
+        if self.measure:
+            self.size_before = write_pdf_to_stream(self.writer, _NullSink())
+
+        for page in self.writer.pages:
+            try:
+                page.compress_content_streams()
+            except Exception as e:
+                print(f"      Content stream compression skipped: {e}")
+
+        # Available in pypdf 5+; hashes every indirect object and rewires references to one copy
+        if hasattr(self.writer, 'compress_identical_objects'):
+            self.writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+
+        self._optimized = True
+
+    def write(self, stream) -> int:
+        """Optimize, then write to stream. Returns the number of bytes written"""
+        with metrics.span('write'):
+            self.optimize()
+            self.size_after = write_pdf_to_stream(self.writer, stream)
+        if self.size_before:
+            saved = 100 * (self.size_before - self.size_after) / self.size_before
+            print(f"   🗜 PDF size: {self.size_before // 1024} KB → {self.size_after // 1024} KB ({saved:.0f}% smaller)")
+        return self.size_after
+
+    def size_report(self) -> dict:
+        return {
+            'pages': self.page_count,
+            'bytes_before': self.size_before,
+            'bytes_after': self.size_after,
+        }
+
+
+def assemble_worksheet(collected: list, include_mark_schemes: bool = False, measure: bool = False) -> dict:
+    """Build question and mark scheme writers from pages selected across several papers.
+
+    Args:
+        collected: List of {'pdfPath': path, 'pages': [1-indexed page numbers]}
+        include_mark_schemes: Also collect the mark scheme pages for those questions
+        measure: Record each PDF's size before optimization (see WorksheetWriter)
+
+    Returns dict with 'questions' (WorksheetWriter), 'mark_schemes' (WorksheetWriter or None),
+    'papers' (source PDFs read), 'question_pages', 'mark_scheme_pages' and 'warnings'
+    """
+    from markscheme_map import get_markscheme_pages
+    from paper_archive import find_mark_scheme
+
+    questions_writer = WorksheetWriter(measure)
+    ms_writer = WorksheetWriter(measure) if include_mark_schemes else None
+    result = {'questions': questions_writer, 'mark_schemes': ms_writer,
+              'papers': 0, 'question_pages': 0, 'mark_scheme_pages': 0, 'warnings': []}
+
+    def warn(message):
+        print(f"   ⚠ {message}")
+        result['warnings'].append(message)
+
+    # First pass: Add all question pages
+    mark_scheme_info = []
+    for item in collected:
+        pdf_path = Path(item.get('pdfPath', ''))
+        pages = item.get('pages', [])
+
+        print(f"   Adding {len(pages)} pages from {pdf_path.name}")
+
+        if not pdf_path.exists():
+            warn(f"PDF not found: {pdf_path}")
+            continue
+
+        try:
+            reader = get_pdf_reader(pdf_path)
+            for page_num in pages:
+                if 0 <= page_num - 1 < len(reader.pages):
+                    questions_writer.add_page(reader.pages[page_num - 1])
+                    result['question_pages'] += 1
+            result['papers'] += 1
+
+            # Track mark scheme info for this paper
+            if include_mark_schemes:
+                mark_scheme_info.append({'paper_path': pdf_path, 'pages': pages})
+        except Exception as e:
+            warn(f"Error reading {pdf_path}: {e}")
+
+    # Second pass: the mark scheme pages covering the same questions
+    for ms_info in mark_scheme_info:
+        paper_path = ms_info['paper_path']
+        pages = ms_info['pages']
+
+        # Find corresponding mark scheme file
+        ms_path = find_mark_scheme(paper_path.name)
+        if not ms_path:
+            warn(f"Mark scheme not found for: {paper_path.name}")
+            continue
+
+        # Precomputed question → mark scheme page map (markscheme_map.py)
+        ms_pages = get_markscheme_pages(paper_path.name, pages)
+        if ms_pages is None:
+            warn(f"{paper_path.name} not in mark scheme map - assuming matching page numbers")
+            ms_pages = pages
+
+        try:
+            ms_reader = get_pdf_reader(ms_path)
+            for page_num in ms_pages:
+                if 0 <= page_num - 1 < len(ms_reader.pages):
+                    ms_writer.add_page(ms_reader.pages[page_num - 1])
+                    result['mark_scheme_pages'] += 1
+        except Exception as e:
+            warn(f"Error reading mark scheme {ms_path}: {e}")
+
+    return result
+
+
+def write_pdf_to_stream(writer, stream) -> int:
+    """Serialize a PdfWriter to any writable stream, returns the number of bytes written"""
+    tracker = _PositionTracker(stream)
+    writer.write(tracker)
+    return tracker.position
+
+
+def stream_zip_bundle(output, entries: list) -> dict:
+    """Stream a ZIP of PDFs to `output`, one entry at a time.
+
+    Args:
+        output: Writable (possibly unseekable) stream such as BaseHTTPRequestHandler.wfile
+        entries: List of (archive_name, PdfWriter) tuples
+
+    PDFs are already compressed internally, so entries are STORED rather than deflated.
+    On an unseekable stream zipfile writes sizes/CRCs in data descriptors after each entry,
+    so nothing is buffered beyond the PDF currently being written.
+
+    Returns dict of archive_name -> bytes written
+    """
+    sizes = {}
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as zf:
+        for arcname, writer in entries:
+            with zf.open(arcname, 'w') as dest:
+                sizes[arcname] = write_pdf_to_stream(writer, dest)
+    return sizes
@@ -0,0 +1,262 @@
+"""
+MathsForge AI - PDF Text Extraction
+Text layer extraction and enhanced OCR for PDF pages, shared by the web app and the
+command line tools. Heavy dependencies (pdfplumber, pypdf, pypdfium2, OpenCV,
+pytesseract, PIL) are imported on first use, so importing this module is cheap.
+"""
+
+import time
+import warnings
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+
+import metrics
+from metrics import span, timed
+
+# Suppress pdfplumber color space warnings
+warnings.filterwarnings('ignore', message='.*Cannot set.*color.*')
+
+
+@lru_cache(maxsize=None)
+def enhanced_ocr_available() -> bool:
+    """True if OpenCV, pytesseract and the Tesseract binary are all installed (checked once).
+
+    The OCR imports happen inside the OCR functions, so importing this module says nothing
+    about whether OCR will work.
+    """
+    if importlib.util.find_spec('cv2') is None or importlib.util.find_spec('pytesseract') is None:
+        return False
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def preprocess_image_for_ocr(pil_image, timings: dict = None):
+    """Preprocess image for optimal OCR accuracy using OpenCV techniques
+
+    If a timings dict is given, the seconds spent in each stage are recorded in it.
+    """
+    import cv2
+    import numpy as np
+    from PIL import Image
+
+    last = [time.perf_counter()]
+
+    def stage_done(name):
+        if timings is not None:
+            now = time.perf_counter()
+            timings[name] = now - last[0]
+            last[0] = now
+
+    # Convert PIL to OpenCV format
+    img = np.array(pil_image)
+
+    # Convert to grayscale if needed
+    if len(img.shape) == 3:
+        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    else:
+        gray = img
+    stage_done('grayscale')
+
+    # 1. Denoise the image
+    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+    stage_done('denoise')
+
+    # 2. Apply adaptive thresholding for better text contrast
+    # This handles varying lighting conditions across the page
+    binary = cv2.adaptiveThreshold(
+        denoised, 255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY,
+        31, 10  # Block size and constant
+    )
+    stage_done('threshold')
+
+    # 3. Deskew if needed (fix rotated scans)
+    coords = np.column_stack(np.where(binary < 255))
+    if len(coords) > 100:
+        angle = cv2.minAreaRect(coords)[-1]
+        if angle < -45:
+            angle = 90 + angle
+        if abs(angle) > 0.5 and abs(angle) < 10:  # Only deskew if slightly rotated
+            (h, w) = binary.shape[:2]
+            center = (w // 2, h // 2)
+            M = cv2.getRotationMatrix2D(center, angle, 1.0)
+            binary = cv2.warpAffine(binary, M, (w, h),
+                                     flags=cv2.INTER_CUBIC,
+                                     borderMode=cv2.BORDER_REPLICATE)
+    stage_done('deskew')
+
+    # 4. Morphological operations to clean up
+    kernel = np.ones((1, 1), np.uint8)
+    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+    stage_done('morphology')
+
+    # 5. Add small border (helps Tesseract detect edge text)
+    binary = cv2.copyMakeBorder(binary, 10, 10, 10, 10,
+                                 cv2.BORDER_CONSTANT, value=255)
+
+    # Convert back to PIL
+    result = Image.fromarray(binary)
+    stage_done('border')
+    return result
+
+
+@timed('ocr')
+def extract_text_with_enhanced_ocr(pdf_path: Path, page_num: int) -> str:
+    """Extract text using enhanced OCR with preprocessing for 95%+ accuracy"""
+    metrics.inc('mathsforge_pages_total', operation='ocr')
+    try:
+        import pytesseract
+
+        import pypdfium2 as pdfium
+
+        # Render page at high DPI (300 for optimal OCR)
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        page = pdf[page_num]
+        # Scale 4.0 ≈ 300 DPI which is optimal for OCR
+        bitmap = page.render(scale=4.0)
+        pil_image = bitmap.to_pil()
+        pdf.close()
+
+        # Preprocess the image for better OCR
+        processed_image = preprocess_image_for_ocr(pil_image)
+
+        # Configure Tesseract for best accuracy
+        # --oem 3: Use LSTM neural network (best accuracy)
+        # --psm 3: Fully automatic page segmentation
+        # -c preserve_interword_spaces=1: Keep proper spacing
+        custom_config = r'--oem 3 --psm 3 -c preserve_interword_spaces=1'
+
+        # Run OCR with enhanced settings
+        ocr_text = pytesseract.image_to_string(
+            processed_image,
+            lang='eng',
+            config=custom_config
+        )
+
+        return ocr_text.strip()
+
+    except Exception as e:
+        print(f"      Enhanced OCR error: {e}")
+        return ""
+
+
+def extract_text_from_pdf_page(pdf_path: Path, page_num: int, force_ocr: bool = False) -> str:
+    """Extract text from a PDF page using multiple methods for better results
+
+    Args:
+        pdf_path: Path to PDF file
+        page_num: Page number (0-indexed)
+        force_ocr: If True, always use OCR even if text extraction works
+    """
+    return extract_page_text_with_source(pdf_path, page_num, force_ocr)[0]
+
+
+def _pdfplumber_page_text(page) -> str:
+    """Text of a pdfplumber page, with the text of its tables appended"""
+    text = page.extract_text() or ""
+
+    # Also try extracting text from tables
+    tables = page.extract_tables()
+    for table in tables:
+        for row in table:
+            if row:
+                text += " " + " ".join([str(cell) for cell in row if cell])
+    return text
+
+
+def _with_pypdf_fallback(pdf_path: Path, page_num: int, text: str) -> str:
+    """pypdf's text for the page if pdfplumber got almost nothing and pypdf gets more"""
+    if len(text) >= 50:
+        return text
+    try:
+        from pdf_assembly import get_pdf_reader
+        reader = get_pdf_reader(pdf_path)
+        if page_num < len(reader.pages):
+            pypdf_text = reader.pages[page_num].extract_text() or ""
+            if len(pypdf_text) > len(text):
+                text = pypdf_text
+    except Exception as e:
+        print(f"      pypdf error: {e}")
+    return text
+
+
+def extract_text_layers(pdf_path: Path) -> list:
+    """Text layer of every page, without OCR, exactly as extract_page_text_with_source reads
+    it before deciding whether to OCR - pass a page's entry back to it as text_layer so the
+    page isn't extracted twice. The PDF is opened once for all pages.
+    """
+    from pdf_assembly import get_pdf_reader
+
+    page_count = len(get_pdf_reader(pdf_path).pages)
+    texts = [""] * page_count
+    metrics.inc('mathsforge_pages_total', page_count, operation='extract')
+    with span('extract'):
+        try:
+            import pdfplumber
+            with pdfplumber.open(pdf_path) as pdf:
+                for page_num, page in enumerate(pdf.pages[:page_count]):
+                    try:
+                        texts[page_num] = _pdfplumber_page_text(page)
+                    except Exception as e:
+                        print(f"      pdfplumber error: {e}")
+        except Exception as e:
+            print(f"      pdfplumber error: {e}")
+        return [_with_pypdf_fallback(pdf_path, page_num, text) for page_num, text in enumerate(texts)]
+
+
+def extract_page_text_with_source(pdf_path: Path, page_num: int, force_ocr: bool = False,
+                                  text_layer: str = None) -> tuple:
+    """As extract_text_from_pdf_page, returning (text, source) where source says where the
+    text came from: 'text' (the PDF text layer), 'ocr' or 'combined' (both) - OCR text
+    should be matched with the OCR-tolerant keyword mode
+
+    text_layer: the page's entry from extract_text_layers, used instead of re-extracting it
+    """
+    text = ""
+    ocr_text = ""
+    source = 'text'
+
+    if text_layer is not None and not force_ocr:
+        text = text_layer
+    else:
+        metrics.inc('mathsforge_pages_total', operation='extract')
+        with span('extract'):
+            # Method 1: Try pdfplumber first (best for text-based PDFs)
+            if not force_ocr:
+                try:
+                    import pdfplumber
+                    with pdfplumber.open(pdf_path) as pdf:
+                        if page_num < len(pdf.pages):
+                            text = _pdfplumber_page_text(pdf.pages[page_num])
+                except Exception as e:
+                    print(f"      pdfplumber error: {e}")
+
+                # Method 2: Try pypdf as backup (sometimes gets different text)
+                text = _with_pypdf_fallback(pdf_path, page_num, text)
+
+    # Method 3: Enhanced OCR with preprocessing
+    # Use OCR if text extraction failed OR if force_ocr is True
+    # Also use OCR as a supplement for scanned documents that may have some embedded text
+    if len(text) < 100 or force_ocr:
+        ocr_text = extract_text_with_enhanced_ocr(pdf_path, page_num)
+
+        if len(ocr_text) > len(text):
+            print(f"      📷 Using enhanced OCR ({len(ocr_text)} chars vs {len(text)} from text extraction)")
+            text = ocr_text
+            source = 'ocr'
+        elif ocr_text and len(text) < 200:
+            # Combine both if text extraction got little
+            combined = text + " " + ocr_text
+            # Remove duplicates by using set of words
+            words = list(dict.fromkeys(combined.lower().split()))
+            text = " ".join(words)
+            source = 'combined'
+            print(f"      📷 Combined text extraction + OCR ({len(text)} chars)")
+
+    return text, source
@@ -0,0 +1,153 @@
+"""
+MathsForge AI - Slow Request Profiling
+Opt-in cProfile capture for POST requests. Every request is profiled while it runs,
+but a profile is only kept if the request took longer than the threshold. Kept
+profiles are saved as <timestamp>_<endpoint>_<request id>.prof (open with pstats
+or snakeviz) next to a .json summary of the request and its hottest functions.
+
+Enable with an environment variable:
+    MATHSFORGE_PROFILE_SLOW_SECONDS=20 python web_app_v2.py
+"""
+
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+THRESHOLD_ENV = "MATHSFORGE_PROFILE_SLOW_SECONDS"
+# Oldest profiles beyond this many are deleted
+MAX_PROFILES = 50
+# Functions listed in each JSON summary
+TOP_FUNCTIONS = 15
+
+
+def summarize_payload(payload) -> dict:
+    """Small description of a request body - list lengths and short strings, never whole values"""
+    if not isinstance(payload, dict):
+        return {}
+    summary = {}
+    for key, value in payload.items():
+        if isinstance(value, (list, dict)):
+            summary[key] = f"<{type(value).__name__} of {len(value)}>"
+        elif isinstance(value, str) and len(value) > 80:
+            summary[key] = value[:77] + '...'
+        else:
+            summary[key] = value
+    return summary
+
+
+def _top_functions(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list:
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            'function': f"{Path(filename).name}:{line}({function})",
+            'calls': calls,
+            'own_seconds': round(own, 4),
+            'cumulative_seconds': round(cumulative, 4),
+        })
+    rows.sort(key=lambda row: -row['cumulative_seconds'])
+    return rows[:limit]
+
+
+class SlowRequestProfiler:
+    """Profiles requests and keeps the ones slower than threshold seconds.
+
+    A threshold of None disables profiling entirely (no overhead).
+    """
+
+    def __init__(self, directory: Path, threshold: float = None, max_profiles: int = MAX_PROFILES):
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.max_profiles = max_profiles
+
+    @classmethod
+    def from_environment(cls, directory: Path):
+        value = os.environ.get(THRESHOLD_ENV, '').strip()
+        try:
+            threshold = float(value) if value else None
+        except ValueError:
+            print(f"   ⚠ Ignoring {THRESHOLD_ENV}={value!r} (expected seconds)")
+            threshold = None
+        return cls(directory, threshold)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold is not None
+
+    @contextmanager
+    def profile(self, endpoint: str):
+        """Profile the block; yields a dict the caller can fill with request details to save"""
+        details = {}
+        if not self.enabled:
+            yield details
+            return
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield details
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                try:
+                    self._save(profiler, endpoint, duration, details)
+                except Exception as e:
+                    print(f"   ⚠ Could not save profile: {e}")
+
+    def _save(self, profiler: cProfile.Profile, endpoint: str, duration: float, details: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        now = datetime.now()
+        slug = endpoint.strip('/').replace('/', '_') or 'root'
+        name = f"{now:%Y%m%d_%H%M%S}_{slug}_{details.get('request_id', 'request')}"
+
+        profiler.dump_stats(str(self.directory / f"{name}.prof"))
+        summary = {
+            'name': name,
+            'profile': f"{name}.prof",
+            'endpoint': endpoint,
+            'request_id': details.get('request_id'),
+            'seconds': round(duration, 3),
+            'threshold_seconds': self.threshold,
+            'created': now.isoformat(timespec='seconds'),
+            'payload': details.get('payload', {}),
+            'top_functions': _top_functions(profiler),
+        }
+        with open(self.directory / f"{name}.json", 'w') as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"   🐢 Slow request ({duration:.1f}s > {self.threshold}s) profiled → {name}.prof")
+
+        self._prune()
+
+    def _prune(self):
+        summaries = sorted(self.directory.glob('*.json'))
+        for old in summaries[:-self.max_profiles]:
+            old.unlink(missing_ok=True)
+            old.with_suffix('.prof').unlink(missing_ok=True)
+
+    def recent(self, limit: int = 20) -> list:
+        """Summaries of the most recent slow-request profiles, newest first"""
+        if not self.directory.exists():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob('*.json'), reverse=True)[:limit]:
+            try:
+                with open(path) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def profile_path(self, filename: str) -> Path:
+        """Path of a saved .prof file, or None if the name isn't one of ours"""
+        path = self.directory / Path(filename).name
+        if path.suffix == '.prof' and path.exists():
+            return path
+        return None
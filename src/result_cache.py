@@ -0,0 +1,235 @@
+"""
+MathsForge AI - Worksheet Result Cache
+Final responses of the expensive endpoints (/api/ai-process-papers JSON, /api/generate-multi
+PDF or ZIP) stored on disk, keyed by a canonical hash of the request plus everything
+the answer depends on: the keyword table version and the size/mtime of every source PDF.
+Two teachers asking for the same topic and papers get the second answer instantly.
+
+Entries expire after a TTL and the least recently used are evicted over a size cap.
+Configure with environment variables (0 MB disables the cache):
+    MATHSFORGE_RESULT_CACHE_MB=500 MATHSFORGE_RESULT_CACHE_TTL_HOURS=24 python web_app_v2.py
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+
+import metrics
+
+MAX_BYTES_ENV = "MATHSFORGE_RESULT_CACHE_MB"
+TTL_ENV = "MATHSFORGE_RESULT_CACHE_TTL_HOURS"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# Bump when cached response formats change so old entries are ignored
+CACHE_FORMAT = 1
+
+
+def source_stamp(source: str) -> list:
+    """Identity of a request input: a local PDF's resolved path, size and mtime, or the URL itself"""
+    path = Path(source)
+    try:
+        stat = path.stat()
+    except (OSError, ValueError):
+        return [source]
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def request_key(endpoint: str, request: dict, sources: list, keyword_version: str) -> str:
+    """Canonical hash of a normalized request and the versions of what it reads"""
+    canonical = json.dumps({
+        'format': CACHE_FORMAT,
+        'endpoint': endpoint,
+        'request': request,
+        'sources': [source_stamp(s) for s in sources],
+        'keywords': keyword_version,
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+class CaptureWriter:
+    """Passes writes through to a stream while keeping a copy, up to limit bytes"""
+
+    def __init__(self, stream, limit: int):
+        self.stream = stream
+        self.limit = limit
+        self.chunks = []
+        self.size = 0
+        self.overflowed = False
+
+    def write(self, data) -> int:
+        written = self.stream.write(data)
+        if not self.overflowed:
+            self.size += len(data)
+            if self.size > self.limit:
+                self.overflowed = True
+                self.chunks = []
+            else:
+                self.chunks.append(bytes(data))
+        return written if written is not None else len(data)
+
+    def flush(self):
+        self.stream.flush()
+
+    def getvalue(self) -> bytes:
+        """Everything written, or None if it was larger than the limit"""
+        return None if self.overflowed else b''.join(self.chunks)
+
+
+class ResultCache:
+    """On-disk cache of response bodies with a TTL and an LRU size cap.
+
+    Each entry is <key>.bin (the body) and <key>.json (content type, headers, metadata).
+    An entry can list files it refers to in 'requires' (e.g. downloaded PDFs whose paths
+    are in the response); it is treated as a miss once any of them is deleted.
+    A max_bytes of 0 disables the cache.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._index = None  # key -> entry metadata, loaded on first use
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, directory: Path):
+        settings = {}
+        for name, setting, scale in ((MAX_BYTES_ENV, 'max_bytes', 1024 * 1024),
+                                     (TTL_ENV, 'ttl_seconds', 60 * 60)):
+            value = os.environ.get(name, '').strip()
+            if not value:
+                continue
+            try:
+                settings[setting] = float(value) * scale
+            except ValueError:
+                print(f"   ⚠ Ignoring {name}={value!r} (expected a number)")
+        if 'max_bytes' in settings:
+            settings['max_bytes'] = int(settings['max_bytes'])
+        return cls(directory, **settings)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def max_entry_bytes(self) -> int:
+        """Largest single body worth keeping - a quarter of the cap"""
+        return self.max_bytes // 4
+
+    def _load_index(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        if not self.directory.exists():
+            return
+        for path in self.directory.glob('*.json'):
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if entry.get('format') == CACHE_FORMAT and path.with_suffix('.bin').exists():
+                self._index[path.stem] = entry
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        for suffix in ('.bin', '.json'):
+            (self.directory / f"{key}{suffix}").unlink(missing_ok=True)
+
+    def _is_valid(self, entry: dict) -> bool:
+        if time.time() - entry['created'] > self.ttl_seconds:
+            return False
+        return all(Path(p).exists() for p in entry.get('requires', []))
+
+    def get(self, key: str) -> tuple:
+        """(body bytes, entry metadata) for a fresh entry, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            entry = self._index.get(key)
+            if entry is not None and not self._is_valid(entry):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                try:
+                    body = (self.directory / f"{key}.bin").read_bytes()
+                except OSError:
+                    self._remove(key)
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                metrics.inc('mathsforge_cache_total', cache='result', result='miss')
+                return None
+            entry['last_used'] = time.time()
+            self.hits += 1
+        metrics.inc('mathsforge_cache_total', cache='result', result='hit')
+        return body, entry
+
+    def put(self, key: str, body: bytes, content_type: str, headers: dict = None,
+            requires: list = None, meta: dict = None):
+        """Store a response body; bodies over max_entry_bytes are not kept"""
+        if not self.enabled or body is None or len(body) > self.max_entry_bytes:
+            return
+        now = time.time()
+        entry = {
+            'format': CACHE_FORMAT,
+            'content_type': content_type,
+            'headers': headers or {},
+            'requires': [str(p) for p in requires or []],
+            'meta': meta or {},
+            'size': len(body),
+            'created': now,
+            'last_used': now,
+        }
+        with self._lock:
+            self._load_index()
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Body first, then metadata - an entry only counts once its .json exists
+                tmp_path = self.directory / f"{key}.bin.tmp"
+                tmp_path.write_bytes(body)
+                tmp_path.replace(self.directory / f"{key}.bin")
+                tmp_path = self.directory / f"{key}.json.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(entry, f)
+                tmp_path.replace(self.directory / f"{key}.json")
+            except OSError as e:
+                print(f"   ⚠ Could not cache result: {e}")
+                return
+            self._index[key] = entry
+            self._evict()
+
+    def _evict(self):
+        for key in [k for k, e in self._index.items() if not self._is_valid(e)]:
+            self._remove(key)
+        total = sum(e['size'] for e in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]['size']
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._load_index()
+            return {
+                'entries': len(self._index),
+                'bytes': sum(e['size'] for e in self._index.values()),
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Archive Page Score Matrix
+Every archive question paper page scored against every topic once, kept as NumPy arrays:
+    scores  pages × topics int16 (page_confidence scores, 0 for blank/short pages)
+    doc     int32 index into the document list
+    page    int16 page number (1-indexed)
+    year    int16 (0 for specimen papers)
+    paper   int8 paper number
+Filtering by score, year and paper and ranking the top pages for a topic are then
+array operations rather than a loop over pages. The arrays are saved as .npy next to
+the page text store and memory-mapped on load, so opening the matrix copies nothing.
+
+Pages whose text came from OCR are scored with the OCR-tolerant match mode. The matrix is
+only used while the keyword tables and match modes are the ones it was built with.
+
+Usage:
+    python score_matrix.py            # index the archive text if needed, then score every page
+    python score_matrix.py --info
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from strict_keywords import (DEFAULT_MATCH_MODE, HIGH_SCORE, OCR_MATCH_MODE, POSSIBLE_SCORE, get_active_keywords,
+                             get_keyword_version, match_mode_for_source, page_confidence, resolve_topic)
+
+MATRIX_DIR = Path(__file__).parent / "score_matrix"
+MATRIX_FORMAT = 2
+ARRAYS = ('scores', 'doc', 'page', 'year', 'paper')
+
+_loaded = {'mtime_ns': None, 'matrix': None}
+
+
+def document_key(entry: dict) -> str:
+    """A paper's key in the matrix - its manifest key, so identical files under two names stay separate"""
+    return f"{entry['folder']}/{entry['file']}"
+
+
+class ScoreMatrix:
+    """Topic scores for every archive page, with vectorized selection"""
+
+    def __init__(self, meta: dict, arrays: dict):
+        self.meta = meta
+        self.topics = meta['topics']
+        self.documents = meta['documents']  # [{'key', 'sha1', 'file'}] indexed by doc
+        self.keyword_version = meta['keyword_version']
+        self.match_mode = meta['match_mode']
+        self.ocr_match_mode = meta['ocr_match_mode']
+        self._topic_index = {topic: i for i, topic in enumerate(self.topics)}
+        self._doc_index = {doc['key']: i for i, doc in enumerate(self.documents)}
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._doc_index
+
+    def __len__(self) -> int:
+        return len(self.page)
+
+    def is_current(self) -> bool:
+        return (self.keyword_version == get_keyword_version() and self.match_mode == DEFAULT_MATCH_MODE
+                and self.ocr_match_mode == OCR_MATCH_MODE)
+
+    def select(self, topic: str, min_score: int = POSSIBLE_SCORE, years: tuple = None,
+               papers: list = None, documents: list = None, top_k: int = None) -> np.ndarray:
+        """Row indices of pages scoring at least min_score for topic, best first.
+
+        years: (from, to) inclusive - specimen papers (year 0) are excluded when given
+        papers: paper numbers to keep; documents: document keys to keep
+        Ties keep document then page order.
+        """
+        key = resolve_topic(topic)
+        if key not in self._topic_index:
+            return np.empty(0, dtype=np.intp)
+        column = self.scores[:, self._topic_index[key]]
+
+        mask = column >= min_score
+        if years:
+            mask &= (self.year >= int(years[0])) & (self.year <= int(years[1]))
+        if papers:
+            mask &= np.isin(self.paper, [int(p) for p in papers])
+        if documents is not None:
+            wanted = [self._doc_index[key] for key in documents if key in self._doc_index]
+            mask &= np.isin(self.doc, wanted)
+
+        rows = np.flatnonzero(mask)
+        # lexsort sorts by the last key first: score descending, then document, then page
+        rows = rows[np.lexsort((self.page[rows], self.doc[rows], -column[rows]))]
+        return rows[:top_k] if top_k else rows
+
+    def page_regions(self, topic: str, bins: int = 10, min_score: int = HIGH_SCORE) -> np.ndarray:
+        """Share of the topic's pages falling in each of `bins` equal slices of a paper
+        (slice 0 is the start), or None if no archive page scores min_score for it
+        """
+        rows = self.select(topic, min_score=min_score)
+        if not len(rows):
+            return None
+        page_counts = np.bincount(self.doc)
+        position = (self.page[rows] - 1) / page_counts[self.doc[rows]]
+        counts = np.bincount(np.minimum((position * bins).astype(np.intp), bins - 1), minlength=bins)
+        return counts / counts.sum()
+
+    def describe(self, rows: np.ndarray, topic: str) -> list:
+        """[{'key', 'sha1', 'file', 'page', 'score', 'confidence'}] for selected rows"""
+        column = self.scores[:, self._topic_index[resolve_topic(topic)]]
+        results = []
+        for row in rows:
+            doc = self.documents[self.doc[row]]
+            score = int(column[row])
+            results.append({
+                'key': doc['key'],
+                'sha1': doc['sha1'],
+                'file': doc['file'],
+                'page': int(self.page[row]),
+                'score': score,
+                'confidence': 'high' if score >= HIGH_SCORE else 'medium',
+            })
+        return results
+
+
+def build_score_matrix(store, entries: list) -> ScoreMatrix:
+    """Score every page of every entry (manifest dicts) that is in the page text store"""
+    topics = list(get_active_keywords().tables)
+    entries = [e for e in entries if e['sha1'] in store]
+    total = sum(store.page_count(e['sha1']) for e in entries)
+
+    scores = np.zeros((total, len(topics)), dtype=np.int16)
+    doc = np.zeros(total, dtype=np.int32)
+    page = np.zeros(total, dtype=np.int16)
+    year = np.zeros(total, dtype=np.int16)
+    paper = np.zeros(total, dtype=np.int8)
+
+    row = 0
+    for doc_num, entry in enumerate(entries):
+        for page_num, text in enumerate(store.iter_pages(entry['sha1'])):
+            match_mode = match_mode_for_source(store.page_source(entry['sha1'], page_num))
+            for col, topic in enumerate(topics):
+                scores[row, col] = min(page_confidence(text, topic, match_mode)[1], np.iinfo(np.int16).max)
+            doc[row] = doc_num
+            page[row] = page_num + 1
+            year[row] = int(entry['year']) if entry['year'].isdigit() else 0
+            paper[row] = int(entry['paper_num']) if entry['paper_num'].isdigit() else 0
+            row += 1
+
+    meta = {
+        'format': MATRIX_FORMAT,
+        'keyword_version': get_keyword_version(),
+        'match_mode': DEFAULT_MATCH_MODE,
+        'ocr_match_mode': OCR_MATCH_MODE,
+        'topics': topics,
+        'documents': [{'key': document_key(e), 'sha1': e['sha1'], 'file': e['file']} for e in entries],
+    }
+    return ScoreMatrix(meta, {'scores': scores, 'doc': doc, 'page': page, 'year': year, 'paper': paper})
+
+
+def save_score_matrix(matrix: ScoreMatrix, directory: Path = MATRIX_DIR):
+    """Write the arrays, then meta.json last - loading goes by meta.json's mtime"""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name in ARRAYS:
+        tmp_path = directory / f"{name}.tmp.npy"
+        np.save(tmp_path, getattr(matrix, name))
+        tmp_path.replace(directory / f"{name}.npy")
+    tmp_path = directory / "meta.json.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(matrix.meta, f)
+    tmp_path.replace(directory / "meta.json")
+
+
+def load_score_matrix(directory: Path = MATRIX_DIR) -> ScoreMatrix:
+    """The saved matrix with its arrays memory-mapped, or None if missing or unreadable"""
+    try:
+        with open(directory / "meta.json") as f:
+            meta = json.load(f)
+        if meta.get('format') != MATRIX_FORMAT:
+            return None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode='r') for name in ARRAYS}
+        return ScoreMatrix(meta, arrays)
+    except (OSError, ValueError, KeyError) as e:
+        if (directory / "meta.json").exists():
+            print(f"   ⚠ Could not load score matrix: {e}")
+        return None
+
+
+def get_score_matrix() -> ScoreMatrix:
+    """The saved matrix if it matches the active keywords, loaded once per process"""
+    try:
+        mtime_ns = (MATRIX_DIR / "meta.json").stat().st_mtime_ns
+    except OSError:
+        return None
+    if _loaded['mtime_ns'] != mtime_ns:
+        _loaded['matrix'] = load_score_matrix()
+        _loaded['mtime_ns'] = mtime_ns
+    matrix = _loaded['matrix']
+    if matrix is None or not matrix.is_current():
+        return None
+    return matrix
+
+
+def refresh_score_matrix(workers: int = 1) -> ScoreMatrix:
+    """Index any new archive papers and rebuild the matrix if papers or keywords changed"""
+    from paper_archive import BASE_DIR, load_manifest
+    from page_text_store import index_documents
+
+    entries = [{**e, 'path': BASE_DIR / e['folder'] / e['file']}
+               for e in load_manifest()['entries'].values() if e['kind'] == 'qp']
+
+    matrix = load_score_matrix()
+    if (matrix is not None and matrix.is_current()
+            and [(d['key'], d['sha1']) for d in matrix.documents] == [(document_key(e), e['sha1']) for e in entries]):
+        print("\n📇 Score matrix is up to date")
+        return matrix
+
+    store = index_documents(list({e['sha1']: e for e in entries}.values()), workers)
+    if store is None:
+        return None
+    start = time.perf_counter()
+    matrix = build_score_matrix(store, entries)
+    save_score_matrix(matrix)
+    print(f"\n📇 Scored {len(matrix)} pages × {len(matrix.topics)} topics in {time.perf_counter() - start:.1f}s")
+    return load_score_matrix()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every archive page against every topic")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Processes for page extraction (default: all cores)")
+    parser.add_argument('--info', action='store_true', help="Describe the saved matrix and exit")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MathsForge AI - Archive Page Score Matrix")
+    print("=" * 60)
+
+    matrix = load_score_matrix() if args.info else refresh_score_matrix(args.workers)
+    if matrix is None:
+        print("\nNo score matrix yet.")
+        return
+
+    state = "current" if matrix.is_current() else "stale - keywords have changed"
+    print(f"\n✅ {len(matrix.documents)} papers, {len(matrix)} pages × {len(matrix.topics)} topics, "
+          f"{matrix.scores.nbytes // 1024} KB, keywords {matrix.keyword_version} ({state})")
+
+
+if __name__ == "__main__":
+    main()
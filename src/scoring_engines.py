@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+MathsForge AI - Page Scoring Engines
+Interchangeable ways of scoring a page of text against every topic:
+
+- KeywordEngine: the vetted strict keyword tables (score_page), in any match mode and profile.
+- LinearTopicEngine: a complement naive Bayes model (Rennie et al. 2003) over hashed
+  word unigrams and bigrams, trained from the labelled training/ folders. A page becomes
+  one sparse TF-IDF vector and every topic is scored by a single product with the
+  (features × topics) weight matrix, so the cost does not grow with keyword tables.
+
+Both answer the same two questions - a score per topic and the set of topics the page
+belongs to - so evaluation and benchmarks can swap one for the other.
+
+Train the model with:
+    python train_keywords.py --model
+"""
+
+import sys
+import json
+import zlib
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from strict_keywords import (DEFAULT_MATCH_MODE, DEFAULT_PROFILE, MATCH_MODES, SCORING_PROFILES,
+                             get_active_keywords, score_page, tokenize)
+
+MODEL_FILE = Path(__file__).parent / "topic_model.npz"
+MODEL_FORMAT = 1
+# Hashed feature space: 2^16 buckets × 38 topics of float32 is ~10 MB
+FEATURE_BUCKETS = 2 ** 16
+# Additive smoothing of the per-topic feature weights
+SMOOTHING = 0.01
+# A page is assigned its best topic only if it beats the runner-up by this much...
+MIN_MARGIN = 1.0
+# ...and the page has at least this many word tokens (blank and cover pages have fewer)
+MIN_TOKENS = 10
+# Odd 32-bit multiplier mixing the first word's hash into a bigram's
+_BIGRAM_MIX = np.uint64(0x9E3779B1)
+
+
+class ScoringEngine:
+    """Scores page text against every topic; subclasses implement score_topics/matching_topics"""
+
+    name = 'engine'
+
+    @property
+    def topics(self) -> list:
+        raise NotImplementedError
+
+    def score_topics(self, page_text: str) -> dict:
+        """Topic key -> score (higher is more likely) for every topic"""
+        raise NotImplementedError
+
+    def matching_topics(self, page_text: str) -> set:
+        """Topic keys the page is classified as"""
+        raise NotImplementedError
+
+
+class KeywordEngine(ScoringEngine):
+    """The strict keyword tables - score is score_page's weighted keyword count"""
+
+    def __init__(self, match_mode: str = DEFAULT_MATCH_MODE, profile: str = DEFAULT_PROFILE):
+        if match_mode not in MATCH_MODES:
+            raise ValueError(f"unknown match mode {match_mode!r} (expected one of {MATCH_MODES})")
+        if profile not in SCORING_PROFILES:
+            raise ValueError(f"unknown scoring profile {profile!r} (expected one of {tuple(SCORING_PROFILES)})")
+        self.match_mode = match_mode
+        self.profile = profile
+        self.name = f"keywords:{match_mode}" + (f"/{profile}" if profile != DEFAULT_PROFILE else '')
+
+    @property
+    def topics(self) -> list:
+        return list(get_active_keywords().tables)
+
+    def _results(self, page_text: str) -> dict:
+        # The token scan is cached per page, so all topics share one pass over the text
+        return {topic: score_page(page_text, topic, self.profile, self.match_mode) for topic in self.topics}
+
+    def score_topics(self, page_text: str) -> dict:
+        return {topic: result.score for topic, result in self._results(page_text).items()}
+
+    def matching_topics(self, page_text: str) -> set:
+        return {topic for topic, result in self._results(page_text).items() if result.matches}
+
+
+@lru_cache(maxsize=100_000)
+def _token_hash(token: str) -> int:
+    # crc32 rather than hash() - Python's string hash changes between processes
+    return zlib.crc32(token.encode('utf-8'))
+
+
+def page_features(page_text: str, buckets: int = FEATURE_BUCKETS) -> tuple:
+    """(bucket indices, counts) of the hashed word unigrams and bigrams on a page"""
+    tokens = [t for t in tokenize(page_text) if t.isalnum()]
+    if not tokens:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    hashes = np.fromiter((_token_hash(t) for t in tokens), dtype=np.uint64, count=len(tokens))
+    bigrams = (hashes[:-1] * _BIGRAM_MIX) ^ hashes[1:]
+    indices, counts = np.unique(np.concatenate([hashes, bigrams]) % np.uint64(buckets), return_counts=True)
+    return indices.astype(np.int64), counts.astype(np.float32)
+
+
+class LinearTopicEngine(ScoringEngine):
+    """Complement naive Bayes over hashed n-grams.
+
+    A page is the L2-normalized vector log(1 + count) × idf over its feature buckets;
+    weights[b, t] is minus the log-probability of bucket b in every topic except t,
+    centred across topics. Scores are page_vector @ weights[buckets], one per topic.
+    """
+
+    name = 'linear'
+
+    def __init__(self, topics: list, weights: np.ndarray, idf: np.ndarray, meta: dict = None):
+        self._topics = list(topics)
+        self.weights = weights
+        self.idf = idf
+        self.meta = meta or {}
+        self.buckets = weights.shape[0]
+
+    @property
+    def topics(self) -> list:
+        return self._topics
+
+    def _page_vector(self, page_text: str) -> tuple:
+        """(bucket indices, normalized weights) of a page, or None for pages with too few words"""
+        indices, counts = page_features(page_text, self.buckets)
+        if counts.sum() < MIN_TOKENS:
+            return None
+        values = np.log1p(counts) * self.idf[indices]
+        return indices, values / np.linalg.norm(values)
+
+    def scores(self, page_text: str) -> np.ndarray:
+        """Score per topic (in self.topics order), or None for pages with too few words"""
+        vector = self._page_vector(page_text)
+        if vector is None:
+            return None
+        indices, values = vector
+        return values @ self.weights[indices]
+
+    def score_topics(self, page_text: str) -> dict:
+        scores = self.scores(page_text)
+        if scores is None:
+            return {topic: 0.0 for topic in self._topics}
+        return dict(zip(self._topics, scores.tolist()))
+
+    def matching_topics(self, page_text: str) -> set:
+        scores = self.scores(page_text)
+        if scores is None or len(scores) < 2:
+            return set()
+        runner_up, best = np.argsort(scores)[-2:]
+        return {self._topics[best]} if scores[best] - scores[runner_up] >= MIN_MARGIN else set()
+
+    @classmethod
+    def train(cls, pages, buckets: int = FEATURE_BUCKETS, meta: dict = None):
+        """Fit on (page_text, topic) pairs; pages with too few words are skipped"""
+        features, page_totals = [], {}
+        document_frequency = np.zeros(buckets, dtype=np.float64)
+        for page_text, topic in pages:
+            indices, counts = page_features(page_text, buckets)
+            if counts.sum() < MIN_TOKENS:
+                continue
+            features.append((indices, counts, topic))
+            document_frequency[indices] += 1
+            page_totals[topic] = page_totals.get(topic, 0) + 1
+        if not features:
+            raise ValueError("no training pages with enough text")
+
+        topics = sorted(page_totals)
+        topic_index = {topic: i for i, topic in enumerate(topics)}
+        idf = np.log((1 + len(features)) / (1 + document_frequency)) + 1
+        totals = np.zeros((buckets, len(topics)), dtype=np.float64)
+        for indices, counts, topic in features:
+            values = np.log1p(counts) * idf[indices]
+            totals[indices, topic_index[topic]] += values / np.linalg.norm(values)
+
+        # Each topic is weighted by how rare its features are in all the *other* topics
+        complement = totals.sum(axis=1, keepdims=True) - totals + SMOOTHING
+        weights = -np.log(complement / complement.sum(axis=0))
+        weights = (weights - weights.mean(axis=1, keepdims=True)).astype(np.float32)
+
+        meta = {**(meta or {}), 'format': MODEL_FORMAT, 'trained': datetime.now().isoformat(timespec='seconds'),
+                'pages': len(features), 'pages_per_topic': page_totals}
+        return cls(topics, weights, idf.astype(np.float32), meta)
+
+    def save(self, path: Path = MODEL_FILE):
+        """Write the model atomically"""
+        path = Path(path)
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(tmp_path, weights=self.weights, idf=self.idf,
+                 topics=np.array(self._topics), meta=np.array(json.dumps(self.meta)))
+        tmp_path.replace(path)
+
+
+def load_topic_model(path: Path = MODEL_FILE) -> LinearTopicEngine:
+    """The trained model, or None if it is missing, unreadable or from an older format"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format') != MODEL_FORMAT:
+                return None
+            return LinearTopicEngine(data['topics'].tolist(), data['weights'], data['idf'], meta)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"   ⚠ Could not load {path.name}: {e}")
+        return None
+
+
+def get_engine(name: str) -> ScoringEngine:
+    """'keywords' (or 'keywords:<match mode>') or 'linear' - raises ValueError if unavailable"""
+    if name == 'keywords' or name.startswith('keywords:'):
+        return KeywordEngine(name.partition(':')[2] or DEFAULT_MATCH_MODE)
+    if name == 'linear':
+        model = load_topic_model()
+        if model is None:
+            raise ValueError(f"no trained model at {MODEL_FILE} - run: python train_keywords.py --model")
+        return model
+    raise ValueError(f"unknown scoring engine {name!r} (expected keywords, keywords:<mode> or linear)")
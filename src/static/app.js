@@ -0,0 +1,1510 @@
+let selectedTopic = null;
+let selectedPages = new Set();
+let currentPDF = null;
+let currentPDFTitle = '';
+let selectionConfirmed = false;
+
+// Multi-PDF support - PERSISTENT across PDF loads
+let collectedPages = [];  // Array of {pdfPath, pages: [1,2,3], title, thumbnails}
+let loadedPDFs = [];      // Track all loaded PDFs
+
+// Populate topics
+const topicGrid = document.getElementById('topicGrid');
+TOPICS.forEach(topic => {
+    const div = document.createElement('div');
+    div.className = 'topic-item';
+    div.textContent = topic;
+    div.onclick = () => selectTopic(topic, div);
+    topicGrid.appendChild(div);
+});
+
+// Difficulty change handler
+document.getElementById('difficulty').addEventListener('change', function() {
+    const keywordsGroup = document.getElementById('keywordsGroup');
+    const keywordsInput = document.getElementById('keywords');
+    const level = document.getElementById('level').value;
+
+    // KS3 should never have pastpapers option
+    if (level === 'ks3' && this.value === 'pastpapers') {
+        this.value = 'medium';
+        alert('Past Papers mode is only available for GCSE level.');
+        return;
+    }
+
+    if (this.value === 'pastpapers') {
+        keywordsGroup.style.opacity = '0.5';
+        keywordsInput.disabled = true;
+        keywordsInput.placeholder = 'Auto-filtered by topic';
+    } else {
+        keywordsGroup.style.opacity = '1';
+        keywordsInput.disabled = false;
+        keywordsInput.placeholder = 'e.g., tree diagram, conditional';
+    }
+    if (selectedTopic) {
+        // DON'T reset collected pages when changing difficulty!
+        selectedPages.clear();
+        currentPDF = null;
+        selectionConfirmed = false;
+        document.getElementById('pageSection').classList.add('hidden');
+        searchPDFs();
+    }
+});
+
+// Level change handler
+document.getElementById('level').addEventListener('change', function() {
+    const difficultySelect = document.getElementById('difficulty');
+    const pastPapersOption = difficultySelect.querySelector('option[value="pastpapers"]');
+
+    // Show/hide Past Papers option based on level
+    if (this.value === 'ks3') {
+        // Hide Past Papers for KS3
+        if (pastPapersOption) {
+            pastPapersOption.style.display = 'none';
+            // If currently on pastpapers, switch to medium
+            if (difficultySelect.value === 'pastpapers') {
+                difficultySelect.value = 'medium';
+            }
+        }
+    } else {
+        // Show Past Papers for GCSE
+        if (pastPapersOption) {
+            pastPapersOption.style.display = '';
+        }
+    }
+
+    if (selectedTopic) {
+        selectedPages.clear();
+        currentPDF = null;
+        selectionConfirmed = false;
+        document.getElementById('pageSection').classList.add('hidden');
+        searchPDFs();
+    }
+});
+
+function selectTopic(topic, element) {
+    document.querySelectorAll('.topic-item').forEach(el => el.classList.remove('selected'));
+    element.classList.add('selected');
+    selectedTopic = topic;
+
+    // Hide page section when switching topics (but keep collected pages)
+    selectedPages.clear();
+    currentPDF = null;
+    selectionConfirmed = false;
+    document.getElementById('pageSection').classList.add('hidden');
+
+    // Update button states but keep collected pages visible
+    document.getElementById('confirmBtn').classList.remove('hidden');
+    document.getElementById('editBtn').classList.add('hidden');
+    document.getElementById('generateBtn').classList.add('hidden');
+    document.getElementById('addMoreBtn').classList.add('hidden');
+
+    // Update selected count to 0
+    updateSelectedCount();
+
+    searchPDFs();
+}
+
+async function searchPDFs() {
+    const level = document.getElementById('level').value;
+    const difficulty = document.getElementById('difficulty').value;
+    const keywords = document.getElementById('keywords').value;
+
+    document.getElementById('loading').classList.add('active');
+    document.getElementById('resultsSection').classList.add('hidden');
+
+    try {
+        const response = await fetch('/api/search', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                topic: selectedTopic,
+                level: level,
+                difficulty: difficulty,
+                keywords: keywords
+            })
+        });
+
+        const data = await response.json();
+        displayResults(data.results);
+    } catch (error) {
+        console.error('Search error:', error);
+        alert('Error searching for PDFs');
+    }
+
+    document.getElementById('loading').classList.remove('active');
+}
+
+function displayResults(results) {
+    const container = document.getElementById('pdfResults');
+    const ppContainer = document.getElementById('pastPapersContainer');
+    container.innerHTML = '';
+    ppContainer.innerHTML = '';
+
+    if (results.length === 0) {
+        container.innerHTML = '<p style="color: var(--text-muted); padding: 2rem; text-align: center;">No PDFs found. Try different keywords or topic.</p>';
+        document.getElementById('resultsSection').classList.remove('hidden');
+        return;
+    }
+
+    const difficulty = document.getElementById('difficulty').value;
+
+    if (difficulty === 'pastpapers') {
+        // Create grid layout for past papers (years as rows, papers as columns)
+        // Specimen at bottom as requested
+        const years = ['2024', '2023', '2022', '2021', '2020', '2019', '2018', '2017', 'Specimen'];
+        const papers = ['Paper 1', 'Paper 2', 'Paper 3'];
+
+        // Organize results by year, paper, and type (QP vs MS)
+        const organized = {};
+        results.forEach((pdf, index) => {
+            const year = pdf.year || 'Unknown';
+            const paper = pdf.paper || 'Paper';
+            const isMS = pdf.is_mark_scheme || pdf.title.includes(' MS') || pdf.title.toLowerCase().includes('mark');
+            const type = isMS ? 'ms' : 'qp';
+
+            if (!organized[year]) organized[year] = {};
+            if (!organized[year][paper]) organized[year][paper] = {qp: [], ms: []};
+            organized[year][paper][type].push({...pdf, index});
+        });
+
+        let html = `
+            <div class="paper-controls">
+                <button class="mark-scheme-toggle" id="markSchemeToggle" onclick="toggleMarkSchemesBtn()">
+                    <div class="toggle-switch"></div>
+                    <span class="toggle-label">Mark Schemes</span>
+                </button>
+            </div>
+        `;
+
+        html += '<div class="past-papers-grid">';
+        // Header row
+        html += '<div class="pp-header">Year</div>';
+        papers.forEach(p => {
+            html += `<div class="pp-header">${p}</div>`;
+        });
+
+        // Data rows
+        years.forEach(year => {
+            html += `<div class="pp-year">${year}</div>`;
+            papers.forEach(paper => {
+                html += '<div class="pp-cell">';
+                if (organized[year] && organized[year][paper]) {
+                    // Question papers
+                    organized[year][paper].qp.forEach(pdf => {
+                        const sessionLabel = pdf.session !== 'Unknown' ? pdf.session.substring(0, 3) : '';
+                        html += `<button class="paper-btn qp-btn ripple" onclick="handlePaperClick(${pdf.index}, this, event)" title="${pdf.title}">📄 ${sessionLabel || 'QP'}</button>`;
+                    });
+                    // Mark schemes (hidden by default)
+                    organized[year][paper].ms.forEach(pdf => {
+                        const sessionLabel = pdf.session !== 'Unknown' ? pdf.session.substring(0, 3) : '';
+                        html += `<button class="paper-btn ms-btn" style="display: none;" onclick="loadPDF(${pdf.index})" title="${pdf.title}"><span class="ms-icon">MS</span> ${sessionLabel}</button>`;
+                    });
+                }
+                html += '</div>';
+            });
+        });
+
+        // Add Unknown/Other at the end if there are any
+        if (organized['Unknown']) {
+            html += '<div class="pp-year">Other</div>';
+            papers.forEach(paper => {
+                html += '<div class="pp-cell">';
+                if (organized['Unknown'] && organized['Unknown'][paper]) {
+                    organized['Unknown'][paper].qp.forEach(pdf => {
+                        html += `<button class="paper-btn qp-btn" onclick="loadPDF(${pdf.index})">📄 QP</button>`;
+                    });
+                    organized['Unknown'][paper].ms.forEach(pdf => {
+                        html += `<button class="paper-btn ms-btn" style="display: none;" onclick="loadPDF(${pdf.index})"><span class="ms-icon">MS</span></button>`;
+                    });
+                }
+                html += '</div>';
+            });
+        }
+
+        html += '</div>';
+
+        // Add AI Process button below the grid (bigger, more prominent)
+        html += `
+            <div class="ai-process-container" style="margin-top: 1.5rem; text-align: center;">
+                <button id="aiProcessBtn" class="ai-process-btn-large" style="display: none;" onclick="processAIPapers()">
+                    <span class="btn-glow"></span>
+                    <span class="btn-icon">🤖</span>
+                    <span>Process Selected Papers (<span id="selectedPaperCount">0</span>)</span>
+                </button>
+            </div>
+        `;
+
+        ppContainer.innerHTML = html;
+    } else {
+        // Standard display for other modes
+        results.forEach((pdf, index) => {
+            const card = document.createElement('div');
+            card.className = 'pdf-card';
+            card.innerHTML = `
+                <h4>${pdf.title}</h4>
+                <p class="source">${pdf.source}</p>
+                <button class="btn" style="margin-top: 0.75rem; padding: 0.6rem 1.25rem; font-size: 0.9rem;" onclick="loadPDF(${index})">📄 Load PDF</button>
+            `;
+            container.appendChild(card);
+        });
+    }
+
+    document.getElementById('resultsSection').classList.remove('hidden');
+    window.pdfResults = results;
+
+    // Show AI Process button if AI mode is enabled
+    const aiProcessBtn = document.getElementById('aiProcessBtn');
+    if (aiProcessBtn && aiModeEnabled) {
+        aiProcessBtn.style.display = '';
+        document.querySelectorAll('.qp-btn').forEach(btn => {
+            btn.classList.add('ai-selectable');
+        });
+        selectedPapersForAI.clear();
+        updateAIProcessButton();
+    }
+
+    // Show status bar if we have collected pages
+    if (collectedPages.length > 0) {
+        document.getElementById('statusBar').classList.remove('hidden');
+        updateCollectedDisplay();
+    }
+}
+
+function handlePaperClick(index, btn, event) {
+    // Add ripple effect
+    createRipple(event, btn);
+
+    // If AI mode is enabled, toggle selection instead of loading
+    if (aiModeEnabled) {
+        togglePaperForAI(index, btn);
+    } else {
+        loadPDF(index);
+    }
+}
+
+function createRipple(event, element) {
+    const ripple = document.createElement('span');
+    ripple.className = 'ripple-effect';
+    const rect = element.getBoundingClientRect();
+    const size = Math.max(rect.width, rect.height);
+    ripple.style.width = ripple.style.height = size + 'px';
+    ripple.style.left = (event.clientX - rect.left - size / 2) + 'px';
+    ripple.style.top = (event.clientY - rect.top - size / 2) + 'px';
+    element.appendChild(ripple);
+    setTimeout(() => ripple.remove(), 600);
+}
+
+async function loadPDF(index) {
+    const pdf = window.pdfResults[index];
+    currentPDFTitle = pdf.title;
+    document.getElementById('loadingText').textContent = 'Loading PDF pages...';
+    document.getElementById('loading').classList.add('active');
+
+    try {
+        const response = await fetch('/api/load-pdf', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ url: pdf.url, topic: selectedTopic })
+        });
+
+        const data = await response.json();
+        if (data.error) {
+            alert('Error loading PDF: ' + data.error);
+            document.getElementById('loading').classList.remove('active');
+            return;
+        }
+
+        currentPDF = data.path;
+
+        // Track loaded PDF
+        loadedPDFs.push({
+            path: data.path,
+            url: pdf.url,
+            title: pdf.title,
+            thumbnails: data.thumbnails
+        });
+
+        displayPages(data.thumbnails, data.filtered_pages);
+
+        setTimeout(() => {
+            document.getElementById('pageSection').scrollIntoView({ behavior: 'smooth', block: 'start' });
+        }, 100);
+
+    } catch (error) {
+        console.error('Load error:', error);
+        alert('Error loading PDF');
+    }
+
+    document.getElementById('loading').classList.remove('active');
+}
+
+function displayPages(thumbnails, filteredPages) {
+    const container = document.getElementById('pageGrid');
+    container.innerHTML = '';
+    selectedPages.clear();
+    selectionConfirmed = false;
+
+    // Update buttons for new PDF
+    document.getElementById('confirmBtn').classList.remove('hidden');
+    document.getElementById('editBtn').classList.add('hidden');
+    document.getElementById('generateBtn').classList.add('hidden');
+    document.getElementById('addMoreBtn').classList.add('hidden');
+
+    // Pre-select filtered pages
+    if (filteredPages && filteredPages.length > 0) {
+        filteredPages.forEach(p => selectedPages.add(p + 1));
+        const infoDiv = document.createElement('div');
+        infoDiv.className = 'info-box success';
+        infoDiv.style.gridColumn = '1/-1';
+        infoDiv.innerHTML = `✓ Auto-selected ${filteredPages.length} pages containing topic keywords. Click pages to add/remove.`;
+        container.appendChild(infoDiv);
+    } else if (document.getElementById('difficulty').value === 'pastpapers') {
+        const warnDiv = document.createElement('div');
+        warnDiv.className = 'info-box warning';
+        warnDiv.style.gridColumn = '1/-1';
+        warnDiv.innerHTML = `⚠ No pages auto-matched topic keywords. Manually select relevant pages.`;
+        container.appendChild(warnDiv);
+    }
+
+    thumbnails.forEach(thumb => {
+        const div = document.createElement('div');
+        div.className = 'page-item' + (selectedPages.has(thumb.page) ? ' selected' : '');
+        div.innerHTML = `
+            <img src="${thumb.data}" onclick="togglePage(${thumb.page}, this.parentElement)">
+            <div class="page-number">Page ${thumb.page}</div>
+            <button class="page-zoom-btn" onclick="event.stopPropagation(); zoomPage(${thumb.page})">🔍</button>
+        `;
+        container.appendChild(div);
+    });
+
+    // Store thumbnails for collected display
+    window.currentThumbnails = thumbnails;
+
+    // Only show manual page selection if AI mode is OFF
+    if (!aiModeEnabled) {
+        document.getElementById('pageSection').classList.remove('hidden');
+    }
+    document.getElementById('statusBar').classList.remove('hidden');
+    updateSelectedCount();
+    updateCollectedDisplay();
+}
+
+function togglePage(pageNum, element) {
+    if (selectionConfirmed) return;
+
+    if (selectedPages.has(pageNum)) {
+        selectedPages.delete(pageNum);
+        element.classList.remove('selected');
+    } else {
+        selectedPages.add(pageNum);
+        element.classList.add('selected');
+    }
+    updateSelectedCount();
+}
+
+function updateSelectedCount() {
+    document.getElementById('selectedCount').textContent = selectedPages.size;
+}
+
+function updateCollectedDisplay() {
+    const totalCollected = collectedPages.reduce((sum, p) => sum + p.pages.length, 0);
+    const collectedBadge = document.getElementById('collectedBadge');
+    const collectedPanel = document.getElementById('collectedPanel');
+    const collectedThumbs = document.getElementById('collectedThumbs');
+
+    if (totalCollected > 0) {
+        document.getElementById('collectedCount').textContent = totalCollected;
+        collectedBadge.classList.remove('hidden');
+        collectedPanel.classList.remove('hidden');
+
+        // Build thumbnails display
+        let html = '';
+        collectedPages.forEach((cp, cpIndex) => {
+            cp.pages.forEach((pageNum, pageIndex) => {
+                const thumb = cp.thumbnails.find(t => t.page === pageNum);
+                if (thumb) {
+                    html += `
+                        <div class="collected-thumb" title="${cp.title} - Page ${pageNum}">
+                            <img src="${thumb.data}">
+                            <button class="remove-btn" onclick="removeCollectedPage(${cpIndex}, ${pageNum})">×</button>
+                        </div>
+                    `;
+                }
+            });
+        });
+        collectedThumbs.innerHTML = html;
+    } else {
+        collectedBadge.classList.add('hidden');
+        collectedPanel.classList.add('hidden');
+    }
+}
+
+function removeCollectedPage(cpIndex, pageNum) {
+    if (cpIndex < collectedPages.length) {
+        collectedPages[cpIndex].pages = collectedPages[cpIndex].pages.filter(p => p !== pageNum);
+        if (collectedPages[cpIndex].pages.length === 0) {
+            collectedPages.splice(cpIndex, 1);
+        }
+        updateCollectedDisplay();
+    }
+}
+
+function confirmSelection() {
+    if (selectedPages.size === 0) {
+        alert('Please select at least one page');
+        return;
+    }
+
+    selectionConfirmed = true;
+
+    // Save current selection to collected pages
+    collectedPages.push({
+        pdfPath: currentPDF,
+        pages: Array.from(selectedPages).sort((a, b) => a - b),
+        title: currentPDFTitle,
+        thumbnails: window.currentThumbnails || []
+    });
+
+    // Update UI
+    document.getElementById('confirmBtn').classList.add('hidden');
+    document.getElementById('editBtn').classList.remove('hidden');
+    document.getElementById('generateBtn').classList.remove('hidden');
+    document.getElementById('addMoreBtn').classList.remove('hidden');
+    document.getElementById('msCheckboxLabel').classList.remove('hidden');
+
+    // Dim unselected pages
+    document.querySelectorAll('.page-item').forEach(el => {
+        el.style.pointerEvents = 'none';
+        if (!el.classList.contains('selected')) {
+            el.style.opacity = '0.3';
+        }
+    });
+
+    updateCollectedDisplay();
+}
+
+function editSelection() {
+    selectionConfirmed = false;
+
+    // Remove the last collected entry
+    if (collectedPages.length > 0) {
+        const lastEntry = collectedPages.pop();
+        // Restore selected pages from the entry we just removed
+        selectedPages = new Set(lastEntry.pages);
+    }
+
+    // Update UI
+    document.getElementById('confirmBtn').classList.remove('hidden');
+    document.getElementById('editBtn').classList.add('hidden');
+    document.getElementById('generateBtn').classList.add('hidden');
+    document.getElementById('addMoreBtn').classList.add('hidden');
+
+    // Re-enable page selection
+    document.querySelectorAll('.page-item').forEach(el => {
+        el.style.pointerEvents = 'auto';
+        el.style.opacity = '1';
+    });
+
+    updateSelectedCount();
+    updateCollectedDisplay();
+}
+
+function addMorePDFs() {
+    // Keep collected pages but reset current selection
+    selectedPages.clear();
+    currentPDF = null;
+    selectionConfirmed = false;
+
+    document.getElementById('pageSection').classList.add('hidden');
+    document.getElementById('confirmBtn').classList.remove('hidden');
+    document.getElementById('editBtn').classList.add('hidden');
+    document.getElementById('generateBtn').classList.add('hidden');
+    document.getElementById('addMoreBtn').classList.add('hidden');
+
+    updateSelectedCount();
+    document.getElementById('pdfResults').scrollIntoView({ behavior: 'smooth' });
+}
+
+async function generatePDF() {
+    const totalCollected = collectedPages.reduce((sum, p) => sum + p.pages.length, 0);
+
+    if (totalCollected === 0) {
+        alert('Please select at least one page');
+        return;
+    }
+
+    document.getElementById('loadingText').textContent = 'Generating PDF...';
+    document.getElementById('loading').classList.add('active');
+
+    try {
+        // Check if mark schemes checkbox is checked
+        const includeMS = document.getElementById('includeMarkSchemes')?.checked ?? false;
+
+        const response = await fetch('/api/generate-multi', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                collected: collectedPages,
+                topic: selectedTopic,
+                includeMarkSchemes: includeMS
+            })
+        });
+
+        const blob = await response.blob();
+        const url = URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+
+        // Determine filename based on content type (ZIP if mark schemes included)
+        const contentType = response.headers.get('Content-Type');
+        const safeTopic = selectedTopic.replace(/[^a-zA-Z0-9]/g, '_');
+        if (contentType && contentType.includes('zip')) {
+            a.download = `${safeTopic}_Homework.zip`;
+        } else {
+            a.download = `${safeTopic}_Homework.pdf`;
+        }
+        a.click();
+
+        // Show success animation
+        document.getElementById('loading').classList.remove('active');
+        showSuccessAnimation(totalCollected, includeMS);
+
+    } catch (error) {
+        console.error('Generate error:', error);
+        alert('Error generating PDF');
+        document.getElementById('loading').classList.remove('active');
+    }
+}
+
+function showSuccessAnimation(pageCount, includedMarkSchemes = false) {
+    const modal = document.getElementById('successModal');
+    const message = document.getElementById('successMessage');
+    if (includedMarkSchemes) {
+        message.textContent = `Downloaded ZIP with ${pageCount} question pages + matching mark schemes for ${selectedTopic}`;
+    } else {
+        message.textContent = `Successfully generated ${pageCount} page${pageCount > 1 ? 's' : ''} for ${selectedTopic}`;
+    }
+
+    // Add confetti pieces
+    const content = modal.querySelector('.success-content');
+    const colors = ['var(--primary)', 'var(--secondary)', 'var(--success)', 'var(--warning)'];
+
+    for (let i = 0; i < 20; i++) {
+        const confetti = document.createElement('div');
+        confetti.className = 'confetti-piece';
+        confetti.style.left = Math.random() * 100 + '%';
+        confetti.style.top = Math.random() * 100 + '%';
+        confetti.style.background = colors[Math.floor(Math.random() * colors.length)];
+        confetti.style.animationDelay = Math.random() * 0.5 + 's';
+        content.appendChild(confetti);
+    }
+
+    modal.classList.remove('hidden');
+
+    // Remove confetti after animation
+    setTimeout(() => {
+        content.querySelectorAll('.confetti-piece').forEach(c => c.remove());
+    }, 2000);
+}
+
+function closeSuccessModal() {
+    document.getElementById('successModal').classList.add('hidden');
+}
+
+async function zoomPage(pageNum) {
+    try {
+        const response = await fetch('/api/zoom-page', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ path: currentPDF, page: pageNum })
+        });
+
+        const data = await response.json();
+        document.getElementById('zoomImage').src = data.image;
+        document.getElementById('zoomModal').classList.remove('hidden');
+    } catch (error) {
+        console.error('Zoom error:', error);
+    }
+}
+
+function closeZoom() {
+    document.getElementById('zoomModal').classList.add('hidden');
+}
+
+async function viewAIPageZoom(pdfPath, pageNum) {
+    try {
+        const response = await fetch('/api/zoom-page', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ path: pdfPath, page: pageNum })
+        });
+
+        const data = await response.json();
+        document.getElementById('zoomImage').src = data.image;
+        document.getElementById('zoomModal').classList.remove('hidden');
+    } catch (error) {
+        console.error('Zoom error:', error);
+    }
+}
+
+// Event delegation for AI page thumb clicks
+document.addEventListener('click', function(event) {
+    // Check if clicked on ai-page-thumb or its children (but not remove button)
+    const thumb = event.target.closest('.ai-page-thumb');
+    if (thumb && !event.target.classList.contains('remove-page')) {
+        const pdfPath = thumb.dataset.path;
+        const pageNum = parseInt(thumb.dataset.page);
+        if (pdfPath && pageNum) {
+            viewAIPageZoom(pdfPath, pageNum);
+        }
+    }
+
+    // Check if clicked on custom zoom button
+    if (event.target.classList.contains('zoom-btn-custom')) {
+        event.stopPropagation();
+        const pageNum = parseInt(event.target.dataset.page);
+        if (pageNum) {
+            viewCustomPageZoom(pageNum);
+        }
+    }
+});
+
+async function viewCustomPageZoom(pageNum) {
+    if (!window.currentCustomPdfPath) {
+        console.error('No custom PDF path set');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/zoom-page', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ path: window.currentCustomPdfPath, page: pageNum })
+        });
+
+        const data = await response.json();
+        document.getElementById('zoomImage').src = data.image;
+        document.getElementById('zoomModal').classList.remove('hidden');
+    } catch (error) {
+        console.error('Custom page zoom error:', error);
+    }
+}
+
+// Mark Schemes toggle (button-based)
+let markSchemesVisible = false;
+
+function toggleMarkSchemesBtn() {
+    markSchemesVisible = !markSchemesVisible;
+    const btn = document.getElementById('markSchemeToggle');
+    btn.classList.toggle('active', markSchemesVisible);
+    document.querySelectorAll('.ms-btn').forEach(el => {
+        el.style.display = markSchemesVisible ? '' : 'none';
+    });
+}
+
+// Legacy function for backwards compatibility
+function toggleMarkSchemes() {
+    toggleMarkSchemesBtn();
+}
+
+// AI-Enhanced Mode variables
+let aiModeEnabled = false;
+let selectedPapersForAI = new Set();  // Stores indices of selected papers
+
+// Global AI Mode toggle (from the banner at top)
+function toggleAIModeGlobal() {
+    aiModeEnabled = !aiModeEnabled;
+    const toggleBtn = document.getElementById('aiToggleBtn');
+    const disclaimer = document.getElementById('aiDisclaimer');
+
+    toggleBtn.classList.toggle('active', aiModeEnabled);
+    toggleBtn.querySelector('.toggle-label').textContent = aiModeEnabled ? 'Enabled' : 'Enable';
+    disclaimer.classList.toggle('hidden', !aiModeEnabled);
+
+    // Hide manual page selection when AI mode is enabled
+    const pageSection = document.getElementById('pageSection');
+    if (aiModeEnabled) {
+        pageSection.classList.add('hidden');
+    }
+
+    // Update paper buttons if results are visible
+    const processBtn = document.getElementById('aiProcessBtn');
+    if (processBtn) {
+        if (aiModeEnabled) {
+            processBtn.style.display = '';
+            document.querySelectorAll('.qp-btn').forEach(btn => {
+                btn.classList.add('ai-selectable');
+            });
+            selectedPapersForAI.clear();
+            updateAIProcessButton();
+        } else {
+            processBtn.style.display = 'none';
+            document.querySelectorAll('.qp-btn').forEach(btn => {
+                btn.classList.remove('ai-selectable', 'ai-selected');
+            });
+            selectedPapersForAI.clear();
+        }
+    }
+}
+
+// Legacy function
+function toggleAIMode() {
+    toggleAIModeGlobal();
+}
+
+function togglePaperForAI(index, btn) {
+    if (selectedPapersForAI.has(index)) {
+        selectedPapersForAI.delete(index);
+        btn.classList.remove('ai-selected');
+    } else {
+        selectedPapersForAI.add(index);
+        btn.classList.add('ai-selected');
+    }
+    updateAIProcessButton();
+}
+
+function updateAIProcessButton() {
+    const count = selectedPapersForAI.size;
+    document.getElementById('selectedPaperCount').textContent = count;
+    const btn = document.getElementById('aiProcessBtn');
+    btn.disabled = count === 0;
+    btn.style.opacity = count === 0 ? '0.5' : '1';
+}
+
+async function processAIPapers() {
+    if (selectedPapersForAI.size === 0) return;
+    if (!selectedTopic) {
+        alert('Please select a topic first');
+        return;
+    }
+
+    // Keep results section visible, show loading progress BELOW the Found PDFs
+    document.getElementById('loadingProgress').classList.remove('hidden');
+
+    // Reset progress steps
+    for (let i = 1; i <= 4; i++) {
+        const step = document.getElementById(`loadingStep${i}`);
+        step.classList.remove('active', 'done');
+    }
+    document.getElementById('loadingStep1').classList.add('active');
+
+    // Scroll to show the progress steps
+    document.getElementById('loadingProgress').scrollIntoView({ behavior: 'smooth', block: 'center' });
+
+    try {
+        // Get the selected paper URLs
+        const selectedPapers = Array.from(selectedPapersForAI).map(idx => window.pdfResults[idx]);
+
+        // Simulate progress updates (the backend processes all at once, but we show progress)
+        setTimeout(() => {
+            document.getElementById('loadingStep1').classList.remove('active');
+            document.getElementById('loadingStep1').classList.add('done');
+            document.getElementById('loadingStep2').classList.add('active');
+        }, 1000);
+
+        setTimeout(() => {
+            document.getElementById('loadingStep2').classList.remove('active');
+            document.getElementById('loadingStep2').classList.add('done');
+            document.getElementById('loadingStep3').classList.add('active');
+        }, 3000);
+
+        const response = await fetch('/api/ai-process-papers', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                papers: selectedPapers.map(p => ({ url: p.url, title: p.title })),
+                topic: selectedTopic
+            })
+        });
+
+        // Mark remaining steps done
+        document.getElementById('loadingStep3').classList.remove('active');
+        document.getElementById('loadingStep3').classList.add('done');
+        document.getElementById('loadingStep4').classList.add('active');
+
+        const data = await response.json();
+
+        document.getElementById('loadingStep4').classList.remove('active');
+        document.getElementById('loadingStep4').classList.add('done');
+
+        if (data.error) {
+            alert('Error processing papers: ' + data.error);
+            document.getElementById('loadingProgress').classList.add('hidden');
+            return;
+        }
+
+        // Small delay to show completion
+        await new Promise(resolve => setTimeout(resolve, 500));
+
+        // Display all processed papers with auto-selected pages
+        displayAIResults(data.results);
+
+    } catch (error) {
+        console.error('AI processing error:', error);
+        alert('Error processing papers with AI: ' + error.message);
+    }
+
+    document.getElementById('loadingProgress').classList.add('hidden');
+}
+
+function displayAIResults(results) {
+    console.log('displayAIResults called with:', results);
+
+    // Clear previous collected pages and add AI-detected pages
+    collectedPages = [];
+    loadedPDFs = [];
+
+    if (!results || !Array.isArray(results)) {
+        console.error('Invalid results:', results);
+        alert('Error: Invalid results from AI processing');
+        return;
+    }
+
+    let totalPagesFound = 0;
+
+    results.forEach((paperResult, idx) => {
+        console.log(`Processing paper ${idx}:`, paperResult.title, 'filtered_pages:', paperResult.filtered_pages);
+
+        loadedPDFs.push({
+            path: paperResult.path,
+            url: paperResult.url,
+            title: paperResult.title,
+            thumbnails: paperResult.thumbnails
+        });
+
+        // Auto-add the AI-detected pages to collected (grouped by PDF)
+        // Handle new format (objects with confidence) or old format (just page numbers)
+        if (paperResult.filtered_pages && paperResult.filtered_pages.length > 0) {
+            const validPages = paperResult.filtered_pages
+                .map(p => typeof p === 'object' ? p.page + 1 : p)
+                .filter(pageNum => pageNum > 0 && pageNum <= paperResult.thumbnails.length);
+
+            if (validPages.length > 0) {
+                collectedPages.push({
+                    pdfPath: paperResult.path,
+                    pages: validPages,
+                    title: paperResult.title,
+                    thumbnails: paperResult.thumbnails
+                });
+                totalPagesFound += validPages.length;
+            }
+        }
+    });
+
+    console.log('Collected page groups:', collectedPages.length, 'Total pages:', totalPagesFound);
+
+    // Build the AI Results Panel (instead of alert)
+    buildAIResultsPanel(results, totalPagesFound);
+
+    // Show the status bar and buttons
+    document.getElementById('statusBar').classList.remove('hidden');
+    document.getElementById('confirmBtn').classList.add('hidden');
+    document.getElementById('editBtn').classList.remove('hidden');
+    document.getElementById('generateBtn').classList.remove('hidden');
+    document.getElementById('addMoreBtn').classList.remove('hidden');
+    document.getElementById('msCheckboxLabel').classList.remove('hidden');
+    selectionConfirmed = true;
+
+    // Update collected display
+    updateCollectedDisplay();
+
+    // Scroll to results
+    setTimeout(() => {
+        document.getElementById('aiResultsPanel').scrollIntoView({ behavior: 'smooth', block: 'start' });
+    }, 100);
+}
+
+function buildAIResultsPanel(results, totalPages) {
+    const panel = document.getElementById('aiResultsPanel');
+    const papersList = document.getElementById('aiPapersList');
+
+    // Update header stats
+    document.getElementById('aiResultsTopic').textContent = selectedTopic;
+    document.getElementById('aiTotalPages').textContent = totalPages;
+    document.getElementById('aiTotalPapers').textContent = results.length;
+
+    // Build papers list
+    let html = '';
+    results.forEach((paperResult, paperIdx) => {
+        const filteredPages = paperResult.filtered_pages || [];
+        const hasPages = filteredPages.length > 0;
+
+        html += `
+            <div class="ai-paper-item">
+                <div class="ai-paper-header">
+                    <span class="ai-paper-title">${paperResult.title}</span>
+                    <span class="ai-paper-pages-count">${filteredPages.length} page${filteredPages.length !== 1 ? 's' : ''} found</span>
+                </div>
+                <div class="ai-paper-pages">
+        `;
+
+        if (hasPages) {
+            filteredPages.forEach(pageData => {
+                // Handle both old format (just page number) and new format (object with confidence)
+                const pageNum = typeof pageData === 'object' ? pageData.page + 1 : pageData;
+                const confidence = typeof pageData === 'object' ? pageData.confidence : 'high';
+                const thumb = paperResult.thumbnails[pageNum - 1];
+                if (thumb) {
+                    html += `
+                        <div class="ai-page-thumb ${confidence}-confidence" data-paper="${paperIdx}" data-page="${pageNum}" data-path="${paperResult.path}">
+                            <img src="${thumb.data}" alt="Page ${pageNum}">
+                            <div class="confidence-indicator ${confidence}">${confidence === 'high' ? 'Definite' : 'Maybe'}</div>
+                            <div class="zoom-overlay">
+                                <div class="zoom-icon">🔍</div>
+                            </div>
+                            <div class="page-label">Page ${pageNum}</div>
+                            <button class="remove-page" onclick="removeAIPage(${paperIdx}, ${pageNum}, event)">×</button>
+                        </div>
+                    `;
+                }
+            });
+        } else {
+            html += `<div class="ai-no-pages">No matching pages found in this paper</div>`;
+        }
+
+        html += `
+                </div>
+            </div>
+        `;
+    });
+
+    papersList.innerHTML = html;
+    panel.classList.remove('hidden');
+}
+
+function removeAIPage(paperIdx, pageNum, event) {
+    event.stopPropagation();
+
+    // Find and remove from collectedPages
+    for (let i = 0; i < collectedPages.length; i++) {
+        const cp = collectedPages[i];
+        const pageIndex = cp.pages.indexOf(pageNum);
+        if (pageIndex > -1 && loadedPDFs[paperIdx] && cp.pdfPath === loadedPDFs[paperIdx].path) {
+            cp.pages.splice(pageIndex, 1);
+            if (cp.pages.length === 0) {
+                collectedPages.splice(i, 1);
+            }
+            break;
+        }
+    }
+
+    // Remove the visual element
+    event.target.closest('.ai-page-thumb').remove();
+
+    // Update stats
+    const totalPages = collectedPages.reduce((sum, cp) => sum + cp.pages.length, 0);
+    document.getElementById('aiTotalPages').textContent = totalPages;
+
+    // Update collected display
+    updateCollectedDisplay();
+}
+
+function startOver() {
+    selectedTopic = null;
+    selectedPages.clear();
+    currentPDF = null;
+    selectionConfirmed = false;
+    collectedPages = [];
+    loadedPDFs = [];
+
+    document.querySelectorAll('.topic-item').forEach(el => el.classList.remove('selected'));
+    document.getElementById('keywords').value = '';
+    document.getElementById('resultsSection').classList.add('hidden');
+    document.getElementById('pageSection').classList.add('hidden');
+    document.getElementById('statusBar').classList.add('hidden');
+    document.getElementById('collectedPanel').classList.add('hidden');
+    document.getElementById('confirmBtn').classList.remove('hidden');
+    document.getElementById('editBtn').classList.add('hidden');
+    document.getElementById('generateBtn').classList.add('hidden');
+    document.getElementById('addMoreBtn').classList.add('hidden');
+    document.getElementById('collectedBadge').classList.add('hidden');
+    document.getElementById('msCheckboxLabel').classList.add('hidden');
+    document.getElementById('aiResultsPanel').classList.add('hidden');
+
+    fetch('/api/cleanup', { method: 'POST' });
+}
+
+document.addEventListener('keydown', e => {
+    if (e.key === 'Escape') closeZoom();
+});
+
+// Custom Select Dropdown Functions
+function toggleCustomSelect(selectId) {
+    const select = document.getElementById(selectId);
+    const isOpen = select.classList.contains('open');
+
+    // Close all other dropdowns first
+    document.querySelectorAll('.custom-select.open').forEach(s => {
+        if (s.id !== selectId) s.classList.remove('open');
+    });
+
+    // Toggle this one
+    select.classList.toggle('open');
+}
+
+function selectOption(selectId, value, label) {
+    const select = document.getElementById(selectId);
+    const trigger = select.querySelector('.custom-select-value');
+    const hiddenInput = select.nextElementSibling;
+
+    // Update display
+    trigger.textContent = label;
+    trigger.dataset.value = value;
+
+    // Update hidden input
+    if (hiddenInput && hiddenInput.tagName === 'INPUT') {
+        hiddenInput.value = value;
+    }
+
+    // Update selected state
+    select.querySelectorAll('.custom-select-option').forEach(opt => {
+        opt.classList.remove('selected');
+        if (opt.dataset.value === value) {
+            opt.classList.add('selected');
+        }
+    });
+
+    // Close dropdown
+    select.classList.remove('open');
+}
+
+// Close dropdowns when clicking outside
+document.addEventListener('click', function(e) {
+    if (!e.target.closest('.custom-select')) {
+        document.querySelectorAll('.custom-select.open').forEach(s => {
+            s.classList.remove('open');
+        });
+    }
+});
+
+// Theme switching
+function setTheme(theme) {
+    document.documentElement.setAttribute('data-theme', theme);
+    localStorage.setItem('homework-theme', theme);
+
+    document.querySelectorAll('.theme-btn').forEach(btn => btn.classList.remove('active'));
+    document.getElementById('theme-' + theme).classList.add('active');
+}
+
+// Load saved theme
+(function() {
+    const savedTheme = localStorage.getItem('homework-theme') || 'default';
+    setTheme(savedTheme);
+})();
+
+// Enhanced Custom Cursor System with dot, ring, and glow
+(function() {
+    const cursorDot = document.getElementById('cursorDot');
+    const cursorRing = document.getElementById('cursorRing');
+    const cursorGlow = document.getElementById('cursorGlow');
+
+    let mouseX = 0, mouseY = 0;
+    let dotX = 0, dotY = 0;
+    let ringX = 0, ringY = 0;
+    let glowX = 0, glowY = 0;
+
+    document.addEventListener('mousemove', (e) => {
+        mouseX = e.clientX;
+        mouseY = e.clientY;
+    });
+
+    // Smooth animation loop with different speeds for each element
+    function animate() {
+        // Dot follows closely (fast)
+        dotX += (mouseX - dotX) * 0.35;
+        dotY += (mouseY - dotY) * 0.35;
+        cursorDot.style.left = dotX + 'px';
+        cursorDot.style.top = dotY + 'px';
+
+        // Ring follows with medium lag
+        ringX += (mouseX - ringX) * 0.15;
+        ringY += (mouseY - ringY) * 0.15;
+        cursorRing.style.left = ringX + 'px';
+        cursorRing.style.top = ringY + 'px';
+
+        // Glow follows with heavy lag
+        glowX += (mouseX - glowX) * 0.08;
+        glowY += (mouseY - glowY) * 0.08;
+        cursorGlow.style.left = glowX + 'px';
+        cursorGlow.style.top = glowY + 'px';
+
+        requestAnimationFrame(animate);
+    }
+
+    animate();
+
+    // Detect hover on interactive elements
+    const hoverElements = 'button, a, .topic-item, .qp-btn, .ms-btn, .pdf-card, .page-card, .theme-btn, select, input';
+    document.addEventListener('mouseover', (e) => {
+        if (e.target.matches(hoverElements) || e.target.closest(hoverElements)) {
+            cursorRing.classList.add('hover');
+            cursorDot.style.transform = 'translate(-50%, -50%) scale(1.5)';
+        }
+    });
+
+    document.addEventListener('mouseout', (e) => {
+        if (e.target.matches(hoverElements) || e.target.closest(hoverElements)) {
+            cursorRing.classList.remove('hover');
+            cursorDot.style.transform = 'translate(-50%, -50%) scale(1)';
+        }
+    });
+
+    // Click effect
+    document.addEventListener('mousedown', () => {
+        cursorDot.classList.add('clicking');
+        cursorRing.classList.add('clicking');
+    });
+
+    document.addEventListener('mouseup', () => {
+        cursorDot.classList.remove('clicking');
+        cursorRing.classList.remove('clicking');
+    });
+
+    // Hide cursor elements when mouse leaves window
+    document.addEventListener('mouseleave', () => {
+        cursorDot.style.opacity = '0';
+        cursorRing.style.opacity = '0';
+        cursorGlow.style.opacity = '0';
+    });
+
+    document.addEventListener('mouseenter', () => {
+        cursorDot.style.opacity = '1';
+        cursorRing.style.opacity = '0.6';
+        cursorGlow.style.opacity = '0.6';
+    });
+
+    // Hide default cursor on body
+    document.body.style.cursor = 'none';
+    document.querySelectorAll('*').forEach(el => el.style.cursor = 'none');
+})();
+
+// Add stagger animation to topic items
+setTimeout(() => {
+    document.querySelectorAll('.topic-item').forEach((item, index) => {
+        item.style.animationDelay = (index * 0.03) + 's';
+        item.classList.add('animate-fade-in');
+    });
+}, 100);
+
+// ============================================
+// CUSTOM RESOURCES FUNCTIONALITY
+// ============================================
+
+let customPdfFile = null;
+let customPdfPath = null;
+let customSelectedTopic = null;
+let customSelectedPages = new Set();
+let customPageData = [];
+
+// Populate custom topic grid (same topics as main)
+const customTopicGrid = document.getElementById('customTopicGrid');
+TOPICS.forEach(topic => {
+    const div = document.createElement('div');
+    div.className = 'topic-item';
+    div.textContent = topic;
+    div.onclick = () => selectCustomTopic(topic, div);
+    customTopicGrid.appendChild(div);
+});
+
+// Tab switching
+function switchMainTab(tab) {
+    const pastPapersTab = document.getElementById('tabPastPapers');
+    const customTab = document.getElementById('tabCustomResources');
+    const pastPapersContent = document.getElementById('pastPapersContent');
+    const customContent = document.getElementById('customResourcesContent');
+
+    if (tab === 'pastpapers') {
+        pastPapersTab.classList.add('active');
+        customTab.classList.remove('active');
+        pastPapersContent.style.display = 'block';
+        customContent.classList.remove('active');
+    } else {
+        pastPapersTab.classList.remove('active');
+        customTab.classList.add('active');
+        pastPapersContent.style.display = 'none';
+        customContent.classList.add('active');
+    }
+}
+
+// Drag and drop handling
+const uploadZone = document.getElementById('uploadZone');
+
+uploadZone.addEventListener('dragover', (e) => {
+    e.preventDefault();
+    uploadZone.classList.add('drag-over');
+});
+
+uploadZone.addEventListener('dragleave', (e) => {
+    e.preventDefault();
+    uploadZone.classList.remove('drag-over');
+});
+
+uploadZone.addEventListener('drop', (e) => {
+    e.preventDefault();
+    uploadZone.classList.remove('drag-over');
+    const files = e.dataTransfer.files;
+    if (files.length > 0 && files[0].type === 'application/pdf') {
+        handleCustomPdfFile(files[0]);
+    }
+});
+
+// Handle PDF upload
+function handleCustomPdfUpload(event) {
+    const file = event.target.files[0];
+    if (file && file.type === 'application/pdf') {
+        handleCustomPdfFile(file);
+    }
+}
+
+async function handleCustomPdfFile(file) {
+    customPdfFile = file;
+
+    // Show loading
+    document.getElementById('uploadZone').style.display = 'none';
+    document.getElementById('uploadedPdfInfo').classList.remove('hidden');
+    document.getElementById('uploadedPdfName').textContent = file.name;
+    document.getElementById('uploadedPdfMeta').textContent = 'Uploading...';
+
+    // Upload file to server
+    const formData = new FormData();
+    formData.append('file', file);
+
+    try {
+        const response = await fetch('/upload_custom_pdf', {
+            method: 'POST',
+            body: formData
+        });
+
+        const data = await response.json();
+        if (data.success) {
+            customPdfPath = data.path;
+            window.currentCustomPdfPath = data.path; // Store for zoom functionality
+            const sizeMB = (file.size / (1024 * 1024)).toFixed(2);
+            document.getElementById('uploadedPdfMeta').textContent = `${data.page_count} pages • ${sizeMB} MB`;
+
+            // Show topic selection and scan button
+            document.getElementById('customTopicSection').classList.remove('hidden');
+            document.getElementById('scanBtn').classList.remove('hidden');
+        } else {
+            alert('Error uploading PDF: ' + data.error);
+            removeUploadedPdf();
+        }
+    } catch (error) {
+        alert('Error uploading PDF: ' + error.message);
+        removeUploadedPdf();
+    }
+}
+
+function removeUploadedPdf() {
+    customPdfFile = null;
+    customPdfPath = null;
+    customSelectedTopic = null;
+    document.getElementById('uploadZone').style.display = 'block';
+    document.getElementById('uploadedPdfInfo').classList.add('hidden');
+    document.getElementById('customTopicSection').classList.add('hidden');
+    document.getElementById('scanBtn').classList.add('hidden');
+    document.getElementById('customResultsSection').classList.add('hidden');
+    document.getElementById('customPdfInput').value = '';
+
+    // Reset topic selection
+    document.querySelectorAll('#customTopicGrid .topic-item').forEach(el => {
+        el.classList.remove('selected');
+    });
+}
+
+function selectCustomTopic(topic, element) {
+    // Deselect previous
+    document.querySelectorAll('#customTopicGrid .topic-item').forEach(el => {
+        el.classList.remove('selected');
+    });
+
+    // Select new
+    element.classList.add('selected');
+    customSelectedTopic = topic;
+
+    // Enable scan button
+    const scanBtn = document.getElementById('scanBtn');
+    scanBtn.disabled = false;
+    scanBtn.querySelector('span:last-child').textContent = `Scan PDF for "${topic}"`;
+}
+
+async function scanCustomPdf() {
+    if (!customPdfPath || !customSelectedTopic) return;
+
+    // Show scanning overlay
+    const overlay = document.createElement('div');
+    overlay.className = 'scanning-overlay';
+    overlay.id = 'scanningOverlay';
+    overlay.innerHTML = `
+        <div class="scanning-animation">
+            <div class="scanning-circle"></div>
+            <div class="scanning-circle"></div>
+            <div class="scanning-circle"></div>
+            <div class="scanning-icon">🔍</div>
+        </div>
+        <p class="scanning-text">Scanning pages for "${customSelectedTopic}"...</p>
+        <p class="scanning-subtext">Analysing text content on each page</p>
+    `;
+    document.body.appendChild(overlay);
+
+    try {
+        const response = await fetch('/scan_custom_pdf', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                path: customPdfPath,
+                topic: customSelectedTopic
+            })
+        });
+
+        const data = await response.json();
+        document.getElementById('scanningOverlay').remove();
+
+        if (data.success) {
+            displayCustomResults(data);
+        } else {
+            alert('Error scanning PDF: ' + data.error);
+        }
+    } catch (error) {
+        document.getElementById('scanningOverlay').remove();
+        alert('Error scanning PDF: ' + error.message);
+    }
+}
+
+function displayCustomResults(data) {
+    customPageData = data.pages;
+    customSelectedPages = new Set();
+
+    const highConfPages = data.pages.filter(p => p.confidence === 'high');
+    const mediumConfPages = data.pages.filter(p => p.confidence === 'medium');
+
+    // Auto-select high confidence pages
+    highConfPages.forEach(p => customSelectedPages.add(p.page));
+
+    // Update stats
+    document.getElementById('customResultsText').textContent =
+        `Found ${highConfPages.length} definite + ${mediumConfPages.length} possible pages for "${customSelectedTopic}"`;
+
+    // Build page grid
+    const grid = document.getElementById('customPageGrid');
+    grid.innerHTML = '';
+
+    data.pages.forEach(page => {
+        const isSelected = customSelectedPages.has(page.page);
+        const card = document.createElement('div');
+        card.className = `custom-page-card ${page.confidence}-confidence ${isSelected ? 'selected' : ''}`;
+        card.dataset.page = page.page;
+
+        card.innerHTML = `
+            <img class="custom-page-thumb" src="data:image/png;base64,${page.thumbnail}" alt="Page ${page.page}">
+            <div class="confidence-badge ${page.confidence}">${page.confidence === 'high' ? 'Definite' : 'Maybe'}</div>
+            <div class="page-number-badge">Page ${page.page}</div>
+            <div class="select-overlay">
+                <div class="select-check">✓</div>
+            </div>
+            <button class="zoom-btn-custom" data-page="${page.page}" title="View full page">🔍</button>
+        `;
+
+        // Add click handler to card (but not zoom button)
+        card.addEventListener('click', function(e) {
+            if (!e.target.classList.contains('zoom-btn-custom')) {
+                toggleCustomPage(page.page, card);
+            }
+        });
+
+        grid.appendChild(card);
+    });
+
+    // Show results section
+    document.getElementById('customResultsSection').classList.remove('hidden');
+
+    // Update status bar
+    updateCustomStatusBar();
+
+    // Show status bar
+    document.getElementById('statusBar').classList.remove('hidden');
+}
+
+function toggleCustomPage(pageNum, card) {
+    if (customSelectedPages.has(pageNum)) {
+        customSelectedPages.delete(pageNum);
+        card.classList.remove('selected');
+    } else {
+        customSelectedPages.add(pageNum);
+        card.classList.add('selected');
+    }
+    updateCustomStatusBar();
+}
+
+function updateCustomStatusBar() {
+    document.getElementById('selectedCount').textContent = customSelectedPages.size;
+}
+
+function resetCustomResources() {
+    customSelectedPages = new Set();
+    customPageData = [];
+    document.getElementById('customResultsSection').classList.add('hidden');
+    document.getElementById('statusBar').classList.add('hidden');
+
+    // Reset topic selection
+    customSelectedTopic = null;
+    document.querySelectorAll('#customTopicGrid .topic-item').forEach(el => {
+        el.classList.remove('selected');
+    });
+    document.getElementById('scanBtn').disabled = true;
+    document.getElementById('scanBtn').querySelector('span:last-child').textContent = 'Scan PDF for Topic';
+}
+
+// Override generatePDF to handle custom resources mode
+const originalGeneratePDF = generatePDF;
+generatePDF = async function() {
+    // Check if we're in custom resources mode
+    if (document.getElementById('customResourcesContent').classList.contains('active') && customSelectedPages.size > 0) {
+        await generateCustomPDF();
+    } else {
+        await originalGeneratePDF();
+    }
+};
+
+async function generateCustomPDF() {
+    if (customSelectedPages.size === 0) {
+        alert('Please select at least one page');
+        return;
+    }
+
+    document.getElementById('loading').classList.remove('hidden');
+    document.getElementById('loadingText').textContent = 'Generating your filtered PDF...';
+
+    try {
+        const response = await fetch('/generate_custom_pdf', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                path: customPdfPath,
+                pages: Array.from(customSelectedPages).sort((a, b) => a - b),
+                topic: customSelectedTopic
+            })
+        });
+
+        const data = await response.json();
+        document.getElementById('loading').classList.add('hidden');
+
+        if (data.success) {
+            // Show success modal
+            document.getElementById('successMessage').textContent =
+                `${customSelectedPages.size} pages extracted for "${customSelectedTopic}"`;
+            document.getElementById('successModal').classList.remove('hidden');
+
+            // Trigger download
+            const link = document.createElement('a');
+            link.href = data.download_url;
+            link.download = data.filename;
+            link.click();
+        } else {
+            alert('Error generating PDF: ' + data.error);
+        }
+    } catch (error) {
+        document.getElementById('loading').classList.add('hidden');
+        alert('Error generating PDF: ' + error.message);
+    }
+}
@@ -0,0 +1,98 @@
+"""
+MathsForge AI - Cached Page and Static Assets
+The index page is rendered once per topic list, and app.css / app.js are read once.
+All are pre-compressed (gzip, plus brotli if the brotli package is installed) and
+served with a strong ETag so repeat visits get a 304 instead of ~130 KB of HTML.
+"""
+
+import gzip
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from html_template import get_html_template
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / "static"
+STATIC_FILES = {
+    'app.css': 'text/css; charset=utf-8',
+    'app.js': 'application/javascript; charset=utf-8',
+}
+
+# Versioned asset URLs (?v=<hash>) never change content, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# The page itself is always revalidated - cheap with the ETag
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+class CachedAsset:
+    """A response body with its pre-compressed variants and strong ETag"""
+
+    def __init__(self, body: bytes, content_type: str, cache_control: str):
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()
+        self.etag = f'"{self.digest[:32]}"'
+        self.encodings = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(body)
+
+    def negotiate(self, accept_encoding: str):
+        """(content-encoding or None, bytes) for a request's Accept-Encoding header"""
+        accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.encodings:
+                return encoding, self.encodings[encoding]
+        return None, self.body
+
+    def matches(self, if_none_match: str) -> bool:
+        """True if the client's If-None-Match already names this version"""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        return '*' in tags or self.etag in tags
+
+
+@lru_cache(maxsize=None)
+def get_static_asset(name: str) -> CachedAsset:
+    """app.css / app.js, read and compressed on first use"""
+    return CachedAsset((STATIC_DIR / name).read_bytes(), STATIC_FILES[name], IMMUTABLE_CACHE_CONTROL)
+
+
+def static_url(name: str) -> str:
+    return f"/static/{name}?v={get_static_asset(name).digest[:12]}"
+
+
+@lru_cache(maxsize=8)
+def get_index_page(topics: tuple) -> CachedAsset:
+    """The rendered index page, built once per topic list"""
+    html = get_html_template(list(topics), css_url=static_url('app.css'), js_url=static_url('app.js'))
+    return CachedAsset(html.encode(), 'text/html; charset=utf-8', REVALIDATE_CACHE_CONTROL)
+
+
+def send_cached_asset(handler, asset: CachedAsset):
+    """Write an asset to a BaseHTTPRequestHandler, honouring If-None-Match and Accept-Encoding"""
+    if asset.matches(handler.headers.get('If-None-Match')):
+        handler.send_response(304)
+        handler.send_header('ETag', asset.etag)
+        handler.send_header('Cache-Control', asset.cache_control)
+        handler.end_headers()
+        return
+
+    encoding, body = asset.negotiate(handler.headers.get('Accept-Encoding'))
+    handler.send_response(200)
+    handler.send_header('Content-Type', asset.content_type)
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('ETag', asset.etag)
+    handler.send_header('Cache-Control', asset.cache_control)
+    handler.send_header('Vary', 'Accept-Encoding')
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    handler.end_headers()
+    if handler.command != 'HEAD':
+        handler.wfile.write(body)
@@ -2,8 +2,53 @@
 STRICT Topic Keywords for GCSE Maths OCR Detection
 VETTED BY USER - These keywords are HIGHLY SPECIFIC to each topic to avoid false positives.
 Each topic has PRIMARY keywords (must match) and CONTEXT keywords (supporting evidence).
+
+The tables below are the vetted defaults. If keyword_artifact.json exists (written by
+apply_learned_keywords.py) it replaces them at runtime and is hot-reloaded when it changes.
 """
 
+import re
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+ARTIFACT_FILE = Path(__file__).parent / "keyword_artifact.json"
+ARTIFACT_FORMAT = 1
+# How often (seconds) the artifact's mtime is checked for hot reload
+RELOAD_CHECK_SECONDS = 2.0
+# page_confidence grades: a score of at least HIGH_SCORE is a definite match,
+# at least POSSIBLE_SCORE a possible one
+HIGH_SCORE = 5
+POSSIBLE_SCORE = 2
+
+# 'token' matches keywords on word boundaries over the tokenized page, so "sin" no longer
+# matches "using" or "angle" "triangle"; 'substring' is the original raw `in` test.
+# 'fuzzy' is 'token' plus tolerance for OCR errors, used for pages whose text came from OCR
+MATCH_MODES = ('token', 'fuzzy', 'substring')
+DEFAULT_MATCH_MODE = 'token'
+OCR_MATCH_MODE = 'fuzzy'
+# Letter runs, digit runs, then any other single character - "3x²" is ["3", "x²"], "f(x)" is
+# ["f", "(", "x", ")"] - so units and symbols stuck to numbers still match
+TOKEN_PATTERN = re.compile(r'[^\W\d_]+|\d+|\S')
+
+# Fuzzy matching: page tokens at least this long may match a keyword token one OCR-style edit
+# away - one letter read as a similar-looking one, or a thin letter dropped or added
+FUZZY_MIN_LENGTH = 5
+OCR_SIMILAR_LETTERS = ('iljtf', 'ceo', 'nhu', 'hb', 'gqy', 'vy')
+OCR_THIN_LETTERS = frozenset('iljtf')
+# Characters Tesseract reads in place of a letter, corrected between letters ("probabi1ity")
+OCR_CHAR_CONFUSIONS = {'1': 'l', '|': 'l', '0': 'o', '5': 's'}
+OCR_CONFUSED_CHAR = re.compile(r'(?<=[^\W\d_])[10|5](?=[^\W\d_])')
+# Letter pairs Tesseract reads in place of one letter ("rnean"); keywords also match these spellings
+OCR_LETTER_CONFUSIONS = {'m': 'rn', 'w': 'vv', 'd': 'cl'}
+# A word hyphenated across a line break ("proba-\nbility")
+HYPHENATED_BREAK = re.compile(r'([^\W\d_])-[ \t]*\r?\n[ \t]*([^\W\d_])')
+
 STRICT_TOPIC_KEYWORDS = {
     # 1 - Number
     "number": {
@@ -417,8 +462,264 @@ TOPIC_ALIASES = {
 }
 
 
-def get_strict_keywords(topic_name: str) -> dict:
-    """Get strict keywords for a topic"""
+@lru_cache(maxsize=100_000)
+def normalize_token(token: str) -> str:
+    """Fold simple plurals ("angles" → "angle", "probabilities" → "probability")"""
+    if len(token) <= 3 or token[-1] != 's' or token[-2] == 's' or not token.isalpha():
+        return token
+    if token.endswith('ies') and len(token) > 4:
+        return token[:-3] + 'y'
+    if token.endswith(('xes', 'ches', 'shes', 'sses', 'zes')):
+        return token[:-2]
+    return token[:-1]
+
+
+def tokenize(text: str) -> list:
+    """Lowercase, plural-folded tokens - keywords and pages are tokenized the same way"""
+    return [normalize_token(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+
+class KeywordAutomaton:
+    """Token trie of every keyword of every topic; one pass over a page finds all of them.
+
+    tables: topic -> group name -> keywords (any groups, not only primary/context/exclude)
+    """
+
+    _END = None  # key holding the (topic, group, keyword) entries ending at a node
+
+    def __init__(self, tables: dict):
+        self.root = {}
+        for topic, groups in tables.items():
+            for group, group_keywords in groups.items():
+                for keyword in group_keywords:
+                    tokens = tokenize(keyword)
+                    if not tokens:
+                        continue
+                    node = self.root
+                    for token in tokens:
+                        node = node.setdefault(token, {})
+                    entries = node.setdefault(self._END, [])
+                    # "ball" and "balls" are the same tokens once folded - count them once
+                    if not any(t == topic and g == group for t, g, _ in entries):
+                        entries.append((topic, group, keyword))
+
+    def scan(self, tokens: list) -> dict:
+        """topic -> set of (group, keyword) found in the token list"""
+        found = {}
+        root, end = self.root, self._END
+        for start in range(len(tokens)):
+            node = root.get(tokens[start])
+            position = start + 1
+            while node is not None:
+                for topic, group, keyword in node.get(end, ()):
+                    found.setdefault(topic, set()).add((group, keyword))
+                if position == len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return found
+
+
+class FuzzyIndex:
+    """Maps OCR-damaged page tokens onto keyword tokens, built once per keyword set.
+
+    A page token is corrected only when it is not itself a keyword token and exactly one
+    keyword token explains it: a known OCR spelling ("rnean", "rightangled"), or for tokens
+    of FUZZY_MIN_LENGTH letters or more, one letter read as a similar-looking one or a thin
+    letter dropped or added. Candidates are looked up in a deletion-neighbourhood index
+    rather than compared against every keyword, so correcting a token costs a few dict lookups.
+    """
+
+    def __init__(self, tables: dict):
+        keyword_tokens = [tokenize(kw) for groups in tables.values()
+                          for group in ('primary', 'context', 'exclude') for kw in groups.get(group, [])]
+        self.vocabulary = {token for tokens in keyword_tokens for token in tokens}
+        words = sorted(t for t in self.vocabulary if t.isalpha() and len(t) >= 3)
+
+        # Known OCR spellings of whole keyword tokens
+        self.variants = {}
+        for word in words:
+            for letter, confusion in OCR_LETTER_CONFUSIONS.items():
+                positions = [i for i, c in enumerate(word) if c == letter]
+                spellings = [word[:i] + confusion + word[i + 1:] for i in positions]
+                if len(positions) > 1:
+                    spellings.append(word.replace(letter, confusion))
+                for spelling in spellings:
+                    self.variants.setdefault(spelling, (word,))
+        # "right-angled" read as one word, or joined back up after a line-break hyphen
+        for tokens in keyword_tokens:
+            for i in range(1, len(tokens) - 1):
+                if tokens[i] == '-' and tokens[i - 1].isalpha() and tokens[i + 1].isalpha():
+                    self.variants.setdefault(tokens[i - 1] + tokens[i + 1], tuple(tokens[i - 1:i + 2]))
+        for spelling in [s for s in self.variants if s in self.vocabulary]:
+            del self.variants[spelling]
+
+        # Every keyword word with one letter deleted -> [(word, position)]
+        self.deletions = {}
+        for word in words:
+            if len(word) >= FUZZY_MIN_LENGTH:
+                for i in range(len(word)):
+                    self.deletions.setdefault(word[:i] + word[i + 1:], []).append((word, i))
+        self.similar = {(a, b) for group in OCR_SIMILAR_LETTERS for a in group for b in group if a != b}
+
+        self.correct = lru_cache(maxsize=100_000)(self._correct)
+
+    def _correct(self, token: str) -> tuple:
+        """Keyword tokens the page token stands for - the token itself if none or ambiguous"""
+        if token in self.vocabulary or not token.isalpha():
+            return (token,)
+        if token in self.variants:
+            return self.variants[token]
+        if len(token) < FUZZY_MIN_LENGTH:
+            return (token,)
+
+        # A thin letter missing from the page token
+        candidates = {word for word, i in self.deletions.get(token, ()) if word[i] in OCR_THIN_LETTERS}
+        for i in range(len(token)):
+            deleted = token[:i] + token[i + 1:]
+            # A thin letter added on the page
+            if token[i] in OCR_THIN_LETTERS and deleted in self.vocabulary and len(deleted) >= FUZZY_MIN_LENGTH:
+                candidates.add(deleted)
+            # One letter read as a similar-looking one
+            for word, position in self.deletions.get(deleted, ()):
+                if position == i and (token[i], word[i]) in self.similar:
+                    candidates.add(word)
+        return (candidates.pop(),) if len(candidates) == 1 else (token,)
+
+    def tokenize(self, text: str) -> list:
+        """tokenize() for OCR text: rejoin line-break hyphens, fix digit/letter confusions,
+        then correct each token"""
+        text = HYPHENATED_BREAK.sub(r'\1\2', text.lower())
+        text = OCR_CONFUSED_CHAR.sub(lambda m: OCR_CHAR_CONFUSIONS[m.group()], text)
+        tokens = []
+        for token in tokenize(text):
+            tokens.extend(self.correct(token))
+        return tokens
+
+
+class KeywordSet:
+    """Immutable snapshot of normalized keyword tables and their version"""
+
+    def __init__(self, tables: dict, version: str, source: str, created: str = None):
+        self.tables = tables
+        self.version = version
+        self.source = source
+        self.created = created
+        self._automaton = None
+        self._fuzzy_index = None
+
+    @property
+    def automaton(self) -> KeywordAutomaton:
+        """Token matcher for these tables, built on first use"""
+        if self._automaton is None:
+            self._automaton = KeywordAutomaton(self.tables)
+        return self._automaton
+
+    @property
+    def fuzzy_index(self) -> FuzzyIndex:
+        """OCR error corrector for these tables, built on first use"""
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyIndex(self.tables)
+        return self._fuzzy_index
+
+    def info(self) -> dict:
+        return {
+            'version': self.version,
+            'source': self.source,
+            'created': self.created,
+            'topics': len(self.tables),
+            'keywords': sum(len(group) for kws in self.tables.values() for group in kws.values()),
+        }
+
+
+def normalize_keyword_tables(tables: dict) -> dict:
+    """Lowercase and de-duplicate keywords (order kept) so matching never re-normalizes"""
+    normalized = {}
+    for topic, groups in tables.items():
+        normalized[topic.lower()] = {
+            group: list(dict.fromkeys(kw.lower() for kw in groups.get(group, []) if kw))
+            for group in ('primary', 'context', 'exclude')
+        }
+    return normalized
+
+
+def tables_version(tables: dict) -> str:
+    """Content hash of normalized tables - identical keywords give the same version"""
+    encoded = json.dumps(tables, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:12]
+
+
+def build_keyword_artifact(tables: dict, source: str = '') -> dict:
+    """Versioned, normalized keyword tables ready to load without further processing"""
+    normalized = normalize_keyword_tables(tables)
+    return {
+        'format': ARTIFACT_FORMAT,
+        'version': tables_version(normalized),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'source': source,
+        'topics': normalized,
+    }
+
+
+def save_keyword_artifact(artifact: dict, path: Path = ARTIFACT_FILE):
+    """Write the artifact atomically - a running server never sees a partial file"""
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(artifact, f, indent=1, ensure_ascii=False)
+    tmp_path.replace(path)
+
+
+def load_keyword_artifact(path: Path = ARTIFACT_FILE) -> KeywordSet:
+    with open(path, encoding='utf-8') as f:
+        artifact = json.load(f)
+    if artifact.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"unsupported keyword artifact format {artifact.get('format')}")
+    return KeywordSet(artifact['topics'], artifact['version'], path.name, created=artifact.get('created'))
+
+
+_builtin_tables = normalize_keyword_tables(STRICT_TOPIC_KEYWORDS)
+_builtin_keywords = KeywordSet(_builtin_tables, tables_version(_builtin_tables), 'strict_keywords.py')
+
+# The snapshot in use; replaced as a whole so readers always see one consistent version
+_active = {'keywords': _builtin_keywords, 'mtime': None, 'checked_at': 0.0}
+_reload_lock = threading.Lock()
+
+
+def get_active_keywords() -> KeywordSet:
+    """Current keyword snapshot, hot-reloading keyword_artifact.json if it changed"""
+    now = time.monotonic()
+    if now - _active['checked_at'] < RELOAD_CHECK_SECONDS:
+        return _active['keywords']
+
+    with _reload_lock:
+        _active['checked_at'] = now
+        try:
+            mtime = ARTIFACT_FILE.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if mtime != _active['mtime']:
+            if mtime is None:
+                _active['keywords'] = _builtin_keywords
+                print(f"   🔑 Keyword artifact removed - using built-in keywords ({_builtin_keywords.version})")
+            else:
+                try:
+                    _active['keywords'] = load_keyword_artifact()
+                    print(f"   🔑 Loaded keyword artifact version {_active['keywords'].version}")
+                except (OSError, ValueError, KeyError) as e:
+                    # Keep serving the previous version rather than failing requests
+                    print(f"   ⚠ Could not load keyword artifact: {e}")
+            _active['mtime'] = mtime
+
+    return _active['keywords']
+
+
+def get_keyword_version() -> str:
+    return get_active_keywords().version
+
+
+def resolve_topic(topic_name: str) -> str:
+    """Keyword table key for a topic name ("25 - Probability", an alias...), or None"""
     # Normalize topic name
     topic_lower = topic_name.lower()
 
@@ -430,67 +731,182 @@ def get_strict_keywords(topic_name: str) -> dict:
     if topic_lower in TOPIC_ALIASES:
         topic_lower = TOPIC_ALIASES[topic_lower]
 
+    tables = get_active_keywords().tables
+
     # Direct match
-    if topic_lower in STRICT_TOPIC_KEYWORDS:
-        return STRICT_TOPIC_KEYWORDS[topic_lower]
+    if topic_lower in tables:
+        return topic_lower
 
     # Partial match
-    for key in STRICT_TOPIC_KEYWORDS:
+    for key in tables:
         if key in topic_lower or topic_lower in key:
-            return STRICT_TOPIC_KEYWORDS[key]
+            return key
 
-    return {"primary": [], "context": [], "exclude": []}
+    return None
 
 
-def page_matches_topic(page_text: str, topic_name: str, debug: bool = False) -> tuple:
+def get_strict_keywords(topic_name: str) -> dict:
+    """Get strict keywords for a topic"""
+    key = resolve_topic(topic_name)
+    if key is None:
+        return {"primary": [], "context": [], "exclude": []}
+    return get_active_keywords().tables[key]
+
+
+@lru_cache(maxsize=8)
+def _scan_page(page_text: str, keywords: KeywordSet, match_mode: str) -> dict:
+    # Scoring one page against every topic (evaluation, the score matrix) tokenizes it once
+    if match_mode == 'fuzzy':
+        return keywords.automaton.scan(keywords.fuzzy_index.tokenize(page_text))
+    return keywords.automaton.scan(tokenize(page_text))
+
+
+def match_mode_for_source(source: str) -> str:
+    """Match mode for a page given where its text came from ('text', 'ocr' or 'combined')"""
+    return DEFAULT_MATCH_MODE if source == 'text' else OCR_MATCH_MODE
+
+
+class PageScore(NamedTuple):
+    """One page scored for one topic under a scoring profile"""
+    matches: bool
+    confidence: str      # 'high', 'medium' or None
+    score: int
+    keywords: tuple      # matched keywords other than excludes, in table order
+    excluded: tuple      # exclude keywords found on the page
+
+
+# Scoring profiles - how the keyword hits on a page become a score and a confidence.
+# Every profile is scored from the same single token scan; they differ only in weights
+# and thresholds, so one page gets the same hits whichever endpoint asks.
+SCORING_PROFILES = {
+    # Past papers: a primary keyword is required; each exclude costs 2 and more excludes
+    # than primaries rejects the page. A match needs 3, 'high' 5, and 2 is still offered.
+    'strict': {
+        'weights': {'primary': 3, 'context': 1, 'exclude': -2},
+        'require_primary': True,
+        'hard_exclude': False,
+        'match_score': 3,
+        'high_score': HIGH_SCORE,
+        'medium_score': POSSIBLE_SCORE,
+    },
+    # Uploaded worksheets and scans: any exclude rejects the page, while the wider
+    # topic_keywords list ('related') and the topic's own name ('name') add evidence
+    'custom': {
+        'weights': {'primary': 10, 'context': 3, 'related': 1, 'name': 5},
+        'require_primary': False,
+        'hard_exclude': True,
+        'match_score': 10,
+        'high_score': 10,
+        'medium_score': 3,
+    },
+}
+DEFAULT_PROFILE = 'strict'
+KEYWORD_GROUPS = ('primary', 'context', 'exclude')
+
+
+def get_scoring_version() -> str:
+    """Keyword version plus match modes - what a stored page score depends on"""
+    return f"{get_keyword_version()}/{DEFAULT_MATCH_MODE}/{OCR_MATCH_MODE}"
+
+
+@lru_cache(maxsize=32)
+def _topic_automaton(keywords: KeywordSet, topic_key: str, extra_groups: tuple) -> KeywordAutomaton:
+    # One topic's table plus request-specific groups, so a page is still scanned once
+    groups = dict(keywords.tables.get(topic_key, {}))
+    groups.update(extra_groups)
+    return KeywordAutomaton({topic_key: groups})
+
+
+def _find_keywords(page_text: str, topic_key: str, match_mode: str, extra_groups: tuple = ()) -> dict:
+    """group -> keywords of that group present on the page, in table order.
+
+    extra_groups: ((group, keywords), ...) scanned alongside the topic's own table
+    """
+    if match_mode not in MATCH_MODES:
+        raise ValueError(f"unknown match mode {match_mode!r} (expected one of {MATCH_MODES})")
+    keywords = get_active_keywords()
+    groups = dict(keywords.tables.get(topic_key, {}))
+    groups.update(extra_groups)
+
+    if match_mode == 'substring':
+        # Keywords are already lowercase in the active tables
+        text_lower = page_text.lower()
+        return {group: [kw for kw in kws if kw.lower() in text_lower] for group, kws in groups.items()}
+
+    if extra_groups:
+        tokens = keywords.fuzzy_index.tokenize(page_text) if match_mode == 'fuzzy' else tokenize(page_text)
+        found = _topic_automaton(keywords, topic_key, extra_groups).scan(tokens).get(topic_key, ())
+    else:
+        found = _scan_page(page_text, keywords, match_mode).get(topic_key, ())
+    return {group: [kw for kw in kws if (group, kw) in found] for group, kws in groups.items()}
+
+
+@lru_cache(maxsize=4096)
+def _score_page(page_text: str, keywords: KeywordSet, topic_key: str, profile_name: str,
+                match_mode: str, extra_groups: tuple) -> PageScore:
+    # keywords is part of the cache key so a keyword reload never serves old scores
+    profile = SCORING_PROFILES[profile_name]
+    hits = _find_keywords(page_text, topic_key, match_mode, extra_groups)
+    primary, excluded = hits.get('primary', []), tuple(hits.get('exclude', []))
+    if profile['require_primary'] and not primary:
+        return PageScore(False, None, 0, (), excluded)
+    if excluded and (profile['hard_exclude'] or len(excluded) > len(primary)):
+        return PageScore(False, None, 0, (), excluded)
+
+    weights = profile['weights']
+    score = sum(weights.get(group, 0) * len(found) for group, found in hits.items())
+    matched = tuple(kw for group, found in hits.items() if group != 'exclude' and weights.get(group, 0) > 0
+                    for kw in found)
+    if score >= profile['high_score']:
+        confidence = 'high'
+    elif score >= profile['medium_score']:
+        confidence = 'medium'
+    else:
+        confidence = None
+    return PageScore(score >= profile['match_score'], confidence, score, matched, excluded)
+
+
+def score_page(page_text: str, topic_name: str, profile: str = DEFAULT_PROFILE,
+               match_mode: str = DEFAULT_MATCH_MODE, related: list = None) -> PageScore:
+    """Score a page for a topic under a scoring profile (see SCORING_PROFILES).
+
+    related: the topic's wider keyword list, used by profiles that weight 'related'.
+    Results are cached per page text, topic, profile and match mode.
+    """
+    if profile not in SCORING_PROFILES:
+        raise ValueError(f"unknown scoring profile {profile!r} (expected one of {tuple(SCORING_PROFILES)})")
+    topic_key = resolve_topic(topic_name)
+    weights = SCORING_PROFILES[profile]['weights']
+
+    extra_groups = []
+    if weights.get('related') and related:
+        extra_groups.append(('related', tuple(sorted({kw.lower() for kw in related}))))
+    if weights.get('name'):
+        name = topic_name.split(' - ', 1)[1] if ' - ' in topic_name else topic_name
+        extra_groups.append(('name', (name.strip().lower(),)))
+    return _score_page(page_text, get_active_keywords(), topic_key, profile, match_mode, tuple(extra_groups))
+
+
+def page_matches_topic(page_text: str, topic_name: str, debug: bool = False,
+                       match_mode: str = DEFAULT_MATCH_MODE) -> tuple:
     """
     Check if a page matches a topic using strict keyword matching.
     Returns (matches: bool, score: int, matched_keywords: list)
     """
-    text_lower = page_text.lower()
-    keywords = get_strict_keywords(topic_name)
-
-    if not keywords["primary"]:
-        return (False, 0, [])
-
-    # Count primary keyword matches (these are essential)
-    primary_matches = []
-    for kw in keywords["primary"]:
-        if kw.lower() in text_lower:
-            primary_matches.append(kw)
-
-    # Count context keyword matches (supporting evidence)
-    context_matches = []
-    for kw in keywords.get("context", []):
-        if kw.lower() in text_lower:
-            context_matches.append(kw)
-
-    # Scoring: Need at least 1 primary keyword to match
-    # Score = (primary_matches * 3) + context_matches
-    if len(primary_matches) == 0:
-        return (False, 0, [])
-
-    # Check for exclusions that should prevent matching
-    excluded_count = 0
-    excluded_terms = []
-    for exclude in keywords.get("exclude", []):
-        if exclude.lower() in text_lower:
-            excluded_count += 1
-            excluded_terms.append(exclude)
-            if debug:
-                print(f"      Found exclude term: {exclude}")
-
-    # If more exclusions than primary matches, probably wrong topic
-    if excluded_count > len(primary_matches):
-        if debug:
-            print(f"      REJECTED: {excluded_count} excludes > {len(primary_matches)} primary matches")
-        return (False, 0, [])
-
-    score = (len(primary_matches) * 3) + len(context_matches) - (excluded_count * 2)
-    all_matches = primary_matches + context_matches
-
-    # Minimum score threshold
-    if score >= 3:
-        return (True, score, all_matches)
-
-    return (False, score, all_matches)
+    result = score_page(page_text, topic_name, match_mode=match_mode)
+    if debug:
+        for exclude in result.excluded:
+            print(f"      Found exclude term: {exclude}")
+    return (result.matches, result.score, list(result.keywords))
+
+
+def page_confidence(page_text: str, topic_name: str, match_mode: str = DEFAULT_MATCH_MODE) -> tuple:
+    """Grade a page for a topic as used when scanning papers.
+    Returns (confidence: 'high' | 'medium' | None, score: int, matched_keywords: list)
+    """
+    # Skip very short pages (likely blank or just headers)
+    if len(page_text) < 50:
+        return (None, 0, [])
+
+    result = score_page(page_text, topic_name, match_mode=match_mode)
+    return (result.confidence, result.score, list(result.keywords))
@@ -0,0 +1,203 @@
+"""
+Single-Pass Text Feature Extraction for Keyword Training
+Tokenizes a document once with one combined regex and produces, from that token stream:
+- word counts (stop words removed)
+- bigram and trigram counts
+- maths symbol/notation counts
+- common maths phrases ("find the ...", "in terms of ...", "x = 5")
+"""
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+# Common words to ignore (stop words)
+STOP_WORDS = {
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
+    'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
+    'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
+    'below', 'between', 'under', 'again', 'further', 'then', 'once',
+    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few',
+    'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only',
+    'own', 'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but',
+    'if', 'or', 'because', 'until', 'while', 'although', 'though',
+    'this', 'that', 'these', 'those', 'what', 'which', 'who', 'whom',
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you',
+    'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his',
+    'himself', 'she', 'her', 'hers', 'herself', 'it', 'its', 'itself',
+    'they', 'them', 'their', 'theirs', 'themselves', 'am', 'about',
+    # Common exam words to ignore
+    'marks', 'mark', 'total', 'answer', 'question', 'show', 'work',
+    'working', 'diagram', 'figure', 'page', 'turn', 'over', 'write',
+    'space', 'box', 'given', 'give', 'find', 'calculate', 'work out',
+    'shown', 'shown below', 'complete', 'state', 'explain', 'describe',
+    'hence', 'therefore', 'using', 'use', 'correct', 'decimal', 'places',
+    'significant', 'figures', 'accurately', 'clearly', 'must', 'full',
+}
+
+
+# One alternation for everything: alphanumeric runs, then maths notation tokens.
+# Multi-character operators come first so "<=" is one token rather than "<" and "=".
+TOKEN_PATTERN = re.compile(r"""
+    (?P<word>[a-z0-9]+)
+  | (?P<symbol>
+        <=|>=|!=|->|&lt;|&gt;|\\vec
+      | \^[\{\[]?-?[a-z0-9/]+[\}\]]?
+      | _\{?[a-z0-9]+\}?
+      | [=<>≠≤≥±×*÷/²³√πθαβδσ∞∝∠°→]
+    )
+""", re.VERBOSE)
+
+# Maths notation tokens -> pattern names they count towards.
+# A compound operator also counts its parts ("<=" is a less-than and an equals sign).
+SYMBOL_PATTERNS = {
+    '=': ('equals',),
+    '≠': ('not_equals',),
+    '!=': ('not_equals', 'equals'),
+    '<': ('less_than',),
+    '&lt;': ('less_than',),
+    '>': ('greater_than',),
+    '&gt;': ('greater_than',),
+    '≤': ('less_equal',),
+    '<=': ('less_equal', 'less_than', 'equals'),
+    '≥': ('greater_equal',),
+    '>=': ('greater_equal', 'greater_than', 'equals'),
+    '±': ('plus_minus',),
+    '×': ('multiply',),
+    '*': ('multiply',),
+    '÷': ('divide',),
+    '/': ('divide', 'fraction_bar'),
+    '²': ('squared',),
+    '³': ('cubed',),
+    '√': ('square_root',),
+    'π': ('pi',),
+    'θ': ('theta',),
+    'α': ('alpha',),
+    'β': ('beta',),
+    'δ': ('delta',),
+    'σ': ('sigma',),
+    '∞': ('infinity',),
+    '∝': ('proportional',),
+    '∠': ('angle',),
+    '°': ('degree',),
+    '→': ('arrow', 'vector_notation'),
+    '->': ('arrow', 'greater_than'),
+    '\\vec': ('vector_notation',),
+}
+
+# Spelled-out notation, matched as whole words (plural "s" allowed)
+WORD_PATTERNS = {
+    'sqrt': 'square_root', 'pi': 'pi', 'theta': 'theta', 'alpha': 'alpha', 'beta': 'beta',
+    'delta': 'delta', 'sigma': 'sigma', 'infinity': 'infinity', 'angle': 'angle', 'degree': 'degree',
+}
+
+
+def tokenize(text: str) -> List[tuple]:
+    """Split lowercased text into (kind, token) pairs, kind being 'word' or 'symbol'"""
+    return [(match.lastgroup, match.group()) for match in TOKEN_PATTERN.finditer(text.lower())]
+
+
+def _count_patterns(tokens: List[tuple]) -> Counter:
+    patterns = Counter()
+    for kind, token in tokens:
+        if kind == 'symbol':
+            if token[0] == '^':
+                patterns['superscript'] += 1
+                if token[1:] in ('2', '3'):
+                    patterns['squared' if token[1] == '2' else 'cubed'] += 1
+            elif token[0] == '_':
+                patterns['subscript'] += 1
+            else:
+                patterns.update(SYMBOL_PATTERNS.get(token, ()))
+        else:
+            name = WORD_PATTERNS.get(token) or (token.endswith('s') and WORD_PATTERNS.get(token[:-1]))
+            if name:
+                patterns[name] += 1
+    return patterns
+
+
+def _content_words_after(tokens: List[tuple], start: int, limit: int) -> List[str]:
+    """Up to `limit` words from tokens[start:], stopping at a stop word or symbol"""
+    words = []
+    for kind, token in tokens[start:start + limit]:
+        if kind != 'word' or token in STOP_WORDS:
+            break
+        words.append(token)
+    return words
+
+
+def _extract_phrases(tokens: List[tuple]) -> Counter:
+    """Common maths phrase templates, found in one walk over the token stream"""
+    phrases = Counter()
+    words = [token if kind == 'word' else (token if token == '=' else None) for kind, token in tokens]
+    count = len(words)
+
+    def word_at(i):
+        return words[i] if 0 <= i < count else None
+
+    def content_at(i):
+        token = word_at(i)
+        return token if token and token != '=' and token not in STOP_WORDS else None
+
+    for i, token in enumerate(words):
+        if token is None:
+            continue
+        following = word_at(i + 1)
+
+        if token in ('find', 'calculate') and following == 'the':
+            rest = _content_words_after(tokens, i + 2, 3)
+            if rest:
+                phrases[f"{token} the {' '.join(rest)}"] += 1
+        elif token == 'work' and following == 'out' and word_at(i + 2) == 'the':
+            rest = _content_words_after(tokens, i + 3, 3)
+            if rest:
+                phrases[f"work out the {' '.join(rest)}"] += 1
+        elif token == 'in' and following == 'terms' and word_at(i + 2) == 'of' and word_at(i + 3):
+            phrases[f"in terms of {word_at(i + 3)}"] += 1
+        elif token == 'express':
+            # "express <1-3 words> as" - a symbol ("express 3/4 as") ends the phrase
+            for j in range(i + 1, min(i + 5, count)):
+                if words[j] is None or words[j] == '=':
+                    break
+                if words[j] == 'as' and j > i + 1:
+                    phrases[' '.join(words[i:j + 1])] += 1
+                    break
+        elif token == 'simplify':
+            rest = _content_words_after(tokens, i + 1, 3)
+            if rest:
+                phrases[f"simplify {' '.join(rest)}"] += 1
+        elif token == 'solve' and following == 'the':
+            rest = _content_words_after(tokens, i + 2, 2)
+            if rest:
+                phrases[f"solve the {' '.join(rest)}"] += 1
+        elif token == 'of' and following == 'the' and content_at(i - 1) and content_at(i + 2):
+            phrases[f"{words[i - 1]} of the {words[i + 2]}"] += 1
+        elif token == '=' and word_at(i - 1) and word_at(i + 1) and word_at(i + 1) != '=':
+            phrases[f"{words[i - 1]} = {following}"] += 1
+        elif token == 'the' and content_at(i + 1) and word_at(i + 2) == 'of' and content_at(i + 3):
+            phrases[f"the {words[i + 1]} of {words[i + 3]}"] += 1
+        elif token == 'is' and content_at(i + 1) and word_at(i + 2) == 'to':
+            phrases[f"is {following} to"] += 1
+        elif token == 'and' and content_at(i - 1) and content_at(i + 1) and (words[i - 1] + following).isalpha():
+            phrases[f"{words[i - 1]} and {following}"] += 1
+
+    return Counter({phrase: n for phrase, n in phrases.items() if len(phrase) > 3})
+
+
+def extract_features(text: str) -> Dict[str, Counter]:
+    """Tokenize once and count words, bigrams, trigrams, maths patterns and phrases"""
+    tokens = tokenize(text)
+
+    # Same filtering for single words and n-grams: alphabetic, 3+ letters, not a stop word
+    words = [token for kind, token in tokens
+             if kind == 'word' and len(token) > 2 and token.isalpha() and token not in STOP_WORDS]
+
+    return {
+        'word_freq': Counter(words),
+        'bigrams': Counter(' '.join(pair) for pair in zip(words, words[1:])),
+        'trigrams': Counter(' '.join(triple) for triple in zip(words, words[1:], words[2:])),
+        'math_patterns': _count_patterns(tokens),
+        'phrases': _extract_phrases(tokens),
+    }
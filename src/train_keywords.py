@@ -6,293 +6,373 @@ Analyzes topic-specific papers to extract unique keywords and patterns.
 
 import os
 import sys
-import re
 import json
+import hashlib
+import argparse
 from pathlib import Path
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Dict, List, Set, Tuple
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+from keyword_scoring import rank_topic_terms
+from text_features import extract_features
+
 try:
     import pypdfium2 as pdfium
-    from pypdf import PdfReader
     import pdfplumber
 except ImportError as e:
     print(f"Missing dependency: {e}")
-    print("Run: pip install pypdfium2 pypdf pdfplumber")
+    print("Run: pip install pypdfium2 pdfplumber")
     sys.exit(1)
 
-# Import enhanced OCR if available
-try:
-    from web_app_v2 import extract_text_from_pdf_page, extract_text_with_enhanced_ocr
-    ENHANCED_OCR_AVAILABLE = True
-except ImportError:
-    ENHANCED_OCR_AVAILABLE = False
+from pdf_text import enhanced_ocr_available, extract_text_with_enhanced_ocr
+
+# pdf_text imports OpenCV and pytesseract lazily, so probe them (and the Tesseract binary) directly
+ENHANCED_OCR_AVAILABLE = enhanced_ocr_available()
+if not ENHANCED_OCR_AVAILABLE:
     print("Warning: Enhanced OCR not available, using basic extraction")
 
 TRAINING_DIR = Path(__file__).parent / "training"
 OUTPUT_FILE = Path(__file__).parent / "learned_keywords.json"
 
-# Common words to ignore (stop words)
-STOP_WORDS = {
-    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-    'should', 'may', 'might', 'must', 'shall', 'can', 'need', 'dare',
-    'ought', 'used', 'to', 'of', 'in', 'for', 'on', 'with', 'at', 'by',
-    'from', 'as', 'into', 'through', 'during', 'before', 'after', 'above',
-    'below', 'between', 'under', 'again', 'further', 'then', 'once',
-    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'each', 'few',
-    'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only',
-    'own', 'same', 'so', 'than', 'too', 'very', 'just', 'and', 'but',
-    'if', 'or', 'because', 'until', 'while', 'although', 'though',
-    'this', 'that', 'these', 'those', 'what', 'which', 'who', 'whom',
-    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you',
-    'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his',
-    'himself', 'she', 'her', 'hers', 'herself', 'it', 'its', 'itself',
-    'they', 'them', 'their', 'theirs', 'themselves', 'am', 'about',
-    # Common exam words to ignore
-    'marks', 'mark', 'total', 'answer', 'question', 'show', 'work',
-    'working', 'diagram', 'figure', 'page', 'turn', 'over', 'write',
-    'space', 'box', 'given', 'give', 'find', 'calculate', 'work out',
-    'shown', 'shown below', 'complete', 'state', 'explain', 'describe',
-    'hence', 'therefore', 'using', 'use', 'correct', 'decimal', 'places',
-    'significant', 'figures', 'accurately', 'clearly', 'must', 'full',
-}
-
-# Mathematical symbols and patterns to look for
-MATH_PATTERNS = {
-    'equals': r'=',
-    'not_equals': r'≠|!=',
-    'less_than': r'<|&lt;',
-    'greater_than': r'>|&gt;',
-    'less_equal': r'≤|<=',
-    'greater_equal': r'≥|>=',
-    'plus_minus': r'±',
-    'multiply': r'×|\\*',
-    'divide': r'÷|/',
-    'squared': r'²|\^2',
-    'cubed': r'³|\^3',
-    'square_root': r'√|sqrt',
-    'pi': r'π|pi',
-    'theta': r'θ|theta',
-    'alpha': r'α|alpha',
-    'beta': r'β|beta',
-    'delta': r'Δ|δ|delta',
-    'sigma': r'Σ|σ|sigma',
-    'infinity': r'∞|infinity',
-    'proportional': r'∝',
-    'angle': r'∠|angle',
-    'degree': r'°|degrees?',
-    'arrow': r'→|->',
-    'fraction_bar': r'/',
-    'vector_notation': r'\\vec|→',
-    'subscript': r'_\{?[a-z0-9]+\}?',
-    'superscript': r'\^[\{\[]?[-]?[a-z0-9/]+[\}\]]?',
-}
-
-
-def extract_text_from_pdf(pdf_path: Path, use_ocr: bool = True) -> str:
-    """Extract all text from a PDF using best available method"""
-    all_text = []
+# Per-document feature checkpoints, keyed by file hash, so a crashed or repeated run resumes
+SHARD_DIR = Path(__file__).parent / "training_cache" / "docs"
+# Running per-topic totals of the shards, updated by adding/subtracting changed documents
+AGGREGATE_FILE = Path(__file__).parent / "training_cache" / "aggregate.json"
+FEATURE_KEYS = ('word_freq', 'bigrams', 'trigrams', 'math_patterns', 'phrases')
+# Bump when feature extraction changes so stale shards are recomputed
+FEATURE_VERSION = 3
 
-    try:
-        reader = PdfReader(pdf_path)
-        num_pages = len(reader.pages)
+# Pages with less text than this are treated as scanned and OCR'd
+MIN_TEXT_LAYER_CHARS = 100
 
-        for page_num in range(num_pages):
-            if ENHANCED_OCR_AVAILABLE and use_ocr:
-                # Use enhanced OCR for better accuracy
-                text = extract_text_from_pdf_page(pdf_path, page_num, force_ocr=True)
-            else:
-                # Fallback to pdfplumber
-                try:
-                    with pdfplumber.open(pdf_path) as pdf:
-                        if page_num < len(pdf.pages):
-                            text = pdf.pages[page_num].extract_text() or ""
-                except:
-                    text = reader.pages[page_num].extract_text() or ""
 
-            all_text.append(text)
+def extract_page_texts(pdf_path: Path, use_ocr: bool = True, force_ocr: bool = False) -> List[str]:
+    """Extract text from every page, opening the PDF once.
+
+    The text layer is used where it exists; enhanced OCR only runs on pages with
+    little or no embedded text (scans), or on every page if force_ocr is set.
+    """
+    page_texts = []
+
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_num, page in enumerate(pdf.pages):
+                text = ""
+                if not force_ocr:
+                    try:
+                        text = page.extract_text() or ""
+                    except Exception:
+                        text = ""
+
+                if ENHANCED_OCR_AVAILABLE and use_ocr and (force_ocr or len(text) < MIN_TEXT_LAYER_CHARS):
+                    ocr_text = extract_text_with_enhanced_ocr(pdf_path, page_num)
+                    if len(ocr_text) > len(text):
+                        text = ocr_text
+
+                page_texts.append(text)
 
     except Exception as e:
         print(f"Error reading {pdf_path}: {e}")
-        return ""
+        return []
 
-    return "\n".join(all_text)
+    return page_texts
 
 
-def extract_ngrams(text: str, n: int = 2) -> List[str]:
-    """Extract n-grams (word sequences) from text"""
-    words = re.findall(r'\b[a-zA-Z]{2,}\b', text.lower())
-    words = [w for w in words if w not in STOP_WORDS and len(w) > 2]
+def extract_text_from_pdf(pdf_path: Path, use_ocr: bool = True, force_ocr: bool = False) -> str:
+    """Extract all text from a PDF using best available method"""
+    return "\n".join(extract_page_texts(pdf_path, use_ocr, force_ocr))
 
-    ngrams = []
-    for i in range(len(words) - n + 1):
-        ngram = ' '.join(words[i:i+n])
-        ngrams.append(ngram)
 
-    return ngrams
+def document_features(text: str) -> Dict:
+    """Count words, n-grams, maths patterns and phrases for one document (single tokenizer pass)"""
+    return extract_features(text)
 
 
-def extract_math_patterns(text: str) -> Dict[str, int]:
-    """Find mathematical symbols and patterns in text"""
-    patterns_found = {}
+def file_hash(path: Path) -> str:
+    """SHA-1 of a file's contents - identifies a document regardless of name or folder"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    for name, pattern in MATH_PATTERNS.items():
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            patterns_found[name] = len(matches)
 
-    return patterns_found
+def ocr_mode(use_ocr: bool = True, force_ocr: bool = False) -> str:
+    """How page text is extracted: 'force' (OCR every page), 'auto' (OCR scanned pages) or 'text'.
+    Shards and topic totals are only reused by runs with the same mode.
+    """
+    if force_ocr:
+        return 'force'
+    return 'auto' if use_ocr and ENHANCED_OCR_AVAILABLE else 'text'
 
 
-def extract_unique_phrases(text: str) -> List[str]:
-    """Extract potentially unique mathematical phrases"""
-    phrases = []
+def shard_path(doc_hash: str) -> Path:
+    return SHARD_DIR / f"{doc_hash}.json"
 
-    # Common maths phrase patterns
-    phrase_patterns = [
-        r'find the (\w+ ?){1,3}',
-        r'calculate the (\w+ ?){1,3}',
-        r'work out the (\w+ ?){1,3}',
-        r'(\w+ ?){1,2} of the (\w+ ?){1,2}',
-        r'in terms of (\w+)',
-        r'express (\w+ ?){1,3} as',
-        r'simplify (\w+ ?){1,3}',
-        r'solve the (\w+ ?){1,2}',
-        r'(\w+) = (\w+)',
-        r'the (\w+) of (\w+)',
-        r'is (\w+) to',
-        r'(\w+) and (\w+)',
-    ]
 
-    for pattern in phrase_patterns:
-        matches = re.findall(pattern, text.lower())
-        for match in matches:
-            if isinstance(match, tuple):
-                phrase = ' '.join(m.strip() for m in match if m.strip())
-            else:
-                phrase = match.strip()
-            if phrase and len(phrase) > 3:
-                phrases.append(phrase)
-
-    return phrases
-
-
-def analyze_topic_folder(folder_path: Path) -> Dict:
-    """Analyze all PDFs in a topic folder"""
-    results = {
-        'word_freq': Counter(),
-        'bigrams': Counter(),
-        'trigrams': Counter(),
-        'math_patterns': Counter(),
-        'phrases': Counter(),
-        'total_docs': 0,
-        'total_pages': 0,
-    }
+def load_shard(doc_hash: str, mode: str = None) -> Dict:
+    """Load a document's checkpointed features, or None if missing/stale.
 
-    pdf_files = list(folder_path.glob('*.pdf'))
-    if not pdf_files:
-        return results
+    mode: the extraction mode (see ocr_mode) the shard must have been made with
+    """
+    path = shard_path(doc_hash)
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            shard = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if shard.get('feature_version') != FEATURE_VERSION:
+        return None
+    if mode is not None and shard.get('ocr_mode') != mode:
+        return None
+    return shard
+
+
+def save_shard(doc_hash: str, shard: Dict):
+    """Write a shard atomically so an interrupted run never leaves a half-written file"""
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = shard_path(doc_hash).with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(shard, f)
+    tmp_path.replace(shard_path(doc_hash))
+
+
+def analyze_document(pdf_path: str, use_ocr: bool = True, force_ocr: bool = False) -> Dict:
+    """Extract text and features for one PDF (runs in a worker process)"""
+    page_texts = extract_page_texts(Path(pdf_path), use_ocr, force_ocr)
+    text = "\n".join(page_texts)
+    features = document_features(text) if text.strip() else None
+
+    return {
+        'feature_version': FEATURE_VERSION,
+        'ocr_mode': ocr_mode(use_ocr, force_ocr),
+        'file': Path(pdf_path).name,
+        'pages': len(page_texts),
+        'features': features,
+    }
 
-    print(f"   Found {len(pdf_files)} PDFs")
 
-    for pdf_path in pdf_files:
-        print(f"      Processing: {pdf_path.name}")
-        text = extract_text_from_pdf(pdf_path, use_ocr=True)
+def process_training_documents(topic_folders: List[Path], workers: int = None,
+                               use_ocr: bool = True, force_ocr: bool = False,
+                               file_index: Dict = None) -> Dict[str, List[str]]:
+    """Make sure every training PDF has a feature shard, fanning out across processes.
 
-        if not text:
-            continue
+    Documents whose hash already has a shard from the same OCR mode are skipped. Each shard
+    is saved as soon as its worker finishes, so a crash only loses the documents in flight.
+    Documents with no text get no shard, so a later run (e.g. with OCR) tries them again.
 
-        results['total_docs'] += 1
+    file_index (relative path -> [size, mtime_ns, hash]) avoids re-hashing unchanged files
+    and is updated in place.
 
-        # Count pages (approximate by line breaks)
-        results['total_pages'] += text.count('\n') // 50 + 1
+    Returns topic folder name -> list of document hashes
+    """
+    mode = ocr_mode(use_ocr, force_ocr)
+    topic_docs = {}
+    pending = {}
+    if file_index is None:
+        file_index = {}
+    seen_files = set()
 
-        # Extract words
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        words = [w for w in words if w not in STOP_WORDS]
-        results['word_freq'].update(words)
+    for folder in topic_folders:
+        hashes = []
+        for pdf_path in sorted(folder.glob('*.pdf')):
+            rel_path = f"{folder.name}/{pdf_path.name}"
+            stat = pdf_path.stat()
+            known = file_index.get(rel_path)
+            if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+                doc_hash = known[2]
+            else:
+                doc_hash = file_hash(pdf_path)
+                file_index[rel_path] = [stat.st_size, stat.st_mtime_ns, doc_hash]
+            seen_files.add(rel_path)
+            hashes.append(doc_hash)
+            if doc_hash not in pending and load_shard(doc_hash, mode) is None:
+                pending[doc_hash] = pdf_path
+        topic_docs[folder.name] = hashes
+
+    for rel_path in set(file_index) - seen_files:
+        del file_index[rel_path]
+
+    total = sum(len(h) for h in topic_docs.values())
+    print(f"\n{total} training PDFs, {total - len(pending)} already processed, {len(pending)} to analyze")
+
+    if not pending:
+        return topic_docs
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(analyze_document, str(pdf_path), use_ocr, force_ocr): (doc_hash, pdf_path)
+            for doc_hash, pdf_path in pending.items()
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            doc_hash, pdf_path = futures[future]
+            try:
+                shard = future.result()
+            except Exception as e:
+                print(f"   [{done}/{len(futures)}] ✗ {pdf_path.name}: {e}")
+                continue
+            if not shard['features']:
+                print(f"   [{done}/{len(futures)}] ⚠ {pdf_path.name}: no text found - not checkpointed")
+                continue
+            save_shard(doc_hash, shard)
+            print(f"   [{done}/{len(futures)}] ✓ {pdf_path.parent.name}/{pdf_path.name} ({shard['pages']} pages)")
+
+    return topic_docs
+
+
+def empty_topic_data() -> Dict:
+    data = {key: Counter() for key in FEATURE_KEYS}
+    data.update({'docs': {}, 'total_docs': 0, 'total_pages': 0})
+    return data
+
+
+def apply_shard(data: Dict, doc_hash: str, shard: Dict, sign: int = 1):
+    """Add (sign=1) or subtract (sign=-1) one document's counters from a topic's totals"""
+    for key in FEATURE_KEYS:
+        counts = shard['features'].get(key, {})
+        if sign > 0:
+            data[key].update(counts)
+        else:
+            data[key].subtract(counts)
+            # Drop words that no longer occur anywhere in the topic
+            data[key] = +data[key]
+
+    if sign > 0:
+        data['docs'][doc_hash] = shard['pages']
+    else:
+        data['docs'].pop(doc_hash, None)
+    data['total_docs'] = len(data['docs'])
+    data['total_pages'] = sum(data['docs'].values())
+
+
+def analyze_topic_folder(doc_hashes: List[str], mode: str = None) -> Dict:
+    """Aggregate the checkpointed features of a topic folder's documents from scratch"""
+    results = empty_topic_data()
+
+    for doc_hash in doc_hashes:
+        shard = load_shard(doc_hash, mode)
+        if shard and shard.get('features'):
+            apply_shard(results, doc_hash, shard)
 
-        # Extract bigrams and trigrams
-        results['bigrams'].update(extract_ngrams(text, 2))
-        results['trigrams'].update(extract_ngrams(text, 3))
+    return results
 
-        # Extract math patterns
-        patterns = extract_math_patterns(text)
-        results['math_patterns'].update(patterns)
 
-        # Extract phrases
-        phrases = extract_unique_phrases(text)
-        results['phrases'].update(phrases)
+def load_aggregate(mode: str = 'auto') -> Dict:
+    """Load the running per-topic totals (empty if missing, from an older feature version
+    or built with a different OCR mode)"""
+    aggregate = {'feature_version': FEATURE_VERSION, 'ocr_mode': mode, 'files': {}, 'topics': {}}
+    if not AGGREGATE_FILE.exists():
+        return aggregate
+    try:
+        with open(AGGREGATE_FILE) as f:
+            stored = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not load {AGGREGATE_FILE.name} ({e}), rebuilding")
+        return aggregate
+    if stored.get('feature_version') != FEATURE_VERSION:
+        return aggregate
+
+    # File hashes don't depend on the mode, so they're kept either way
+    aggregate['files'] = stored.get('files', {})
+    if stored.get('ocr_mode') != mode:
+        return aggregate
+    for topic, stored_data in stored.get('topics', {}).items():
+        data = empty_topic_data()
+        for key in FEATURE_KEYS:
+            data[key] = Counter(stored_data.get(key, {}))
+        data['docs'] = stored_data.get('docs', {})
+        data['total_docs'] = len(data['docs'])
+        data['total_pages'] = sum(data['docs'].values())
+        aggregate['topics'][topic] = data
+    return aggregate
+
+
+def save_aggregate(aggregate: Dict):
+    AGGREGATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = AGGREGATE_FILE.with_suffix('.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(aggregate, f)
+    tmp_path.replace(AGGREGATE_FILE)
+
+
+def update_aggregate(aggregate: Dict, topic_docs: Dict[str, List[str]]) -> Dict[str, int]:
+    """Bring the per-topic totals in line with the documents now in each folder.
+
+    Only added or removed documents are touched: their shard counters are added to or
+    subtracted from the topic totals (a changed file is a removal plus an addition).
+
+    Returns counts of documents added and removed
+    """
+    changes = {'added': 0, 'removed': 0}
+    topics = aggregate['topics']
+    mode = aggregate['ocr_mode']
+
+    for topic in set(topics) - set(topic_docs):
+        changes['removed'] += topics.pop(topic)['total_docs']
+
+    for topic, hashes in topic_docs.items():
+        data = topics.setdefault(topic, empty_topic_data())
+        current = set(hashes)
+
+        removed = [h for h in data['docs'] if h not in current]
+        removed_shards = [(h, load_shard(h, mode)) for h in removed]
+        if any(shard is None or not shard.get('features') for _, shard in removed_shards):
+            # Can't subtract a document we no longer have counters for - recount this topic
+            topics[topic] = analyze_topic_folder(hashes, mode)
+            changes['removed'] += len(removed)
+            changes['added'] += len(current - set(data['docs']))
+            continue
 
-    return results
+        for doc_hash, shard in removed_shards:
+            apply_shard(data, doc_hash, shard, sign=-1)
+            changes['removed'] += 1
 
+        for doc_hash in current - set(data['docs']):
+            shard = load_shard(doc_hash, mode)
+            if shard and shard.get('features'):
+                apply_shard(data, doc_hash, shard)
+                changes['added'] += 1
 
-def find_unique_keywords(topic_data: Dict[str, Dict]) -> Dict[str, Dict]:
-    """Find keywords that are unique to each topic (not common across all)"""
+    return changes
 
-    # Get all words across all topics
-    all_words = Counter()
-    all_bigrams = Counter()
-    all_trigrams = Counter()
 
-    for topic, data in topic_data.items():
-        all_words.update(data['word_freq'])
-        all_bigrams.update(data['bigrams'])
-        all_trigrams.update(data['trigrams'])
+def find_unique_keywords(topic_data: Dict[str, Dict], method: str = 'log_odds') -> Dict[str, Dict]:
+    """Find keywords that are unique to each topic (not common across all)
 
-    unique_keywords = {}
+    Every term is scored for every topic at once (see keyword_scoring.py); 'uniqueness'
+    is still the topic's share of the term's occurrences, used by the suggestion thresholds.
+    """
+    active = {topic: data for topic, data in topic_data.items() if data['total_docs'] > 0}
 
-    for topic, data in topic_data.items():
-        if data['total_docs'] == 0:
-            continue
+    ranked_words = rank_topic_terms({t: d['word_freq'] for t, d in active.items()},
+                                    top_k=20, min_count=3, method=method)
+    ranked_bigrams = rank_topic_terms({t: d['bigrams'] for t, d in active.items()},
+                                      top_k=15, min_count=2, method=method)
+    ranked_trigrams = rank_topic_terms({t: d['trigrams'] for t, d in active.items()},
+                                       top_k=10, min_count=2, method=method)
 
-        # Find words that appear more in this topic than others
-        topic_unique_words = []
-        for word, count in data['word_freq'].most_common(100):
-            # Calculate uniqueness score
-            total_count = all_words[word]
-            topic_ratio = count / total_count if total_count > 0 else 0
-
-            # If this topic has >50% of all occurrences, it's unique
-            if topic_ratio > 0.5 and count >= 3:
-                topic_unique_words.append({
-                    'word': word,
-                    'count': count,
-                    'uniqueness': round(topic_ratio, 2)
-                })
-
-        # Same for bigrams
-        topic_unique_bigrams = []
-        for bigram, count in data['bigrams'].most_common(50):
-            total_count = all_bigrams[bigram]
-            topic_ratio = count / total_count if total_count > 0 else 0
-            if topic_ratio > 0.4 and count >= 2:
-                topic_unique_bigrams.append({
-                    'phrase': bigram,
-                    'count': count,
-                    'uniqueness': round(topic_ratio, 2)
-                })
-
-        # Same for trigrams
-        topic_unique_trigrams = []
-        for trigram, count in data['trigrams'].most_common(30):
-            total_count = all_trigrams[trigram]
-            topic_ratio = count / total_count if total_count > 0 else 0
-            if topic_ratio > 0.4 and count >= 2:
-                topic_unique_trigrams.append({
-                    'phrase': trigram,
-                    'count': count,
-                    'uniqueness': round(topic_ratio, 2)
-                })
+    unique_keywords = {}
 
+    for topic, data in active.items():
         unique_keywords[topic] = {
-            'unique_words': topic_unique_words[:20],
-            'unique_bigrams': topic_unique_bigrams[:15],
-            'unique_trigrams': topic_unique_trigrams[:10],
+            'unique_words': [
+                {'word': r['term'], 'count': r['count'], 'uniqueness': r['uniqueness'], 'score': r['score']}
+                for r in ranked_words[topic]
+            ],
+            'unique_bigrams': [
+                {'phrase': r['term'], 'count': r['count'], 'uniqueness': r['uniqueness'], 'score': r['score']}
+                for r in ranked_bigrams[topic]
+            ],
+            'unique_trigrams': [
+                {'phrase': r['term'], 'count': r['count'], 'uniqueness': r['uniqueness'], 'score': r['score']}
+                for r in ranked_trigrams[topic]
+            ],
             'math_patterns': dict(data['math_patterns'].most_common(10)),
             'common_phrases': [p for p, c in data['phrases'].most_common(15)],
             'stats': {
@@ -343,7 +423,59 @@ def generate_keyword_suggestions(unique_keywords: Dict) -> Dict[str, Dict]:
     return suggestions
 
 
+def train_topic_model(workers: int = None, holdout_every: int = 5):
+    """Train the hashed n-gram topic model (scoring_engines.LinearTopicEngine) on the training pages.
+
+    Pages come from the page text store, extracting any new PDFs first. Every
+    holdout_every-th document is held back for a first fit so its page accuracy can be
+    compared with the keyword engine on unseen pages; the saved model uses every page.
+    """
+    from apply_learned_keywords import FOLDER_TO_TOPIC
+    from page_text_store import index_documents, training_entries
+    from scoring_engines import MODEL_FILE, KeywordEngine, LinearTopicEngine
+
+    entries = [e for e in training_entries() if e['path'].parent.name in FOLDER_TO_TOPIC]
+    store = index_documents(entries, workers or os.cpu_count() or 1)
+    if store is None or not entries:
+        print("No training pages to learn from.")
+        return None
+
+    documents = []
+    for entry in sorted(entries, key=lambda e: e['sha1']):
+        if entry['sha1'] in store:
+            topic = FOLDER_TO_TOPIC[entry['path'].parent.name]
+            documents.append([(text, topic) for text in store.iter_pages(entry['sha1'])])
+
+    held_out = [page for i, pages in enumerate(documents) if i % holdout_every == 0 for page in pages]
+    if held_out and len(documents) > 1:
+        model = LinearTopicEngine.train(page for i, pages in enumerate(documents)
+                                        if i % holdout_every for page in pages)
+        print(f"\nHeld-out pages ({len(held_out)} from every {holdout_every}th document):")
+        for engine in (KeywordEngine(), model):
+            correct = sum(topic in engine.matching_topics(text) for text, topic in held_out)
+            print(f"   {engine.name:<16} {correct / len(held_out):.1%} of pages assigned their folder's topic")
+
+    model = LinearTopicEngine.train((page for pages in documents for page in pages),
+                                    meta={'documents': len(documents)})
+    model.save()
+    print(f"\n✅ Topic model ({model.meta['pages']} pages, {len(model.topics)} topics) saved to: {MODEL_FILE}")
+    return model
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Learn topic keywords from the training/ folders")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for PDF analysis (default: CPU count)")
+    parser.add_argument('--force-ocr', action='store_true',
+                        help="OCR every page even when the PDF has a text layer")
+    parser.add_argument('--no-ocr', action='store_true',
+                        help="Text layer only, never OCR")
+    parser.add_argument('--scoring', choices=['log_odds', 'tfidf'], default='log_odds',
+                        help="How distinctive terms are ranked per topic")
+    parser.add_argument('--model', action='store_true',
+                        help="Also train the hashed n-gram topic model (topic_model.npz)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("MathsForge AI - Keyword Training System")
     print("=" * 60)
@@ -365,17 +497,23 @@ def main():
 
     print(f"\nFound {len(topic_folders)} topic folders")
 
-    # Analyze each topic
-    topic_data = {}
-    for folder in topic_folders:
-        topic_name = folder.name
-        print(f"\n📚 Analyzing: {topic_name}")
+    aggregate = load_aggregate(ocr_mode(not args.no_ocr, args.force_ocr))
+
+    # Analyze new/changed PDFs in parallel (resuming from checkpoints)
+    topic_docs = process_training_documents(
+        topic_folders, workers=args.workers, use_ocr=not args.no_ocr, force_ocr=args.force_ocr,
+        file_index=aggregate['files'])
 
-        data = analyze_topic_folder(folder)
-        topic_data[topic_name] = data
+    # Add/subtract only the documents that changed since the last run
+    changes = update_aggregate(aggregate, topic_docs)
+    save_aggregate(aggregate)
+    print(f"\nUpdated topic totals: +{changes['added']} / -{changes['removed']} documents")
 
+    topic_data = aggregate['topics']
+    for topic_name, data in sorted(topic_data.items()):
         if data['total_docs'] > 0:
-            print(f"   ✅ {data['total_docs']} docs, ~{data['total_pages']} pages")
+            print(f"\n📚 {topic_name}")
+            print(f"   ✅ {data['total_docs']} docs, {data['total_pages']} pages")
             print(f"   Top words: {[w for w, c in data['word_freq'].most_common(5)]}")
 
     # Find unique keywords per topic
@@ -383,7 +521,7 @@ def main():
     print("Finding unique keywords per topic...")
     print("=" * 60)
 
-    unique_keywords = find_unique_keywords(topic_data)
+    unique_keywords = find_unique_keywords(topic_data, method=args.scoring)
 
     # Generate suggestions
     suggestions = generate_keyword_suggestions(unique_keywords)
@@ -415,6 +553,12 @@ def main():
         if data['context_suggestions']:
             print(f"   CONTEXT: {data['context_suggestions'][:5]}")
 
+    if args.model:
+        print("\n" + "=" * 60)
+        print("Training topic model...")
+        print("=" * 60)
+        train_topic_model(args.workers)
+
     print("\n" + "=" * 60)
     print("Next steps:")
     print("1. Review learned_keywords.json")
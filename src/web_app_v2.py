@@ -12,24 +12,23 @@ import json
 import re
 import io
 import tempfile
-import warnings
 from pathlib import Path
 from datetime import datetime
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
-import requests
-from bs4 import BeautifulSoup
-from pypdf import PdfReader, PdfWriter
-import pypdfium2 as pdfium
-from PIL import Image
-
-# Suppress pdfplumber color space warnings
-warnings.filterwarnings('ignore', message='.*Cannot set.*color.*')
 
 from config import TOPICS
 from topic_keywords import TOPIC_KEYWORDS, TOPIC_NUMBER_TO_KEY
-from strict_keywords import get_strict_keywords, page_matches_topic
-from html_template import get_html_template
+from strict_keywords import (SCORING_PROFILES, get_strict_keywords, page_confidence, get_active_keywords,
+                             get_scoring_version, match_mode_for_source, score_page)
+from static_assets import STATIC_FILES, get_index_page, get_static_asset, send_cached_asset
+from paper_archive import find_mark_scheme, get_archive_papers, manifest_entry_for
+from pdf_assembly import WorksheetWriter, assemble_worksheet, get_pdf_reader, reader_pool, stream_zip_bundle
+import metrics
+from metrics import span, timed
+from pdf_text import extract_text_from_pdf_page, extract_page_text_with_source, extract_text_layers
+from profiling import SlowRequestProfiler, summarize_payload
+from result_cache import CaptureWriter, ResultCache, request_key
 
 # Directories
 WORK_DIR = Path("homework_temp")
@@ -37,9 +36,18 @@ PDF_DIR = WORK_DIR / "pdfs"
 PREVIEW_DIR = WORK_DIR / "previews"
 OUTPUT_DIR = Path("outputs")
 
-# Ensure directories exist
-for d in [WORK_DIR, PDF_DIR, PREVIEW_DIR, OUTPUT_DIR]:
-    d.mkdir(exist_ok=True)
+
+def ensure_dirs():
+    """Create the working and output directories (called at startup, not on import)"""
+    for d in [WORK_DIR, PDF_DIR, PREVIEW_DIR, OUTPUT_DIR]:
+        d.mkdir(exist_ok=True)
+
+
+# Profiles of POST requests slower than MATHSFORGE_PROFILE_SLOW_SECONDS (off if unset)
+slow_request_profiler = SlowRequestProfiler.from_environment(WORK_DIR / "profiles")
+
+# Finished scan results and worksheets, so identical requests are answered instantly
+result_cache = ResultCache.from_environment(WORK_DIR / "result_cache")
 
 # Level configurations
 LEVELS = {
@@ -187,153 +195,41 @@ def get_topic_keywords(topic: str) -> list:
     return [w.lower() for w in topic.split() if len(w) > 2]
 
 
-def preprocess_image_for_ocr(pil_image):
-    """Preprocess image for optimal OCR accuracy using OpenCV techniques"""
-    import cv2
-    import numpy as np
-    from PIL import Image
-
-    # Convert PIL to OpenCV format
-    img = np.array(pil_image)
-
-    # Convert to grayscale if needed
-    if len(img.shape) == 3:
-        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-    else:
-        gray = img
-
-    # 1. Denoise the image
-    denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-
-    # 2. Apply adaptive thresholding for better text contrast
-    # This handles varying lighting conditions across the page
-    binary = cv2.adaptiveThreshold(
-        denoised, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY,
-        31, 10  # Block size and constant
-    )
-
-    # 3. Deskew if needed (fix rotated scans)
-    coords = np.column_stack(np.where(binary < 255))
-    if len(coords) > 100:
-        angle = cv2.minAreaRect(coords)[-1]
-        if angle < -45:
-            angle = 90 + angle
-        if abs(angle) > 0.5 and abs(angle) < 10:  # Only deskew if slightly rotated
-            (h, w) = binary.shape[:2]
-            center = (w // 2, h // 2)
-            M = cv2.getRotationMatrix2D(center, angle, 1.0)
-            binary = cv2.warpAffine(binary, M, (w, h),
-                                     flags=cv2.INTER_CUBIC,
-                                     borderMode=cv2.BORDER_REPLICATE)
-
-    # 4. Morphological operations to clean up
-    kernel = np.ones((1, 1), np.uint8)
-    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
-
-    # 5. Add small border (helps Tesseract detect edge text)
-    binary = cv2.copyMakeBorder(binary, 10, 10, 10, 10,
-                                 cv2.BORDER_CONSTANT, value=255)
-
-    # Convert back to PIL
-    return Image.fromarray(binary)
-
-
-def extract_text_with_enhanced_ocr(pdf_path: Path, page_num: int) -> str:
-    """Extract text using enhanced OCR with preprocessing for 95%+ accuracy"""
-    try:
-        import pytesseract
-
-        # Render page at high DPI (300 for optimal OCR)
-        pdf = pdfium.PdfDocument(str(pdf_path))
-        page = pdf[page_num]
-        # Scale 4.0 ≈ 300 DPI which is optimal for OCR
-        bitmap = page.render(scale=4.0)
-        pil_image = bitmap.to_pil()
-        pdf.close()
-
-        # Preprocess the image for better OCR
-        processed_image = preprocess_image_for_ocr(pil_image)
-
-        # Configure Tesseract for best accuracy
-        # --oem 3: Use LSTM neural network (best accuracy)
-        # --psm 3: Fully automatic page segmentation
-        # -c preserve_interword_spaces=1: Keep proper spacing
-        custom_config = r'--oem 3 --psm 3 -c preserve_interword_spaces=1'
-
-        # Run OCR with enhanced settings
-        ocr_text = pytesseract.image_to_string(
-            processed_image,
-            lang='eng',
-            config=custom_config
-        )
-
-        return ocr_text.strip()
+def scan_pdf_page(pdf_path: Path, page_num: int, topic: str, text_layer: str = None) -> dict:
+    """Extract and strictly score one page for a topic.
 
-    except Exception as e:
-        print(f"      Enhanced OCR error: {e}")
-        return ""
-
-
-def extract_text_from_pdf_page(pdf_path: Path, page_num: int, force_ocr: bool = False) -> str:
-    """Extract text from a PDF page using multiple methods for better results
-
-    Args:
-        pdf_path: Path to PDF file
-        page_num: Page number (0-indexed)
-        force_ocr: If True, always use OCR even if text extraction works
+    text_layer: the page's text layer if already extracted (see extract_text_layers)
+    Returns {'page', 'score', 'confidence', 'keywords', 'matches'} for pages that match or
+    are possible matches (confidence 'medium'), otherwise None.
     """
-    text = ""
-    ocr_text = ""
+    text, source = extract_page_text_with_source(pdf_path, page_num, text_layer=text_layer)
 
-    # Method 1: Try pdfplumber first (best for text-based PDFs)
-    if not force_ocr:
-        try:
-            import pdfplumber
-            with pdfplumber.open(pdf_path) as pdf:
-                if page_num < len(pdf.pages):
-                    page = pdf.pages[page_num]
-                    text = page.extract_text() or ""
-
-                    # Also try extracting text from tables
-                    tables = page.extract_tables()
-                    for table in tables:
-                        for row in table:
-                            if row:
-                                text += " " + " ".join([str(cell) for cell in row if cell])
-        except Exception as e:
-            print(f"      pdfplumber error: {e}")
-
-    # Method 2: Try pypdf as backup (sometimes gets different text)
-    if len(text) < 50 and not force_ocr:
-        try:
-            reader = PdfReader(pdf_path)
-            if page_num < len(reader.pages):
-                pypdf_text = reader.pages[page_num].extract_text() or ""
-                if len(pypdf_text) > len(text):
-                    text = pypdf_text
-        except Exception as e:
-            print(f"      pypdf error: {e}")
+    # Skip very short pages (likely blank or just headers)
+    if len(text) < 50:
+        return None
 
-    # Method 3: Enhanced OCR with preprocessing
-    # Use OCR if text extraction failed OR if force_ocr is True
-    # Also use OCR as a supplement for scanned documents that may have some embedded text
-    if len(text) < 100 or force_ocr:
-        ocr_text = extract_text_with_enhanced_ocr(pdf_path, page_num)
+    # Use strict matching - OCR text is matched allowing for OCR misreads
+    with span('score'):
+        result = score_page(text, topic, 'strict', match_mode_for_source(source))
+    score, confidence, matched_kws = result.score, result.confidence, list(result.keywords)
 
-        if len(ocr_text) > len(text):
-            print(f"      📷 Using enhanced OCR ({len(ocr_text)} chars vs {len(text)} from text extraction)")
-            text = ocr_text
-        elif ocr_text and len(text) < 200:
-            # Combine both if text extraction got little
-            combined = text + " " + ocr_text
-            # Remove duplicates by using set of words
-            words = list(dict.fromkeys(combined.lower().split()))
-            text = " ".join(words)
-            print(f"      📷 Combined text extraction + OCR ({len(text)} chars)")
+    if result.matches:
+        print(f"      Page {page_num + 1}: ✓ Score={score} ({confidence}), Keywords: {matched_kws[:4]}")
+    elif confidence:
+        confidence = 'medium'
+        print(f"      Page {page_num + 1}: ~ Score={score} (medium), Keywords: {matched_kws[:3]}")
+    else:
+        if score > 0:
+            print(f"      Page {page_num + 1}: ✗ Low score={score}, Keywords: {matched_kws[:3]}")
+        return None
 
-    return text
+    return {
+        'page': page_num,
+        'score': score,
+        'confidence': confidence,
+        'keywords': matched_kws[:5],
+        'matches': result.matches,
+    }
 
 
 def filter_pdf_pages_by_topic(pdf_path: Path, topic: str, return_confidence: bool = False) -> list:
@@ -359,48 +255,20 @@ def filter_pdf_pages_by_topic(pdf_path: Path, topic: str, return_confidence: boo
         print(f"   Exclude terms: {strict_kws.get('exclude', [])}")
 
         # Get total pages
-        reader = PdfReader(pdf_path)
+        reader = get_pdf_reader(pdf_path)
         total_pages = len(reader.pages)
         print(f"   Scanning {total_pages} pages...")
 
         for page_num in range(total_pages):
-            text = extract_text_from_pdf_page(pdf_path, page_num)
-
-            # Skip very short pages (likely blank or just headers)
-            if len(text) < 50:
+            page = scan_pdf_page(pdf_path, page_num, topic)
+            if page is None:
                 continue
-
-            # Use strict matching
-            matches, score, matched_kws = page_matches_topic(text, topic, debug=False)
-
-            if matches:
-                # Determine confidence based on score
-                if score >= 5:
-                    confidence = 'high'
-                else:
-                    confidence = 'medium'
-
-                if return_confidence:
-                    matching_pages.append({
-                        'page': page_num,
-                        'score': score,
-                        'confidence': confidence,
-                        'keywords': matched_kws[:5]
-                    })
-                else:
+            if not return_confidence:
+                if page['matches']:
                     matching_pages.append(page_num)
-                print(f"      Page {page_num + 1}: ✓ Score={score} ({confidence}), Keywords: {matched_kws[:4]}")
-            elif score >= 2 and return_confidence:
-                # Include medium confidence matches that didn't pass strict threshold
-                matching_pages.append({
-                    'page': page_num,
-                    'score': score,
-                    'confidence': 'medium',
-                    'keywords': matched_kws[:5]
-                })
-                print(f"      Page {page_num + 1}: ~ Score={score} (medium), Keywords: {matched_kws[:3]}")
-            elif score > 0:
-                print(f"      Page {page_num + 1}: ✗ Low score={score}, Keywords: {matched_kws[:3]}")
+                continue
+            # Include medium confidence matches that didn't pass strict threshold
+            matching_pages.append({key: page[key] for key in ('page', 'score', 'confidence', 'keywords')})
 
         high_count = len([p for p in matching_pages if isinstance(p, dict) and p.get('confidence') == 'high']) if return_confidence else len(matching_pages)
         medium_count = len([p for p in matching_pages if isinstance(p, dict) and p.get('confidence') == 'medium']) if return_confidence else 0
@@ -414,8 +282,137 @@ def filter_pdf_pages_by_topic(pdf_path: Path, topic: str, return_confidence: boo
     return matching_pages
 
 
+def filter_pages_from_index(pdf_path: Path, topic: str) -> list:
+    """Topic pages of an archive paper looked up in the score matrix instead of re-extracted.
+
+    Same format as filter_pdf_pages_by_topic(return_confidence=True). Returns None if the
+    paper isn't in the index or the index was built with different keywords.
+    """
+    from page_text_store import get_page_text_store
+    from score_matrix import document_key, get_score_matrix
+
+    entry = manifest_entry_for(pdf_path)
+    matrix = get_score_matrix() if entry else None
+    store = get_page_text_store() if matrix else None
+    if store is None or document_key(entry) not in matrix or entry['sha1'] not in store:
+        return None
+
+    matching_pages = []
+    with span('score'):
+        rows = matrix.select(topic, documents=[document_key(entry)])
+        for page in sorted(matrix.describe(rows, topic), key=lambda p: p['page']):
+            # Matched keywords are only needed for the few selected pages
+            page_num = page['page'] - 1
+            match_mode = match_mode_for_source(store.page_source(entry['sha1'], page_num))
+            _, _, matched_kws = page_confidence(store.page_text(entry['sha1'], page_num), topic, match_mode)
+            matching_pages.append({
+                'page': page_num,
+                'score': page['score'],
+                'confidence': page['confidence'],
+                'keywords': matched_kws[:5]
+            })
+
+    high_count = len([p for p in matching_pages if p['confidence'] == 'high'])
+    print(f"   📇 Archive index: {high_count} definite + {len(matching_pages) - high_count} possible pages")
+    return matching_pages
+
+
+# Budgeted scans score a paper's text layer per page first and read pages in order of
+# that score, then of where in a paper the topic usually appears (tenths of a paper)
+REGION_BINS = 10
+
+
+def text_layer_scores(text_layers: list, topic: str) -> list:
+    """Strict score of each page's embedded text layer, without OCR (0 for scanned pages)"""
+    with span('score'):
+        return [score_page(text, topic, 'strict').score if len(text) >= 50 else 0 for text in text_layers]
+
+
+def topic_page_regions(topic: str):
+    """Share of the topic's archive pages in each tenth of a paper, or None without a score matrix"""
+    from score_matrix import get_score_matrix
+
+    matrix = get_score_matrix()
+    return matrix.page_regions(topic, REGION_BINS) if matrix else None
+
+
+def scan_papers_with_budget(pdf_paths: list, topic: str, target_pages: int) -> tuple:
+    """Scan papers for a topic, stopping once target_pages high-confidence pages are found.
+
+    Indexed archive papers are looked up in the score matrix first. Pages of the other papers
+    are read best text-layer score first, then by how often the topic appears in that region
+    of archive papers, then from papers with the most text-layer hits first. The text layer
+    read for the ranking is reused by the scan, so only pages needing OCR are read again.
+    Returns ({str(pdf_path): pages as from filter_pdf_pages_by_topic(return_confidence=True)},
+    report of how many pages were scanned and skipped).
+    """
+    high_score = SCORING_PROFILES['strict']['high_score']
+    regions = topic_page_regions(topic)
+    found = {}
+    papers = []
+    pages_total = pages_indexed = 0
+
+    for pdf_path in pdf_paths:
+        if str(pdf_path) in found:
+            continue
+        total_pages = len(get_pdf_reader(pdf_path).pages)
+        pages_total += total_pages
+        indexed = filter_pages_from_index(pdf_path, topic)
+        if indexed is not None:
+            found[str(pdf_path)] = indexed
+            pages_indexed += total_pages
+            continue
+
+        text_layers = extract_text_layers(pdf_path)
+        hints = text_layer_scores(text_layers, topic)
+        rank = (sum(score >= high_score for score in hints), sum(hints))
+        papers.append((rank, pdf_path, hints, text_layers, total_pages))
+        found[str(pdf_path)] = []
+
+    # One queue over all pages: text-layer hits first, then the topic's usual region of a
+    # paper, then stronger papers first (ties keep the order the papers were selected in)
+    papers.sort(key=lambda paper: paper[0], reverse=True)
+    queue = []
+    for paper_rank, (_, pdf_path, hints, text_layers, total_pages) in enumerate(papers):
+        for page_num, hint in enumerate(hints):
+            region_share = regions[page_num * REGION_BINS // total_pages] if regions is not None else 0
+            queue.append(((-hint, -region_share, paper_rank, page_num), pdf_path, page_num, text_layers[page_num]))
+    queue.sort(key=lambda item: item[0])
+
+    high_count = sum(page['confidence'] == 'high' for pages in found.values() for page in pages)
+    pages_scanned = 0
+    for _, pdf_path, page_num, text_layer in queue:
+        if high_count >= target_pages:
+            break
+        page = scan_pdf_page(pdf_path, page_num, topic, text_layer)
+        pages_scanned += 1
+        if page:
+            found[str(pdf_path)].append({key: page[key] for key in ('page', 'score', 'confidence', 'keywords')})
+            high_count += page['confidence'] == 'high'
+
+    for pages in found.values():
+        pages.sort(key=lambda page: page['page'])
+
+    pages_skipped = pages_total - pages_indexed - pages_scanned
+    metrics.inc('mathsforge_pages_total', pages_skipped, operation='skip')
+    report = {
+        'target_pages': target_pages,
+        'high_confidence_pages': high_count,
+        'pages_total': pages_total,
+        'pages_from_index': pages_indexed,
+        'pages_scanned': pages_scanned,
+        'pages_skipped': pages_skipped,
+        'skipped_fraction': round(pages_skipped / pages_total, 3) if pages_total else 0.0,
+    }
+    print(f"   ⏱ Budgeted scan: {high_count} definite pages, scanned {pages_scanned}/{pages_total} pages "
+          f"({pages_indexed} from the index, {pages_skipped} skipped)")
+    return found, report
+
+
 def search_harder_questions(session, topic: str, keywords: list, level: str) -> list:
     """Search for harder/challenging questions by directly accessing educational sites"""
+    from bs4 import BeautifulSoup
+
     results = []
 
     topic_slug = topic.lower().replace(' ', '-').replace('&', 'and')
@@ -610,10 +607,9 @@ def detect_paper_info_from_first_page(pdf_path: Path) -> dict:
         text = extract_text_from_pdf_page(pdf_path, 0)
         text_lower = text.lower()
 
-        # Check if it's a mark scheme
+        # Check if it's a mark scheme (its cover still names the year and paper)
         if any(x in text_lower for x in ['mark scheme', 'marking scheme', 'markscheme', 'marks awarded']):
             info['is_mark_scheme'] = True
-            return info
 
         # Look for year
         year_patterns = [
@@ -655,173 +651,12 @@ def detect_paper_info_from_first_page(pdf_path: Path) -> dict:
     return info
 
 
-def get_hardcoded_paper_archive() -> list:
+def get_local_paper_archive() -> list:
     """
-    Complete archive of Edexcel GCSE Higher Maths papers 2017-2024.
-    Using LOCAL files from papers/ and markschemes/ folders.
-    100% reliable - no external downloads needed.
+    Edexcel GCSE Higher Maths papers and mark schemes from the local papers/ and markschemes/ folders.
+    Read from the paper manifest (paper_archive.py), which is rescanned only when the folders change.
     """
-    papers = []
-
-    # Base directories for local papers
-    BASE_DIR = Path(__file__).parent
-    PAPERS_DIR = BASE_DIR / "papers"
-    MS_DIR = BASE_DIR / "markschemes"
-
-    # Define paper archive mapping local filenames to metadata
-    # Filename format: YYYY_Session_Paper_N.pdf (e.g., 2024_Jun_Paper_1.pdf)
-    paper_archive = {
-        # 2024
-        '2024': {
-            'November': {
-                '1': {'qp': '2024_Nov_Paper_1.pdf', 'ms': '2024_Nov_Paper_1.pdf'},
-                '2': {'qp': '2024_Nov_Paper_2.pdf', 'ms': '2024_Nov_Paper_2.pdf'},
-                '3': {'qp': '2024_Nov_Paper_3.pdf', 'ms': '2024_Nov_Paper_3.pdf'},
-            },
-            'May/June': {
-                '1': {'qp': '2024_Jun_Paper_1.pdf', 'ms': '2024_Jun_Paper_1.pdf'},
-                '2': {'qp': '2024_Jun_Paper_2.pdf', 'ms': '2024_Jun_Paper_2.pdf'},
-                '3': {'qp': '2024_Jun_Paper_3.pdf', 'ms': '2024_Jun_Paper_3.pdf'},
-            },
-        },
-        # 2023
-        '2023': {
-            'November': {
-                '1': {'qp': '2023_Nov_Paper_1.pdf', 'ms': '2023_Nov_Paper_1.pdf'},
-                '2': {'qp': '2023_Nov_Paper_2.pdf', 'ms': '2023_Nov_Paper_2.pdf'},
-                '3': {'qp': '2023_Nov_Paper_3.pdf', 'ms': '2023_Nov_Paper_3.pdf'},
-            },
-            'May/June': {
-                '1': {'qp': '2023_Jun_Paper_1.pdf', 'ms': '2023_Jun_Paper_1.pdf'},
-                '2': {'qp': '2023_Jun_Paper_2.pdf', 'ms': '2023_Jun_Paper_2.pdf'},
-                '3': {'qp': '2023_Jun_Paper_3.pdf', 'ms': '2023_Jun_Paper_3.pdf'},
-            },
-        },
-        # 2022
-        '2022': {
-            'November': {
-                '1': {'qp': '2022_Nov_Paper_1.pdf', 'ms': '2022_Nov_Paper_1.pdf'},
-                '2': {'qp': '2022_Nov_Paper_2.pdf', 'ms': '2022_Nov_Paper_2.pdf'},
-                '3': {'qp': '2022_Nov_Paper_3.pdf', 'ms': '2022_Nov_Paper_3.pdf'},
-            },
-            'May/June': {
-                '1': {'qp': '2022_Jun_Paper_1.pdf', 'ms': '2022_Jun_Paper_1.pdf'},
-                '2': {'qp': '2022_Jun_Paper_2.pdf', 'ms': '2022_Jun_Paper_2.pdf'},
-                '3': {'qp': '2022_Jun_Paper_3.pdf', 'ms': '2022_Jun_Paper_3.pdf'},
-            },
-        },
-        # 2021 - November only (COVID affected May/June)
-        '2021': {
-            'November': {
-                '1': {'qp': '2021_Nov_Paper_1.pdf', 'ms': '2021_Nov_Paper_1.pdf'},
-                '2': {'qp': '2021_Nov_Paper_2.pdf', 'ms': '2021_Nov_Paper_2.pdf'},
-                '3': {'qp': '2021_Nov_Paper_3.pdf', 'ms': '2021_Nov_Paper_3.pdf'},
-            },
-        },
-        # 2020 - November only (COVID cancelled May/June)
-        '2020': {
-            'November': {
-                '1': {'qp': '2020_Nov_Paper_1.pdf', 'ms': '2020_Nov_Paper_1.pdf'},
-                '2': {'qp': '2020_Nov_Paper_2.pdf', 'ms': '2020_Nov_Paper_2.pdf'},
-                '3': {'qp': '2020_Nov_Paper_3.pdf', 'ms': '2020_Nov_Paper_3.pdf'},
-            },
-        },
-        # 2019
-        '2019': {
-            'November': {
-                '1': {'qp': '2019_Nov_Paper_1.pdf', 'ms': '2019_Nov_Paper_1.pdf'},
-                '2': {'qp': '2019_Nov_Paper_2.pdf', 'ms': '2019_Nov_Paper_2.pdf'},
-                '3': {'qp': '2019_Nov_Paper_3.pdf', 'ms': '2019_Nov_Paper_3.pdf'},
-            },
-            'May/June': {
-                '1': {'qp': '2019_Jun_Paper_1.pdf', 'ms': '2019_Jun_Paper_1.pdf'},
-                '2': {'qp': '2019_Jun_Paper_2.pdf', 'ms': '2019_Jun_Paper_2.pdf'},
-                '3': {'qp': '2019_Jun_Paper_3.pdf', 'ms': '2019_Jun_Paper_3.pdf'},
-            },
-        },
-        # 2018
-        '2018': {
-            'November': {
-                '1': {'qp': '2018_Nov_Paper_1.pdf', 'ms': '2018_Nov_Paper_1.pdf'},
-                '2': {'qp': '2018_Nov_Paper_2.pdf', 'ms': '2018_Nov_Paper_2.pdf'},
-                '3': {'qp': '2018_Nov_Paper_3.pdf', 'ms': '2018_Nov_Paper_3.pdf'},
-            },
-            'May/June': {
-                '1': {'qp': '2018_Jun_Paper_1.pdf', 'ms': '2018_Jun_Paper_1.pdf'},
-                '2': {'qp': '2018_Jun_Paper_2.pdf', 'ms': '2018_Jun_Paper_2.pdf'},
-                '3': {'qp': '2018_Jun_Paper_3.pdf', 'ms': '2018_Jun_Paper_3.pdf'},
-            },
-        },
-        # 2017
-        '2017': {
-            'November': {
-                '1': {'qp': '2017_Nov_Paper_1.pdf', 'ms': '2017_Nov_Paper_1.pdf'},
-                '2': {'qp': '2017_Nov_Paper_2.pdf', 'ms': '2017_Nov_Paper_2.pdf'},
-                '3': {'qp': '2017_Nov_Paper_3.pdf', 'ms': '2017_Nov_Paper_3.pdf'},
-            },
-            'May/June': {
-                '1': {'qp': '2017_Jun_Paper_1.pdf', 'ms': '2017_Jun_Paper_1.pdf'},
-                '2': {'qp': '2017_Jun_Paper_2.pdf', 'ms': '2017_Jun_Paper_2.pdf'},
-                '3': {'qp': '2017_Jun_Paper_3.pdf', 'ms': '2017_Jun_Paper_3.pdf'},
-            },
-        },
-        # Specimen Papers
-        'Specimen': {
-            'Sample': {
-                '1': {'qp': 'Sample_Paper_1.pdf', 'ms': 'Sample_Paper_1.pdf'},
-                '2': {'qp': 'Sample_Paper_2.pdf', 'ms': 'Sample_Paper_2.pdf'},
-                '3': {'qp': 'Sample_Paper_3.pdf', 'ms': 'Sample_Paper_3.pdf'},
-            },
-            'Specimen 1': {
-                '1': {'qp': 'Specimen1_Paper_1.pdf', 'ms': 'Specimen1_Paper_1.pdf'},
-                '2': {'qp': 'Specimen1_Paper_2.pdf', 'ms': 'Specimen1_Paper_2.pdf'},
-                '3': {'qp': 'Specimen1_Paper_3.pdf', 'ms': 'Specimen1_Paper_3.pdf'},
-            },
-            'Specimen 2': {
-                '1': {'qp': 'Specimen2_Paper_1.pdf', 'ms': 'Specimen2_Paper_1.pdf'},
-                '2': {'qp': 'Specimen2_Paper_2.pdf', 'ms': 'Specimen2_Paper_2.pdf'},
-                '3': {'qp': 'Specimen2_Paper_3.pdf', 'ms': 'Specimen2_Paper_3.pdf'},
-            },
-        }
-    }
-
-    # Convert to flat list format with local file paths
-    for year, sessions in paper_archive.items():
-        for session_name, papers_dict in sessions.items():
-            for paper_num, files in papers_dict.items():
-                qp_path = PAPERS_DIR / files['qp']
-                ms_path = MS_DIR / files['ms']
-
-                # Only add if the file exists
-                if qp_path.exists():
-                    papers.append({
-                        'source': 'Local',
-                        'title': f"Edexcel GCSE Higher {session_name} {year} Paper {paper_num}",
-                        'url': str(qp_path),  # Local file path
-                        'local_path': str(qp_path),  # Explicit local path marker
-                        'filter_pages': True,
-                        'year': year,
-                        'session': session_name,
-                        'paper': f"Paper {paper_num}",
-                        'sort_key': f"{year}-{session_name}-{paper_num}",
-                        'is_mark_scheme': False,
-                    })
-
-                if ms_path.exists():
-                    papers.append({
-                        'source': 'Local',
-                        'title': f"Edexcel GCSE Higher {session_name} {year} Paper {paper_num} MS",
-                        'url': str(ms_path),  # Local file path
-                        'local_path': str(ms_path),  # Explicit local path marker
-                        'filter_pages': False,
-                        'year': year,
-                        'session': session_name,
-                        'paper': f"Paper {paper_num}",
-                        'sort_key': f"{year}-{session_name}-{paper_num}-MS",
-                        'is_mark_scheme': True,
-                    })
-
-    return papers
+    return get_archive_papers(detect_paper_info_from_first_page)
 
 
 def search_past_papers(session, topic: str, level: str) -> list:
@@ -831,18 +666,18 @@ def search_past_papers(session, topic: str, level: str) -> list:
 
     print(f"   Searching past paper archives for ALL papers (1, 2, 3)...")
 
-    # First, add hardcoded archive papers (most reliable)
-    hardcoded_papers = get_hardcoded_paper_archive()
-    for paper in hardcoded_papers:
+    # First, add local archive papers (most reliable)
+    archive_papers = get_local_paper_archive()
+    for paper in archive_papers:
         url_key = paper['url'].split('?')[0].lower()
         if url_key not in seen_urls:
             seen_urls.add(url_key)
             results.append(paper)
-    print(f"   Added {len(hardcoded_papers)} papers from hardcoded archive")
+    print(f"   Added {len(archive_papers)} papers from local archive")
 
-    # Track which year/session/paper combinations we already have from hardcoded
+    # Track which year/session/paper combinations we already have from the archive
     existing_papers = set()
-    for paper in hardcoded_papers:
+    for paper in archive_papers:
         key = f"{paper['year']}-{paper['session']}-{paper['paper']}-{paper.get('is_mark_scheme', False)}"
         existing_papers.add(key)
 
@@ -850,7 +685,7 @@ def search_past_papers(session, topic: str, level: str) -> list:
         """Add a result if not duplicate and not a mark scheme"""
         url_key = url.split('?')[0].lower()
 
-        # Skip mark schemes from scraped sources (we have them in hardcoded)
+        # Skip mark schemes from scraped sources (we have them in the local archive)
         if any(x in url_key for x in ['mark', 'ms', 'scheme', 'answer']):
             return
         if any(x in title.lower() for x in ['mark scheme', 'marking', 'answers']):
@@ -861,7 +696,7 @@ def search_past_papers(session, topic: str, level: str) -> list:
 
         year, exam_session, paper = extract_year_from_title(title, url)
 
-        # Skip if we already have this paper from hardcoded archive
+        # Skip if we already have this paper from the local archive
         paper_key = f"{year}-{exam_session}-{paper}-False"
         if paper_key in existing_papers:
             return
@@ -885,10 +720,9 @@ def search_past_papers(session, topic: str, level: str) -> list:
         })
         print(f"   ✓ Found: {year} {exam_session} {paper} - {source}")
 
-    # NOTE: External scraping disabled - using only hardcoded archive for reliability
-    # The hardcoded archive has 96 verified papers (2017-2024 + Specimen)
-    # Each year has May/June + November sessions, Papers 1-3, plus mark schemes
-    print(f"   Using hardcoded archive only (no external scraping for reliability)")
+    # NOTE: External scraping disabled - using only the local archive for reliability
+    # Papers and mark schemes are listed in paper_manifest.json (see paper_archive.py)
+    print(f"   Using local archive only (no external scraping for reliability)")
 
     # Sort by year (descending) then paper number
     def sort_key(x):
@@ -917,6 +751,8 @@ def search_past_papers(session, topic: str, level: str) -> list:
 
 def search_mathsgenie_direct(session, topic: str, level: str, difficulty: str = 'medium') -> list:
     """Search Maths Genie directly"""
+    from bs4 import BeautifulSoup
+
     results = []
     topic_lower = topic.lower()
     topic_slug = topic_lower.replace(' ', '-').replace('&', 'and')
@@ -971,6 +807,8 @@ def search_mathsgenie_direct(session, topic: str, level: str, difficulty: str =
 
 def search_corbettmaths_direct(session, topic: str, difficulty: str = 'medium', level: str = 'gcse') -> list:
     """Search Corbettmaths with strict topic matching."""
+    from bs4 import BeautifulSoup
+
     results = []
     topic_lower = topic.lower()
     topic_slug = topic_lower.replace(' ', '-')
@@ -1027,6 +865,8 @@ def search_corbettmaths_direct(session, topic: str, difficulty: str = 'medium',
 
 def search_mme_direct(session, topic: str, level: str, difficulty: str = 'medium') -> list:
     """Search MME Revise with strict topic matching."""
+    from bs4 import BeautifulSoup
+
     results = []
     topic_lower = topic.lower()
     topic_slug = topic_lower.replace(' ', '-')
@@ -1076,6 +916,8 @@ def search_mme_direct(session, topic: str, level: str, difficulty: str = 'medium
 
 def search_all_sources(topic: str, keywords: list = None, level: str = 'gcse', difficulty: str = 'medium') -> list:
     """Search all sources for PDFs matching the topic, level, and difficulty"""
+    import requests
+
     results = []
 
     core_topic = topic
@@ -1133,6 +975,7 @@ def search_all_sources(topic: str, keywords: list = None, level: str = 'gcse', d
     return unique_results
 
 
+@timed('download')
 def download_pdf(url: str, session=None) -> Path:
     """Download a PDF and return the path. Handles both URLs and local file paths."""
 
@@ -1142,7 +985,7 @@ def download_pdf(url: str, session=None) -> Path:
         print(f"   ✓ Using local file: {local_path.name}")
         # Verify it's a valid PDF
         try:
-            reader = PdfReader(local_path)
+            reader = get_pdf_reader(local_path)
             _ = len(reader.pages)
             return local_path
         except Exception as e:
@@ -1150,6 +993,8 @@ def download_pdf(url: str, session=None) -> Path:
             return None
 
     # Otherwise, download from URL
+    import requests
+
     if session is None:
         session = requests.Session()
     # Always set a complete User-Agent for all requests
@@ -1182,7 +1027,7 @@ def download_pdf(url: str, session=None) -> Path:
 
         if filepath.exists() and filepath.stat().st_size > 1000:
             try:
-                reader = PdfReader(filepath)
+                reader = get_pdf_reader(filepath)
                 _ = len(reader.pages)
                 return filepath
             except:
@@ -1199,7 +1044,7 @@ def merge_pdfs(pdf_paths: list, max_pages: int = 30) -> Path:
     """Merge multiple PDFs into one"""
     output_path = WORK_DIR / f"merged_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-    writer = PdfWriter()
+    writer = WorksheetWriter()
     total_pages = 0
 
     for pdf_path in pdf_paths:
@@ -1207,7 +1052,7 @@ def merge_pdfs(pdf_paths: list, max_pages: int = 30) -> Path:
             break
 
         try:
-            reader = PdfReader(pdf_path)
+            reader = get_pdf_reader(pdf_path)
             pages_to_add = min(len(reader.pages), max_pages - total_pages)
 
             for i in range(pages_to_add):
@@ -1222,6 +1067,7 @@ def merge_pdfs(pdf_paths: list, max_pages: int = 30) -> Path:
     return output_path
 
 
+@timed('render')
 def generate_page_thumbnail(pdf_path: Path, page_index: int, max_width: int = 200) -> str:
     """Generate a base64 thumbnail for a specific page"""
     try:
@@ -1247,6 +1093,7 @@ def generate_page_thumbnail(pdf_path: Path, page_index: int, max_width: int = 20
         return ""
 
 
+@timed('render')
 def get_pdf_page_thumbnails(pdf_path: Path, max_width: int = 200) -> list:
     """Generate base64 thumbnails for each page of a PDF using pypdfium2"""
     thumbnails = []
@@ -1287,6 +1134,7 @@ def get_pdf_page_thumbnails(pdf_path: Path, max_width: int = 200) -> list:
     return thumbnails
 
 
+@timed('render')
 def get_pdf_page_full(pdf_path: Path, page_num: int) -> str:
     """Get a full-resolution image of a specific page using pypdfium2"""
     try:
@@ -1319,8 +1167,8 @@ def remove_pages_from_pdf(pdf_path: Path, pages_to_keep: list) -> Path:
     """Create a new PDF with only the specified pages"""
     output_path = WORK_DIR / f"edited_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-    reader = PdfReader(pdf_path)
-    writer = PdfWriter()
+    reader = get_pdf_reader(pdf_path)
+    writer = WorksheetWriter()
 
     for page_num in pages_to_keep:
         if 0 <= page_num - 1 < len(reader.pages):
@@ -1343,947 +1191,99 @@ def cleanup_temp():
             f.unlink()
         for f in WORK_DIR.glob("edited_*.pdf"):
             f.unlink()
+        # Drop parsed readers for files that no longer exist
+        reader_pool.clear()
     except Exception as e:
         print(f"Cleanup error: {e}")
 
 
-# HTML Template
-HTML_TEMPLATE = '''<!DOCTYPE html>
-<html lang="en" data-theme="default">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Maths Homework Generator</title>
-    <link href="https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@300;400;500;600;700;800&family=Space+Mono:wght@400;700&family=Inter:wght@300;400;500;600;700&display=swap" rel="stylesheet">
-    <style>
-        /* Default Dark Theme */
-        :root, [data-theme="default"] {
-            --bg-dark: #0c0c14;
-            --bg-card: #14141f;
-            --bg-card-hover: #1a1a28;
-            --bg-input: #1c1c2a;
-            --border: #2d2d44;
-            --border-hover: #4a4a6a;
-            --primary: #7c5cff;
-            --primary-light: #9d85ff;
-            --primary-glow: rgba(124, 92, 255, 0.25);
-            --secondary: #ff6b9d;
-            --secondary-glow: rgba(255, 107, 157, 0.2);
-            --success: #4ade80;
-            --success-glow: rgba(74, 222, 128, 0.25);
-            --danger: #ff6b6b;
-            --warning: #fbbf24;
-            --text: #f8f8fc;
-            --text-soft: #b8b8d0;
-            --text-muted: #6b6b8a;
-            --gradient-1: linear-gradient(135deg, #7c5cff 0%, #ff6b9d 100%);
-            --gradient-2: linear-gradient(135deg, #4ade80 0%, #22d3ee 100%);
-            --font-main: 'Plus Jakarta Sans', -apple-system, BlinkMacSystemFont, sans-serif;
-        }
-
-        /* Intuitive Academy Theme - Blue/Teal professional look */
-        [data-theme="intuitive"] {
-            --bg-dark: #0f172a;
-            --bg-card: #1e293b;
-            --bg-card-hover: #334155;
-            --bg-input: #1e293b;
-            --border: #334155;
-            --border-hover: #475569;
-            --primary: #0ea5e9;
-            --primary-light: #38bdf8;
-            --primary-glow: rgba(14, 165, 233, 0.25);
-            --secondary: #06b6d4;
-            --secondary-glow: rgba(6, 182, 212, 0.2);
-            --success: #10b981;
-            --success-glow: rgba(16, 185, 129, 0.25);
-            --danger: #ef4444;
-            --warning: #f59e0b;
-            --text: #f1f5f9;
-            --text-soft: #cbd5e1;
-            --text-muted: #64748b;
-            --gradient-1: linear-gradient(135deg, #0ea5e9 0%, #06b6d4 100%);
-            --gradient-2: linear-gradient(135deg, #10b981 0%, #06b6d4 100%);
-            --font-main: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-        }
-
-        * { box-sizing: border-box; margin: 0; padding: 0; }
-        html {
-            scroll-behavior: auto; /* Disable smooth scrolling to prevent aggressive scroll */
-        }
-        body {
-            font-family: var(--font-main);
-            background: var(--bg-dark);
-            color: var(--text);
-            min-height: 100vh;
-            line-height: 1.6;
-        }
-
-        /* Theme Switcher */
-        .theme-switcher {
-            position: fixed;
-            top: 1rem;
-            right: 1rem;
-            z-index: 1000;
-            display: flex;
-            gap: 0.5rem;
-            background: var(--bg-card);
-            padding: 0.5rem;
-            border-radius: 8px;
-            border: 1px solid var(--border);
-        }
-        .theme-btn {
-            padding: 0.4rem 0.8rem;
-            border: 1px solid var(--border);
-            background: var(--bg-input);
-            color: var(--text-soft);
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 0.8rem;
-            transition: all 0.2s;
-        }
-        .theme-btn:hover {
-            border-color: var(--primary);
-            color: var(--text);
-        }
-        .theme-btn.active {
-            background: var(--primary);
-            border-color: var(--primary);
-            color: white;
-        }
-        .bg-effects {
-            position: fixed;
-            inset: 0;
-            pointer-events: none;
-            z-index: 0;
-            overflow: hidden;
-        }
-        .bg-orb {
-            position: absolute;
-            border-radius: 50%;
-            filter: blur(80px);
-            opacity: 0.4;
-            animation: float 20s ease-in-out infinite;
-        }
-        .bg-orb-1 {
-            width: 600px;
-            height: 600px;
-            background: var(--primary);
-            top: -200px;
-            left: -100px;
-        }
-        .bg-orb-2 {
-            width: 500px;
-            height: 500px;
-            background: var(--secondary);
-            bottom: -150px;
-            right: -100px;
-            animation-delay: -7s;
-        }
-        @keyframes float {
-            0%, 100% { transform: translate(0, 0) scale(1); }
-            33% { transform: translate(30px, -30px) scale(1.05); }
-            66% { transform: translate(-20px, 20px) scale(0.95); }
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-            position: relative;
-            z-index: 1;
-        }
-        header {
-            text-align: center;
-            margin-bottom: 3rem;
-        }
-        header h1 {
-            font-size: 2.5rem;
-            font-weight: 800;
-            background: var(--gradient-1);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: 0.5rem;
-        }
-        header p {
-            color: var(--text-soft);
-            font-size: 1.1rem;
-        }
-        .search-section {
-            background: var(--bg-card);
-            border: 1px solid var(--border);
-            border-radius: 16px;
-            padding: 2rem;
-            margin-bottom: 2rem;
-        }
-        .form-row {
-            display: grid;
-            grid-template-columns: 1fr 1fr 1fr;
-            gap: 1.5rem;
-            margin-bottom: 1.5rem;
-        }
-        .form-group {
-            display: flex;
-            flex-direction: column;
-        }
-        label {
-            font-weight: 500;
-            margin-bottom: 0.5rem;
-            color: var(--text-soft);
-            font-size: 0.9rem;
-        }
-        select, input {
-            background: var(--bg-input);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            padding: 0.75rem 1rem;
-            color: var(--text);
-            font-family: inherit;
-            font-size: 1rem;
-            transition: border-color 0.2s;
-        }
-        select:focus, input:focus {
-            outline: none;
-            border-color: var(--primary);
-        }
-        .topic-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-            gap: 0.75rem;
-            margin-top: 1rem;
-            max-height: 400px;
-            overflow-y: auto;
-            padding-right: 0.5rem;
-        }
-        .topic-item {
-            background: var(--bg-input);
-            border: 1px solid var(--border);
-            border-radius: 8px;
-            padding: 0.75rem 1rem;
-            cursor: pointer;
-            transition: all 0.2s;
-            font-size: 0.9rem;
-        }
-        .topic-item:hover {
-            border-color: var(--primary);
-            transform: translateY(-2px);
-        }
-        .topic-item.selected {
-            background: var(--primary);
-            border-color: var(--primary);
-            color: white;
-        }
-        .btn {
-            background: var(--gradient-1);
-            border: none;
-            border-radius: 8px;
-            padding: 0.75rem 2rem;
-            color: white;
-            font-family: inherit;
-            font-size: 1rem;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 8px 20px var(--primary-glow);
-        }
-        .btn:disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-            transform: none;
-        }
-        .btn-secondary {
-            background: var(--bg-input);
-            border: 1px solid var(--border);
-        }
-        .btn-success {
-            background: var(--gradient-2);
-        }
-        .results-section {
-            margin-top: 2rem;
-        }
-        .pdf-results {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
-            gap: 1rem;
-        }
-        .pdf-card {
-            background: var(--bg-card);
-            border: 1px solid var(--border);
-            border-radius: 12px;
-            padding: 1rem;
-            transition: all 0.2s;
-        }
-        .pdf-card:hover {
-            border-color: var(--primary);
-        }
-        .pdf-card h4 {
-            font-size: 0.95rem;
-            margin-bottom: 0.5rem;
-            white-space: nowrap;
-            overflow: hidden;
-            text-overflow: ellipsis;
-        }
-        .pdf-card .source {
-            color: var(--text-muted);
-            font-size: 0.8rem;
-        }
-        .page-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
-            gap: 1rem;
-            margin-top: 1rem;
-        }
-        .page-item {
-            position: relative;
-            cursor: pointer;
-            border-radius: 8px;
-            overflow: hidden;
-            border: 2px solid transparent;
-            transition: all 0.2s;
-        }
-        .page-item:hover {
-            border-color: var(--primary);
-        }
-        .page-item.selected {
-            border-color: var(--success);
-        }
-        .page-item img {
-            width: 100%;
-            display: block;
-        }
-        .page-number {
-            position: absolute;
-            bottom: 0;
-            left: 0;
-            right: 0;
-            background: rgba(0,0,0,0.7);
-            color: white;
-            padding: 0.25rem;
-            text-align: center;
-            font-size: 0.8rem;
-        }
-        .status-bar {
-            position: fixed;
-            bottom: 0;
-            left: 0;
-            right: 0;
-            background: var(--bg-card);
-            border-top: 1px solid var(--border);
-            padding: 1rem 2rem;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            z-index: 100;
-        }
-        .loading {
-            display: none;
-            text-align: center;
-            padding: 2rem;
-        }
-        .loading.active {
-            display: block;
-        }
-        .spinner {
-            width: 40px;
-            height: 40px;
-            border: 3px solid var(--border);
-            border-top-color: var(--primary);
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-            margin: 0 auto 1rem;
-        }
-        @keyframes spin {
-            to { transform: rotate(360deg); }
-        }
-        .hidden { display: none !important; }
-        .zoom-modal {
-            position: fixed;
-            inset: 0;
-            background: rgba(0,0,0,0.9);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            z-index: 1000;
-            cursor: zoom-out;
-        }
-        .zoom-modal img {
-            max-width: 90vw;
-            max-height: 90vh;
-        }
-    </style>
-</head>
-<body>
-    <!-- Theme Switcher -->
-    <div class="theme-switcher">
-        <button class="theme-btn active" onclick="setTheme('default')" id="theme-default">Dark</button>
-        <button class="theme-btn" onclick="setTheme('intuitive')" id="theme-intuitive">Intuitive</button>
-    </div>
-
-    <div class="bg-effects">
-        <div class="bg-orb bg-orb-1"></div>
-        <div class="bg-orb bg-orb-2"></div>
-    </div>
-
-    <div class="container">
-        <header>
-            <h1>Maths Homework Generator</h1>
-            <p>Create customised worksheets from educational resources</p>
-        </header>
-
-        <div class="search-section">
-            <div class="form-row">
-                <div class="form-group">
-                    <label>Level</label>
-                    <select id="level">
-                        <option value="gcse">GCSE</option>
-                        <option value="ks3">KS3 (Year 7-9)</option>
-                    </select>
-                </div>
-                <div class="form-group">
-                    <label>Difficulty</label>
-                    <select id="difficulty">
-                        <option value="medium">Medium</option>
-                        <option value="hard">Hard</option>
-                        <option value="harder">Harder (Grade 8-9)</option>
-                        <option value="pastpapers">Past Papers Only</option>
-                    </select>
-                </div>
-                <div class="form-group" id="keywordsGroup">
-                    <label>Keywords (optional)</label>
-                    <input type="text" id="keywords" placeholder="e.g., tree diagram, conditional">
-                </div>
-            </div>
-
-            <label>Choose a Topic</label>
-            <div class="topic-grid" id="topicGrid">
-                <!-- Topics will be populated by JS -->
-            </div>
-        </div>
-
-        <div class="loading" id="loading">
-            <div class="spinner"></div>
-            <p id="loadingText">Searching for PDFs...</p>
-        </div>
-
-        <div class="results-section hidden" id="resultsSection">
-            <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                <h3>Found PDFs</h3>
-                <button class="btn btn-secondary" onclick="startOver()" style="padding: 0.5rem 1rem; font-size: 0.9rem;">↻ New Search</button>
-            </div>
-            <div class="pdf-results" id="pdfResults"></div>
-
-            <div id="pageSection" class="hidden" style="margin-top: 2rem;">
-                <h3 style="margin-bottom: 1rem;">Select Pages</h3>
-                <div class="page-grid" id="pageGrid"></div>
-            </div>
-        </div>
-    </div>
-
-    <div class="status-bar hidden" id="statusBar">
-        <div>
-            <span id="selectedCount">0</span> pages selected from <span id="pdfCount">1</span> PDF(s)
-            <span id="collectedInfo" style="margin-left: 1rem; color: var(--success);" class="hidden">
-                📦 <span id="collectedCount">0</span> pages collected
-            </span>
-        </div>
-        <div style="display: flex; gap: 0.5rem;">
-            <button class="btn btn-secondary" onclick="startOver()">Start Over</button>
-            <button class="btn btn-secondary hidden" id="addMoreBtn" onclick="addMorePDFs()">+ Add More PDFs</button>
-            <button class="btn" id="confirmBtn" onclick="confirmSelection()">Confirm Selection</button>
-            <button class="btn btn-secondary hidden" id="editBtn" onclick="editSelection()">✏️ Edit</button>
-            <button class="btn btn-success hidden" id="generateBtn" onclick="generatePDF()">Generate Final PDF</button>
-        </div>
-    </div>
-
-    <div class="zoom-modal hidden" id="zoomModal" onclick="closeZoom()">
-        <img id="zoomImage" src="">
-    </div>
-
-    <script>
-        const TOPICS = ''' + json.dumps(list(TOPICS.keys())) + ''';
-
-        let selectedTopic = null;
-        let selectedPages = new Set();
-        let currentPDF = null;
-        let selectionConfirmed = false;
-
-        // Multi-PDF support
-        let collectedPages = [];  // Array of {pdfPath, pages: [1,2,3], pdfIndex}
-        let loadedPDFs = [];      // Array of {path, url, title, thumbnails}
-
-        // Populate topics
-        const topicGrid = document.getElementById('topicGrid');
-        TOPICS.forEach(topic => {
-            const div = document.createElement('div');
-            div.className = 'topic-item';
-            div.textContent = topic;
-            div.onclick = () => selectTopic(topic, div);
-            topicGrid.appendChild(div);
-        });
-
-        // Handle difficulty change - also reset results if we have a topic selected
-        document.getElementById('difficulty').addEventListener('change', function() {
-            const keywordsGroup = document.getElementById('keywordsGroup');
-            const keywordsInput = document.getElementById('keywords');
-            if (this.value === 'pastpapers') {
-                keywordsGroup.style.opacity = '0.5';
-                keywordsInput.disabled = true;
-                keywordsInput.placeholder = 'Auto-filtered by topic';
-            } else {
-                keywordsGroup.style.opacity = '1';
-                keywordsInput.disabled = false;
-                keywordsInput.placeholder = 'e.g., tree diagram, conditional';
-            }
-            // Re-search if topic is already selected - reset page state first
-            if (selectedTopic) {
-                resetPageState();
-                searchPDFs();
-            }
-        });
-
-        // Handle level change - re-search if topic selected
-        document.getElementById('level').addEventListener('change', function() {
-            if (selectedTopic) {
-                resetPageState();
-                searchPDFs();
-            }
-        });
-
-        // Reset page selection state without clearing search results
-        function resetPageState() {
-            selectedPages.clear();
-            currentPDF = null;
-            selectionConfirmed = false;
-            collectedPages = [];
-            loadedPDFs = [];
-            document.getElementById('pageSection').classList.add('hidden');
-            document.getElementById('statusBar').classList.add('hidden');
-            document.getElementById('confirmBtn').classList.remove('hidden');
-            document.getElementById('editBtn').classList.add('hidden');
-            document.getElementById('generateBtn').classList.add('hidden');
-            document.getElementById('addMoreBtn').classList.add('hidden');
-            document.getElementById('collectedInfo').classList.add('hidden');
-        }
-
-        function selectTopic(topic, element) {
-            document.querySelectorAll('.topic-item').forEach(el => el.classList.remove('selected'));
-            element.classList.add('selected');
-            selectedTopic = topic;
-            searchPDFs();
-        }
-
-        async function searchPDFs() {
-            const level = document.getElementById('level').value;
-            const difficulty = document.getElementById('difficulty').value;
-            const keywords = document.getElementById('keywords').value;
-
-            document.getElementById('loading').classList.add('active');
-            document.getElementById('resultsSection').classList.add('hidden');
-            document.getElementById('statusBar').classList.add('hidden');
-
-            try {
-                const response = await fetch('/api/search', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        topic: selectedTopic,
-                        level: level,
-                        difficulty: difficulty,
-                        keywords: keywords
-                    })
-                });
-
-                const data = await response.json();
-                displayResults(data.results);
-            } catch (error) {
-                console.error('Search error:', error);
-                alert('Error searching for PDFs');
-            }
-
-            document.getElementById('loading').classList.remove('active');
-        }
-
-        function displayResults(results) {
-            const container = document.getElementById('pdfResults');
-            container.innerHTML = '';
-
-            if (results.length === 0) {
-                container.innerHTML = '<p style="color: var(--text-muted);">No PDFs found. Try different keywords or topic.</p>';
-                document.getElementById('resultsSection').classList.remove('hidden');
-                return;
-            }
-
-            // Check if we're in pastpapers mode to show organized view
-            const difficulty = document.getElementById('difficulty').value;
-
-            if (difficulty === 'pastpapers') {
-                // Group by year for past papers
-                const byYear = {};
-                results.forEach((pdf, index) => {
-                    const year = pdf.year || 'Other';
-                    if (!byYear[year]) byYear[year] = [];
-                    byYear[year].push({...pdf, index});
-                });
-
-                // Sort years descending
-                const years = Object.keys(byYear).sort((a, b) => b.localeCompare(a));
-
-                years.forEach(year => {
-                    // Year header
-                    const yearHeader = document.createElement('div');
-                    yearHeader.style.cssText = 'grid-column: 1/-1; background: var(--gradient-1); -webkit-background-clip: text; -webkit-text-fill-color: transparent; font-size: 1.2rem; font-weight: 700; margin-top: 1rem; padding-bottom: 0.5rem; border-bottom: 1px solid var(--border);';
-                    yearHeader.textContent = year === 'Unknown' ? 'Other Papers' : `📅 ${year}`;
-                    container.appendChild(yearHeader);
-
-                    // Papers for this year
-                    byYear[year].forEach(pdf => {
-                        const card = document.createElement('div');
-                        card.className = 'pdf-card';
-                        const sessionBadge = pdf.session !== 'Unknown' ? `<span style="background: var(--primary-glow); color: var(--primary-light); padding: 0.2rem 0.5rem; border-radius: 4px; font-size: 0.75rem; margin-right: 0.5rem;">${pdf.session}</span>` : '';
-                        const paperBadge = pdf.paper !== 'Paper' ? `<span style="background: var(--secondary-glow); color: var(--secondary); padding: 0.2rem 0.5rem; border-radius: 4px; font-size: 0.75rem;">${pdf.paper}</span>` : '';
-                        card.innerHTML = `
-                            <div style="margin-bottom: 0.5rem;">${sessionBadge}${paperBadge}</div>
-                            <h4>${pdf.title}</h4>
-                            <p class="source">${pdf.source}</p>
-                            <button class="btn" style="margin-top: 0.5rem; padding: 0.5rem 1rem; font-size: 0.85rem;" onclick="loadPDF(${pdf.index})">Load PDF</button>
-                        `;
-                        container.appendChild(card);
-                    });
-                });
-            } else {
-                // Standard display for other modes
-                results.forEach((pdf, index) => {
-                    const card = document.createElement('div');
-                    card.className = 'pdf-card';
-                    card.innerHTML = `
-                        <h4>${pdf.title}</h4>
-                        <p class="source">${pdf.source}</p>
-                        <button class="btn" style="margin-top: 0.5rem; padding: 0.5rem 1rem; font-size: 0.85rem;" onclick="loadPDF(${index})">Load PDF</button>
-                    `;
-                    container.appendChild(card);
-                });
-            }
-
-            document.getElementById('resultsSection').classList.remove('hidden');
-            window.pdfResults = results;
-        }
-
-        async function loadPDF(index) {
-            const pdf = window.pdfResults[index];
-            document.getElementById('loadingText').textContent = 'Loading PDF pages...';
-            document.getElementById('loading').classList.add('active');
-
-            try {
-                const response = await fetch('/api/load-pdf', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ url: pdf.url, topic: selectedTopic })
-                });
-
-                const data = await response.json();
-                if (data.error) {
-                    alert('Error loading PDF: ' + data.error);
-                    document.getElementById('loading').classList.remove('active');
-                    return;
-                }
-
-                currentPDF = data.path;
-
-                // Track loaded PDF
-                loadedPDFs.push({
-                    path: data.path,
-                    url: pdf.url,
-                    title: pdf.title,
-                    thumbnails: data.thumbnails
-                });
-
-                displayPages(data.thumbnails, data.filtered_pages);
-
-                // Scroll to page section after a brief delay
-                setTimeout(() => {
-                    document.getElementById('pageSection').scrollIntoView({ behavior: 'smooth', block: 'start' });
-                }, 100);
-
-            } catch (error) {
-                console.error('Load error:', error);
-                alert('Error loading PDF');
-            }
-
-            document.getElementById('loading').classList.remove('active');
-        }
-
-        function displayPages(thumbnails, filteredPages) {
-            const container = document.getElementById('pageGrid');
-            container.innerHTML = '';
-            selectedPages.clear();
-
-            // Pre-select filtered pages
-            if (filteredPages && filteredPages.length > 0) {
-                filteredPages.forEach(p => selectedPages.add(p + 1)); // Convert 0-indexed to 1-indexed
-                // Show info message about auto-filtering
-                const infoDiv = document.createElement('div');
-                infoDiv.style.cssText = 'grid-column: 1/-1; background: var(--success-glow); border: 1px solid var(--success); border-radius: 8px; padding: 0.75rem 1rem; margin-bottom: 0.5rem; color: var(--success);';
-                infoDiv.innerHTML = `✓ Auto-selected ${filteredPages.length} pages containing topic keywords. Click pages to add/remove.`;
-                container.appendChild(infoDiv);
-            } else if (document.getElementById('difficulty').value === 'pastpapers') {
-                // Show warning if no pages matched in past papers mode
-                const warnDiv = document.createElement('div');
-                warnDiv.style.cssText = 'grid-column: 1/-1; background: var(--secondary-glow); border: 1px solid var(--warning); border-radius: 8px; padding: 0.75rem 1rem; margin-bottom: 0.5rem; color: var(--warning);';
-                warnDiv.innerHTML = `⚠ No pages auto-matched topic keywords. Manually select pages with relevant questions.`;
-                container.appendChild(warnDiv);
-            }
-
-            thumbnails.forEach(thumb => {
-                const div = document.createElement('div');
-                div.className = 'page-item' + (selectedPages.has(thumb.page) ? ' selected' : '');
-                div.innerHTML = `
-                    <img src="${thumb.data}" onclick="togglePage(${thumb.page}, this.parentElement)">
-                    <div class="page-number">Page ${thumb.page}</div>
-                    <button style="position:absolute;top:4px;right:4px;background:var(--primary);border:none;border-radius:4px;padding:2px 6px;color:white;font-size:0.7rem;cursor:pointer;" onclick="zoomPage(${thumb.page})">🔍</button>
-                `;
-                container.appendChild(div);
-            });
-
-            document.getElementById('pageSection').classList.remove('hidden');
-            document.getElementById('statusBar').classList.remove('hidden');
-            updateSelectedCount();
-        }
-
-        function togglePage(pageNum, element) {
-            if (selectionConfirmed) return;
-
-            if (selectedPages.has(pageNum)) {
-                selectedPages.delete(pageNum);
-                element.classList.remove('selected');
-            } else {
-                selectedPages.add(pageNum);
-                element.classList.add('selected');
-            }
-            updateSelectedCount();
-        }
-
-        function updateSelectedCount() {
-            document.getElementById('selectedCount').textContent = selectedPages.size;
-        }
-
-        function confirmSelection() {
-            if (selectedPages.size === 0) {
-                alert('Please select at least one page');
-                return;
-            }
-
-            selectionConfirmed = true;
-
-            // Save current selection to collected pages
-            collectedPages.push({
-                pdfPath: currentPDF,
-                pages: Array.from(selectedPages).sort((a, b) => a - b),
-                pdfIndex: loadedPDFs.length - 1
-            });
-
-            // Update UI
-            document.getElementById('confirmBtn').classList.add('hidden');
-            document.getElementById('editBtn').classList.remove('hidden');
-            document.getElementById('generateBtn').classList.remove('hidden');
-            document.getElementById('addMoreBtn').classList.remove('hidden');
-
-            // Show collected info
-            document.getElementById('collectedInfo').classList.remove('hidden');
-            const totalCollected = collectedPages.reduce((sum, p) => sum + p.pages.length, 0);
-            document.getElementById('collectedCount').textContent = totalCollected;
-            document.getElementById('pdfCount').textContent = collectedPages.length;
-
-            // Dim unselected pages
-            document.querySelectorAll('.page-item').forEach(el => {
-                el.style.pointerEvents = 'none';
-                if (!el.classList.contains('selected')) {
-                    el.style.opacity = '0.3';
-                }
-            });
-        }
-
-        function editSelection() {
-            selectionConfirmed = false;
-
-            // Remove the last collected entry if editing
-            if (collectedPages.length > 0) {
-                collectedPages.pop();
-            }
-
-            // Update UI
-            document.getElementById('confirmBtn').classList.remove('hidden');
-            document.getElementById('editBtn').classList.add('hidden');
-            document.getElementById('generateBtn').classList.add('hidden');
-            document.getElementById('addMoreBtn').classList.add('hidden');
-
-            // Update collected info
-            if (collectedPages.length === 0) {
-                document.getElementById('collectedInfo').classList.add('hidden');
-            } else {
-                const totalCollected = collectedPages.reduce((sum, p) => sum + p.pages.length, 0);
-                document.getElementById('collectedCount').textContent = totalCollected;
-                document.getElementById('pdfCount').textContent = collectedPages.length;
-            }
-
-            // Re-enable page selection
-            document.querySelectorAll('.page-item').forEach(el => {
-                el.style.pointerEvents = 'auto';
-                el.style.opacity = '1';
-            });
-        }
-
-        function addMorePDFs() {
-            // Reset for loading another PDF but keep collected pages
-            selectedPages.clear();
-            currentPDF = null;
-            selectionConfirmed = false;
-
-            // Hide page section, show PDF results
-            document.getElementById('pageSection').classList.add('hidden');
-            document.getElementById('confirmBtn').classList.remove('hidden');
-            document.getElementById('editBtn').classList.add('hidden');
-            document.getElementById('generateBtn').classList.add('hidden');
-            document.getElementById('addMoreBtn').classList.add('hidden');
-
-            // Scroll to PDF results
-            document.getElementById('pdfResults').scrollIntoView({ behavior: 'smooth' });
-
-            updateSelectedCount();
-        }
-
-        async function generatePDF() {
-            // Check if we have collected pages from multiple PDFs
-            const totalCollected = collectedPages.reduce((sum, p) => sum + p.pages.length, 0);
-
-            if (totalCollected === 0 && selectedPages.size === 0) {
-                alert('Please select at least one page');
-                return;
-            }
-
-            document.getElementById('loadingText').textContent = 'Generating PDF...';
-            document.getElementById('loading').classList.add('active');
-
-            try {
-                let response;
-
-                if (collectedPages.length > 0) {
-                    // Multi-PDF mode - merge from collected pages
-                    response = await fetch('/api/generate-multi', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                            collected: collectedPages,
-                            topic: selectedTopic
-                        })
-                    });
-                } else {
-                    // Single PDF mode (legacy)
-                    response = await fetch('/api/generate', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                            path: currentPDF,
-                            pages: Array.from(selectedPages).sort((a,b) => a-b),
-                            topic: selectedTopic
-                        })
-                    });
-                }
-
-                const blob = await response.blob();
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = `${selectedTopic.replace(/[^a-zA-Z0-9]/g, '_')}_homework.pdf`;
-                a.click();
-            } catch (error) {
-                console.error('Generate error:', error);
-                alert('Error generating PDF');
-            }
-
-            document.getElementById('loading').classList.remove('active');
-        }
-
-        async function zoomPage(pageNum) {
-            event.stopPropagation();
-
-            try {
-                const response = await fetch('/api/zoom-page', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ path: currentPDF, page: pageNum })
-                });
-
-                const data = await response.json();
-                document.getElementById('zoomImage').src = data.image;
-                document.getElementById('zoomModal').classList.remove('hidden');
-            } catch (error) {
-                console.error('Zoom error:', error);
-            }
-        }
-
-        function closeZoom() {
-            document.getElementById('zoomModal').classList.add('hidden');
-        }
-
-        function startOver() {
-            selectedTopic = null;
-            selectedPages.clear();
-            currentPDF = null;
-            selectionConfirmed = false;
-            collectedPages = [];
-            loadedPDFs = [];
-
-            document.querySelectorAll('.topic-item').forEach(el => el.classList.remove('selected'));
-            document.getElementById('keywords').value = '';
-            document.getElementById('resultsSection').classList.add('hidden');
-            document.getElementById('pageSection').classList.add('hidden');
-            document.getElementById('statusBar').classList.add('hidden');
-            document.getElementById('confirmBtn').classList.remove('hidden');
-            document.getElementById('editBtn').classList.add('hidden');
-            document.getElementById('generateBtn').classList.add('hidden');
-            document.getElementById('addMoreBtn').classList.add('hidden');
-            document.getElementById('collectedInfo').classList.add('hidden');
-
-            fetch('/api/cleanup', { method: 'POST' });
-        }
-
-        document.addEventListener('keydown', e => {
-            if (e.key === 'Escape') closeZoom();
-        });
-
-        // Theme switching
-        function setTheme(theme) {
-            document.documentElement.setAttribute('data-theme', theme);
-            localStorage.setItem('homework-theme', theme);
-
-            // Update button states
-            document.querySelectorAll('.theme-btn').forEach(btn => btn.classList.remove('active'));
-            document.getElementById('theme-' + theme).classList.add('active');
-        }
-
-        // Load saved theme on page load
-        (function() {
-            const savedTheme = localStorage.getItem('homework-theme') || 'default';
-            setTheme(savedTheme);
-        })();
-    </script>
-</body>
-</html>'''
+# Endpoints reported individually in metrics; anything else is counted as "other"
+METRIC_ENDPOINTS = {
+    '/', '/index.html', '/static/app.css', '/static/app.js', '/metrics', '/api/keywords/version', '/admin/profiles', '/api/search', '/api/load-pdf',
+    '/api/generate', '/api/generate-multi', '/api/zoom-page', '/api/ai-process-papers',
+    '/api/cleanup', '/upload_custom_pdf', '/scan_custom_pdf', '/generate_custom_pdf',
+}
 
 
 class HomeworkHandler(BaseHTTPRequestHandler):
     """HTTP request handler for the homework tool"""
 
     def do_GET(self):
-        if self.path == '/' or self.path == '/index.html':
+        self.handle_with_metrics(self.route_get)
+
+    def do_POST(self):
+        self.payload = None
+        with slow_request_profiler.profile(self.path) as details:
+            self.handle_with_metrics(self.route_post)
+            details['request_id'] = self.request_id
+            details['payload'] = summarize_payload(self.payload)
+
+    def handle_with_metrics(self, route):
+        """Run a request under its own request ID and record its duration and status"""
+        self.request_id = metrics.start_request(self.headers.get('X-Request-ID'))
+        self.status = None
+        try:
+            route()
+        finally:
+            path = self.path.split('?', 1)[0]
+            if path.startswith('/download/'):
+                endpoint = '/download'
+            elif path.startswith('/admin/profiles'):
+                endpoint = '/admin/profiles'
+            else:
+                endpoint = path if path in METRIC_ENDPOINTS else 'other'
+            summary = metrics.finish_request(endpoint, self.status or 'none')
+            if path != '/metrics':
+                stages = metrics.format_span_summary(summary)
+                print(f"   ⏱ [{summary['request_id']}] {self.command} {path} {self.status} "
+                      f"in {summary['seconds']:.2f}s" + (f" - {stages}" if stages else ""))
+
+    def send_response(self, code, message=None):
+        self.status = code
+        super().send_response(code, message)
+        self.send_header('X-Request-ID', self.request_id)
+
+    def route_get(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/' or path == '/index.html':
+            # Rendered once per topic list, served pre-compressed with an ETag
+            send_cached_asset(self, get_index_page(tuple(TOPICS.keys())))
+        elif path.startswith('/static/') and path[len('/static/'):] in STATIC_FILES:
+            send_cached_asset(self, get_static_asset(path[len('/static/'):]))
+        elif self.path == '/api/keywords/version':
+            self.send_json(get_active_keywords().info())
+        elif self.path == '/metrics':
+            pool = reader_pool.stats()
+            cached = result_cache.stats()
+            body = metrics.render_prometheus({
+                'mathsforge_reader_pool_readers': pool['readers'],
+                'mathsforge_reader_pool_bytes': pool['bytes'],
+                'mathsforge_result_cache_entries': cached['entries'],
+                'mathsforge_result_cache_bytes': cached['bytes'],
+            }).encode()
             self.send_response(200)
-            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            # Use the new template from html_template.py
-            html = get_html_template(list(TOPICS.keys()))
-            self.wfile.write(html.encode())
+            self.wfile.write(body)
+        elif self.path == '/admin/profiles':
+            self.send_json({
+                'enabled': slow_request_profiler.enabled,
+                'threshold_seconds': slow_request_profiler.threshold,
+                'profiles': slow_request_profiler.recent(),
+            })
+        elif self.path.startswith('/admin/profiles/'):
+            # Download a saved .prof file
+            filepath = slow_request_profiler.profile_path(self.path.split('/admin/profiles/')[-1])
+            if filepath:
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/octet-stream')
+                self.send_header('Content-Disposition', f'attachment; filename="{filepath.name}"')
+                self.end_headers()
+                with open(filepath, 'rb') as f:
+                    shutil.copyfileobj(f, self.wfile)
+            else:
+                self.send_error(404)
         elif self.path.startswith('/download/'):
             # Serve generated PDF files
             filename = self.path.split('/download/')[-1]
@@ -2300,7 +1300,7 @@ class HomeworkHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(404)
 
-    def do_POST(self):
+    def route_post(self):
         content_length = int(self.headers.get('Content-Length', 0))
         content_type = self.headers.get('Content-Type', '')
 
@@ -2314,6 +1314,7 @@ class HomeworkHandler(BaseHTTPRequestHandler):
                 data = json.loads(body) if body else {}
             except:
                 data = {}
+        self.payload = data
 
         if self.path == '/api/search':
             self.handle_search(data)
@@ -2344,6 +1345,18 @@ class HomeworkHandler(BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(json.dumps(data).encode())
 
+    def send_cached_result(self, cached):
+        """Replay a response stored in the result cache"""
+        body, entry = cached
+        self.send_response(200)
+        self.send_header('Content-Type', entry['content_type'])
+        for name, value in entry['headers'].items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', 'HIT')
+        self.end_headers()
+        self.wfile.write(body)
+
     def handle_search(self, data):
         topic = data.get('topic', '')
         level = data.get('level', 'gcse')
@@ -2420,8 +1433,6 @@ class HomeworkHandler(BaseHTTPRequestHandler):
 
     def handle_generate_multi(self, data):
         """Generate PDF from multiple source PDFs with optional mark schemes as ZIP"""
-        import zipfile
-
         collected = data.get('collected', [])
         topic = data.get('topic', 'homework')
         include_mark_schemes = data.get('includeMarkSchemes', False)
@@ -2430,114 +1441,76 @@ class HomeworkHandler(BaseHTTPRequestHandler):
         if include_mark_schemes:
             print(f"   📝 Mark schemes will be included as separate PDF in ZIP")
 
-        # Create questions PDF
-        questions_writer = PdfWriter()
-        total_pages = 0
-        mark_scheme_info = []  # Store mark scheme info for later
-
-        # Base directories
-        BASE_DIR = Path(__file__).parent
-        MS_DIR = BASE_DIR / "markschemes"
-
-        # First pass: Add all question pages
-        for item in collected:
-            pdf_path = Path(item.get('pdfPath', ''))
-            pages = item.get('pages', [])
-
-            print(f"   Adding {len(pages)} pages from {pdf_path.name}")
-
-            if not pdf_path.exists():
-                print(f"   ⚠ PDF not found: {pdf_path}")
-                continue
+        sources = [str(item.get('pdfPath', '')) for item in collected]
+        if include_mark_schemes:
+            from markscheme_map import MAP_FILE
+            mark_schemes = [find_mark_scheme(Path(s).name) for s in sources]
+            # Mark scheme pages come from the question → mark scheme map, so rebuilding it changes the key
+            sources += [str(ms) for ms in mark_schemes if ms] + [str(MAP_FILE)]
+        cache_key = request_key('/api/generate-multi', {
+            'topic': topic,
+            'include_mark_schemes': bool(include_mark_schemes),
+            'collected': [{'pdfPath': str(item.get('pdfPath', '')), 'pages': [int(p) for p in item.get('pages', [])]}
+                          for item in collected],
+        }, sources, get_scoring_version())
+        cached = result_cache.get(cache_key)
+        if cached:
+            print(f"   ♻ Sending cached worksheet ({len(cached[0]) // 1024} KB)")
+            self.send_cached_result(cached)
+            return
 
-            try:
-                reader = PdfReader(pdf_path)
-                for page_num in pages:
-                    if 0 <= page_num - 1 < len(reader.pages):
-                        questions_writer.add_page(reader.pages[page_num - 1])
-                        total_pages += 1
-
-                # Track mark scheme info for this paper
-                if include_mark_schemes:
-                    mark_scheme_info.append({
-                        'paper_path': pdf_path,
-                        'pages': pages
-                    })
-            except Exception as e:
-                print(f"   Error reading {pdf_path}: {e}")
+        worksheet = assemble_worksheet(collected, include_mark_schemes)
+        questions_writer = worksheet['questions']
+        ms_writer = worksheet['mark_schemes']
 
         # Generate timestamp for filenames
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_topic = topic.replace(' ', '_').replace('-', '_')
 
-        # Write questions PDF
-        questions_path = WORK_DIR / f"{safe_topic}_Questions_{timestamp}.pdf"
-        with open(questions_path, 'wb') as f:
-            questions_writer.write(f)
-
-        print(f"   ✓ Questions PDF: {total_pages} pages")
+        print(f"   ✓ Questions PDF: {worksheet['question_pages']} pages")
 
         # If mark schemes requested, create separate PDF and ZIP them together
-        if include_mark_schemes and mark_scheme_info:
-            ms_writer = PdfWriter()
-            ms_pages_added = 0
-
-            for ms_info in mark_scheme_info:
-                paper_path = ms_info['paper_path']
-                pages = ms_info['pages']
-
-                # Find corresponding mark scheme file
-                ms_path = MS_DIR / paper_path.name
-
-                if not ms_path.exists():
-                    print(f"   ⚠ Mark scheme not found: {ms_path.name}")
-                    continue
-
-                try:
-                    ms_reader = PdfReader(ms_path)
-                    for page_num in pages:
-                        if 0 <= page_num - 1 < len(ms_reader.pages):
-                            ms_writer.add_page(ms_reader.pages[page_num - 1])
-                            ms_pages_added += 1
-                except Exception as e:
-                    print(f"   Error reading mark scheme {ms_path}: {e}")
-
-            # Write mark schemes PDF
-            markschemes_path = WORK_DIR / f"{safe_topic}_MarkSchemes_{timestamp}.pdf"
-            with open(markschemes_path, 'wb') as f:
-                ms_writer.write(f)
-
-            print(f"   ✓ Mark Schemes PDF: {ms_pages_added} pages")
-
-            # Create ZIP file with both PDFs
-            zip_path = WORK_DIR / f"{safe_topic}_Homework_{timestamp}.zip"
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-                zf.write(questions_path, f"{safe_topic}_Questions.pdf")
-                zf.write(markschemes_path, f"{safe_topic}_MarkSchemes.pdf")
-
-            print(f"   ✓ Created ZIP with Questions + Mark Schemes")
-
-            # Send ZIP file
+        if ms_writer is not None and worksheet['papers']:
+            print(f"   ✓ Mark Schemes PDF: {worksheet['mark_scheme_pages']} pages")
+
+            # Stream the ZIP straight to the socket - no intermediate files on disk
+            disposition = f'attachment; filename="{safe_topic}_Homework.zip"'
             self.send_response(200)
             self.send_header('Content-Type', 'application/zip')
-            self.send_header('Content-Disposition', f'attachment; filename="{safe_topic}_Homework.zip"')
+            self.send_header('Content-Disposition', disposition)
             self.end_headers()
 
-            with open(zip_path, 'rb') as f:
-                self.wfile.write(f.read())
+            # Keep a copy of what is streamed for the result cache
+            capture = CaptureWriter(self.wfile, result_cache.max_entry_bytes)
+            sizes = stream_zip_bundle(capture, [
+                (f"{safe_topic}_Questions.pdf", questions_writer),
+                (f"{safe_topic}_MarkSchemes.pdf", ms_writer),
+            ])
+            result_cache.put(cache_key, capture.getvalue(), 'application/zip',
+                             headers={'Content-Disposition': disposition})
+
+            print(f"   ✓ Streamed ZIP with Questions + Mark Schemes ({sum(sizes.values()) // 1024} KB)")
         else:
-            # No mark schemes - just send the questions PDF
+            # No mark schemes - save the questions PDF to outputs and send it
             final_name = f"{safe_topic}_Homework_{timestamp}.pdf"
             final_path = OUTPUT_DIR / final_name
-            shutil.copy(questions_path, final_path)
+            with open(final_path, 'wb') as f:
+                questions_writer.write(f)
 
+            size = final_path.stat().st_size
+            disposition = f'attachment; filename="{final_name}"'
             self.send_response(200)
             self.send_header('Content-Type', 'application/pdf')
-            self.send_header('Content-Disposition', f'attachment; filename="{final_name}"')
+            self.send_header('Content-Disposition', disposition)
+            self.send_header('Content-Length', str(size))
             self.end_headers()
 
-            with open(questions_path, 'rb') as f:
-                self.wfile.write(f.read())
+            with open(final_path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile)
+
+            if size <= result_cache.max_entry_bytes:
+                result_cache.put(cache_key, final_path.read_bytes(), 'application/pdf',
+                                 headers={'Content-Disposition': disposition})
 
     def handle_zoom_page(self, data):
         pdf_path = Path(data.get('path', ''))
@@ -2618,7 +1591,7 @@ class HomeworkHandler(BaseHTTPRequestHandler):
 
             # Validate it's a valid PDF
             try:
-                reader = PdfReader(filepath)
+                reader = get_pdf_reader(filepath)
                 page_count = len(reader.pages)
                 print(f"📄 Custom PDF uploaded: {filename} ({page_count} pages)")
                 self.send_json({
@@ -2641,6 +1614,7 @@ class HomeworkHandler(BaseHTTPRequestHandler):
         pdf_path = Path(data.get('path', ''))
         topic = data.get('topic', '')
         use_enhanced_ocr = data.get('enhanced_ocr', True)  # Default to using enhanced OCR
+        profile = data.get('profile', 'custom')
 
         if not pdf_path.exists():
             self.send_json({'success': False, 'error': 'PDF file not found'})
@@ -2650,91 +1624,54 @@ class HomeworkHandler(BaseHTTPRequestHandler):
             self.send_json({'success': False, 'error': 'No topic specified'})
             return
 
-        print(f"\n🔍 Scanning custom PDF for topic: {topic}")
+        if profile not in SCORING_PROFILES:
+            self.send_json({'success': False, 'error': f'Unknown scoring profile: {profile}'})
+            return
+
+        print(f"\n🔍 Scanning custom PDF for topic: {topic} ({profile} scoring)")
         if use_enhanced_ocr:
             print(f"   📷 Enhanced OCR mode enabled for better accuracy")
 
+        cache_key = request_key('/scan_custom_pdf', {
+            'topic': topic,
+            'profile': profile,
+            'enhanced_ocr': bool(use_enhanced_ocr),
+        }, [str(pdf_path)], get_scoring_version())
+        cached = result_cache.get(cache_key)
+        if cached:
+            print(f"   ♻ Sending cached scan results")
+            self.send_cached_result(cached)
+            return
+
         try:
-            reader = PdfReader(pdf_path)
+            reader = get_pdf_reader(pdf_path)
             total_pages = len(reader.pages)
 
-            # Get topic keywords for matching
-            keywords = get_topic_keywords(topic)  # Returns list
+            # The wider topic keyword list is scored alongside the strict table in one pass
+            keywords = get_topic_keywords(topic) if SCORING_PROFILES[profile]['weights'].get('related') else []
             strict_kw_dict = get_strict_keywords(topic)  # Returns dict with 'primary', 'context', 'exclude'
 
-            # Extract primary and context keywords from strict dict
-            primary_keywords = strict_kw_dict.get('primary', [])
-            context_keywords = strict_kw_dict.get('context', [])
-            exclude_keywords = strict_kw_dict.get('exclude', [])
-
             print(f"   Regular keywords: {keywords[:5] if keywords else []}...")
-            print(f"   Primary (strict): {primary_keywords[:3] if primary_keywords else []}...")
-            print(f"   Context: {context_keywords[:3] if context_keywords else []}...")
+            print(f"   Primary (strict): {strict_kw_dict.get('primary', [])[:3]}...")
+            print(f"   Context: {strict_kw_dict.get('context', [])[:3]}...")
 
             results = []
 
             for page_num in range(total_pages):
                 # Use enhanced OCR for custom resources (likely scanned documents)
-                if use_enhanced_ocr:
-                    text = extract_text_from_pdf_page(pdf_path, page_num, force_ocr=True)
-                else:
-                    text = extract_text_from_pdf_page(pdf_path, page_num, force_ocr=False)
-
-                text_lower = text.lower()
-                display_page = page_num + 1  # For display (1-indexed)
-
-                # Score the page
-                confidence = 'none'
-                score = 0
-
-                # Check for exclusions first
-                should_exclude = False
-                for exclude in exclude_keywords:
-                    if exclude.lower() in text_lower:
-                        should_exclude = True
-                        break
-
-                if should_exclude:
-                    continue
-
-                # Check primary (strict) keywords (high value)
-                for kw in primary_keywords:
-                    if kw.lower() in text_lower:
-                        score += 10
-
-                # Check context keywords (medium value)
-                for kw in context_keywords:
-                    if kw.lower() in text_lower:
-                        score += 3
-
-                # Check regular keywords (lower value)
-                for kw in keywords:
-                    if kw.lower() in text_lower:
-                        score += 1
-
-                # Check topic name directly
-                topic_lower = topic.lower()
-                if ' - ' in topic:
-                    topic_name = topic.split(' - ', 1)[1].lower()
-                else:
-                    topic_name = topic_lower
-
-                if topic_name in text_lower:
-                    score += 5
+                text, source = extract_page_text_with_source(pdf_path, page_num, force_ocr=bool(use_enhanced_ocr))
 
-                # Determine confidence level
-                if score >= 10:
-                    confidence = 'high'
-                elif score >= 3:
-                    confidence = 'medium'
+                with span('score'):
+                    result = score_page(text, topic, profile, match_mode_for_source(source), related=keywords)
 
-                if confidence != 'none':
+                if result.confidence:
                     # Generate thumbnail for this page
                     thumbnail = generate_page_thumbnail(pdf_path, page_num)
                     results.append({
-                        'page': display_page,
-                        'confidence': confidence,
-                        'score': score,
+                        'page': page_num + 1,  # For display (1-indexed)
+                        'confidence': result.confidence,
+                        'score': result.score,
+                        'keywords': list(result.keywords[:5]),
                         'thumbnail': thumbnail
                     })
 
@@ -2744,11 +1681,14 @@ class HomeworkHandler(BaseHTTPRequestHandler):
             print(f"   Found {len([r for r in results if r['confidence'] == 'high'])} high confidence pages")
             print(f"   Found {len([r for r in results if r['confidence'] == 'medium'])} medium confidence pages")
 
-            self.send_json({
+            response = {
                 'success': True,
                 'pages': results,
                 'total_pages': total_pages
-            })
+            }
+            self.send_json(response)
+            result_cache.put(cache_key, json.dumps(response).encode(), 'application/json',
+                             meta={'topic': topic, 'pages': len(results)})
 
         except Exception as e:
             print(f"   Error scanning PDF: {e}")
@@ -2771,8 +1711,8 @@ class HomeworkHandler(BaseHTTPRequestHandler):
         print(f"\n📄 Generating custom PDF with {len(pages)} pages for topic: {topic}")
 
         try:
-            reader = PdfReader(pdf_path)
-            writer = PdfWriter()
+            reader = get_pdf_reader(pdf_path)
+            writer = WorksheetWriter()
 
             for page_num in sorted(pages):
                 if 0 < page_num <= len(reader.pages):
@@ -2811,8 +1751,36 @@ class HomeworkHandler(BaseHTTPRequestHandler):
             self.send_json({'error': 'No topic selected'})
             return
 
+        # Optional budget: stop scanning once this many high-confidence pages are found
+        target_pages = data.get('target_pages')
+        if target_pages is not None:
+            try:
+                target_pages = int(target_pages)
+            except (TypeError, ValueError):
+                target_pages = 0
+            if target_pages < 1:
+                self.send_json({'error': 'target_pages must be a positive whole number'})
+                return
+
         print(f"\n🤖 AI Processing {len(papers)} papers for topic: {topic}")
-        results = []
+        if target_pages:
+            print(f"   🎯 Target: {target_pages} definite pages")
+
+        request_fields = {
+            'topic': topic,
+            'papers': [{'url': p.get('url', ''), 'title': p.get('title', '')} for p in papers],
+        }
+        if target_pages:
+            request_fields['target_pages'] = target_pages
+        cache_key = request_key('/api/ai-process-papers', request_fields,
+                                [p.get('url', '') for p in papers], get_scoring_version())
+        cached = result_cache.get(cache_key)
+        if cached:
+            print(f"   ♻ Sending cached scan results")
+            self.send_cached_result(cached)
+            return
+
+        downloaded = []
 
         for paper_info in papers:
             url = paper_info.get('url', '')
@@ -2826,10 +1794,24 @@ class HomeworkHandler(BaseHTTPRequestHandler):
                 continue
 
             print(f"   🖼 Generating thumbnails...")
-            thumbnails = get_pdf_page_thumbnails(pdf_path)
+            downloaded.append((url, title, pdf_path, get_pdf_page_thumbnails(pdf_path)))
+
+        # With a page budget, papers are scanned most promising first until enough are found
+        scan_report = None
+        if target_pages:
+            budgeted_pages, scan_report = scan_papers_with_budget([d[2] for d in downloaded], topic, target_pages)
 
-            print(f"   🔍 OCR scanning for topic keywords...")
-            filtered_pages_with_confidence = filter_pdf_pages_by_topic(pdf_path, topic, return_confidence=True)
+        results = []
+
+        for url, title, pdf_path, thumbnails in downloaded:
+            if target_pages:
+                filtered_pages_with_confidence = budgeted_pages[str(pdf_path)]
+            else:
+                # Indexed archive papers are already scored; anything else is scanned now
+                filtered_pages_with_confidence = filter_pages_from_index(pdf_path, topic)
+                if filtered_pages_with_confidence is None:
+                    print(f"   🔍 OCR scanning for topic keywords...")
+                    filtered_pages_with_confidence = filter_pdf_pages_by_topic(pdf_path, topic, return_confidence=True)
 
             if filtered_pages_with_confidence:
                 high_count = len([p for p in filtered_pages_with_confidence if p['confidence'] == 'high'])
@@ -2848,19 +1830,37 @@ class HomeworkHandler(BaseHTTPRequestHandler):
 
         print(f"   ✅ AI processing complete: {sum(len(r['filtered_pages']) for r in results)} total pages found")
 
-        self.send_json({'results': results})
+        response = {'results': results}
+        if scan_report:
+            response['scan'] = scan_report
+        self.send_json(response)
 
-    def log_message(self, format, *args):
-        # Suppress default logging
+        # Failed downloads may succeed next time, so only complete scans are cached.
+        # Responses name the downloaded PDFs, so they are dropped once cleanup deletes them.
+        if len(results) == len(papers):
+            result_cache.put(cache_key, json.dumps(response).encode(), 'application/json',
+                             requires=[r['path'] for r in results],
+                             meta={'topic': topic, 'pages': sum(len(r['filtered_pages']) for r in results)})
+
+    def log_request(self, code='-', size='-'):
+        # Every request is summarised with its timings in handle_with_metrics instead
         pass
 
+    def log_message(self, format, *args):
+        print(f"   [{getattr(self, 'request_id', '-')}] {format % args}")
+
 
 def main():
+    ensure_dirs()
     port = 5000
     server = HTTPServer(('127.0.0.1', port), HomeworkHandler)
+    keywords = get_active_keywords()
+    # Build and compress the page up front so the first visitor doesn't wait for it
+    get_index_page(tuple(TOPICS.keys()))
     print(f"\n{'='*50}")
     print(f"  Maths Homework Generator")
     print(f"  Open: http://127.0.0.1:{port}")
+    print(f"  Keywords: version {keywords.version} ({keywords.source})")
     print(f"{'='*50}\n")
 
     try: